@@ -0,0 +1,50 @@
+from alembic import op
+
+revision = "1792368000"
+down_revision = "1696377583"
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE selection_price_history (
+            selection_id integer NOT NULL,
+            ts timestamp with time zone NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            price double precision NOT NULL
+        ) PARTITION BY RANGE (ts)
+        """)
+    op.execute("""
+        CREATE INDEX ix_selection_price_history_selection_id_ts
+        ON selection_price_history (selection_id, ts)
+        """)
+    op.execute("""
+        CREATE TABLE selection_price_history_default
+        PARTITION OF selection_price_history DEFAULT
+        """)
+    op.execute("""
+        CREATE FUNCTION create_price_history_partition(p_month date) RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_start date := date_trunc('month', p_month);
+            v_end date := v_start + interval '1 month';
+            v_name text := 'selection_price_history_' || to_char(v_start, 'YYYYMM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF selection_price_history '
+                'FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_start, v_end
+            );
+        END;
+        $$
+        """)
+    op.execute("""
+        SELECT create_price_history_partition(
+            (date_trunc('month', CURRENT_DATE) + make_interval(months => m))::date
+        )
+        FROM generate_series(0, 2) AS m
+        """)
+
+
+def downgrade():
+    op.execute("DROP TABLE selection_price_history")
+    op.execute("DROP FUNCTION create_price_history_partition(date)")
@@ -0,0 +1,17 @@
+from alembic import op
+
+revision = "1792368100"
+down_revision = "1792368000"
+
+
+def upgrade():
+    op.create_index(
+        "ix_events_pending_scheduled_start",
+        "events",
+        ["scheduled_start"],
+        postgresql_where="status = 'pending'",
+    )
+
+
+def downgrade():
+    op.drop_index("ix_events_pending_scheduled_start", table_name="events")
@@ -0,0 +1,43 @@
+from alembic import op
+
+revision = "1792368200"
+down_revision = "1792368100"
+
+TABLES = ("sports", "events", "selections")
+
+
+def upgrade():
+    # LIKE 'prefix%' can only use a btree index under a non-C collation with
+    # text_pattern_ops
+    for table in TABLES:
+        op.execute(
+            f"CREATE INDEX ix_{table}_name_pattern ON {table} (name text_pattern_ops)"
+        )
+
+    # Trigram indexes let Postgres serve unanchored regexes too; pg_trgm is
+    # optional, so skip them when the extension cannot be installed
+    op.execute("""
+        DO $$
+        BEGIN
+            BEGIN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            EXCEPTION WHEN OTHERS THEN
+                RAISE NOTICE 'pg_trgm unavailable, skipping trigram indexes: %', SQLERRM;
+            END;
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                CREATE INDEX IF NOT EXISTS ix_sports_name_trgm
+                    ON sports USING gin (name gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS ix_events_name_trgm
+                    ON events USING gin (name gin_trgm_ops);
+                CREATE INDEX IF NOT EXISTS ix_selections_name_trgm
+                    ON selections USING gin (name gin_trgm_ops);
+            END IF;
+        END
+        $$;
+        """)
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_name_pattern")
@@ -0,0 +1,16 @@
+from alembic import op
+
+revision = "1792368300"
+down_revision = "1792368200"
+
+
+def upgrade():
+    # Postgres does not index foreign keys; the search joins and EXISTS
+    # filters walk both relations by them
+    op.create_index("ix_events_sport_id", "events", ["sport_id"])
+    op.create_index("ix_selections_event_id", "selections", ["event_id"])
+
+
+def downgrade():
+    op.drop_index("ix_selections_event_id", table_name="selections")
+    op.drop_index("ix_events_sport_id", table_name="events")
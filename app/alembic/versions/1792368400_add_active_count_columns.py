@@ -0,0 +1,92 @@
+from alembic import op
+
+revision = "1792368400"
+down_revision = "1792368300"
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE sports ADD COLUMN active_events_count integer NOT NULL DEFAULT 0"
+    )
+    op.execute(
+        "ALTER TABLE events "
+        "ADD COLUMN active_selections_count integer NOT NULL DEFAULT 0"
+    )
+
+    # Recomputes both counts under a self-exclusive lock, so it is safe to run
+    # while the application writes; used for the backfill and by
+    # commands.repair_active_counts
+    op.execute("""
+        CREATE FUNCTION repair_active_counts(
+            OUT sports_fixed integer, OUT events_fixed integer
+        ) AS $$
+        BEGIN
+            LOCK TABLE sports, events, selections IN SHARE ROW EXCLUSIVE MODE;
+
+            UPDATE events e SET active_selections_count = c.n
+            FROM (
+                SELECT e.id, count(s.id) FILTER (WHERE s.active) AS n
+                FROM events e LEFT JOIN selections s ON s.event_id = e.id
+                GROUP BY e.id
+            ) c
+            WHERE e.id = c.id AND e.active_selections_count <> c.n;
+            GET DIAGNOSTICS events_fixed = ROW_COUNT;
+
+            UPDATE sports s SET active_events_count = c.n
+            FROM (
+                SELECT s.id, count(e.id) FILTER (WHERE e.active) AS n
+                FROM sports s LEFT JOIN events e ON e.sport_id = s.id
+                GROUP BY s.id
+            ) c
+            WHERE s.id = c.id AND s.active_events_count <> c.n;
+            GET DIAGNOSTICS sports_fixed = ROW_COUNT;
+        END
+        $$ LANGUAGE plpgsql;
+        """)
+    op.execute("SELECT repair_active_counts()")
+
+    for child, parent, foreign_key, column in (
+        ("selections", "events", "event_id", "active_selections_count"),
+        ("events", "sports", "sport_id", "active_events_count"),
+    ):
+        op.execute(f"""
+            CREATE FUNCTION maintain_{column}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE'
+                   AND OLD.active IS NOT DISTINCT FROM NEW.active
+                   AND OLD.{foreign_key} = NEW.{foreign_key} THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.active THEN
+                    UPDATE {parent} SET {column} = {column} - 1
+                    WHERE id = OLD.{foreign_key};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.active THEN
+                    UPDATE {parent} SET {column} = {column} + 1
+                    WHERE id = NEW.{foreign_key};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER {child}_maintain_{column}
+            AFTER INSERT OR DELETE OR UPDATE OF active, {foreign_key} ON {child}
+            FOR EACH ROW EXECUTE FUNCTION maintain_{column}();
+            """)
+
+    op.create_index("ix_sports_active_events_count", "sports", ["active_events_count"])
+    op.create_index(
+        "ix_events_active_selections_count", "events", ["active_selections_count"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_events_active_selections_count", table_name="events")
+    op.drop_index("ix_sports_active_events_count", table_name="sports")
+    op.execute("DROP TRIGGER selections_maintain_active_selections_count ON selections")
+    op.execute("DROP TRIGGER events_maintain_active_events_count ON events")
+    op.execute("DROP FUNCTION maintain_active_selections_count()")
+    op.execute("DROP FUNCTION maintain_active_events_count()")
+    op.execute("DROP FUNCTION repair_active_counts()")
+    op.execute("ALTER TABLE events DROP COLUMN active_selections_count")
+    op.execute("ALTER TABLE sports DROP COLUMN active_events_count")
@@ -0,0 +1,252 @@
+from alembic import op
+
+revision = "1792368500"
+down_revision = "1792368400"
+
+# Partitions are monthly in UTC: events by scheduled_start, selections by
+# event_start, a copy of their event's scheduled_start kept by the repositories.
+# Postgres 12 only allows unique constraints including the partition key, so
+# events are unique on (id, scheduled_start) and (slug, scheduled_start), and
+# selections reference events through (event_id, event_start).
+
+
+def _create_name_indexes(table: str):
+    op.execute(
+        f"CREATE INDEX ix_{table}_name_pattern ON {table} (name text_pattern_ops)"
+    )
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                CREATE INDEX ix_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops);
+            END IF;
+        END
+        $$;
+        """)
+
+
+def _create_count_triggers():
+    op.execute("""
+        CREATE TRIGGER events_maintain_active_events_count
+        AFTER INSERT OR DELETE OR UPDATE OF active, sport_id ON events
+        FOR EACH ROW EXECUTE FUNCTION maintain_active_events_count()
+        """)
+    op.execute("""
+        CREATE TRIGGER selections_maintain_active_selections_count
+        AFTER INSERT OR DELETE OR UPDATE OF active, event_id ON selections
+        FOR EACH ROW EXECUTE FUNCTION maintain_active_selections_count()
+        """)
+
+
+def _detach_sequences():
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE selections_id_seq OWNED BY NONE")
+
+
+def _attach_sequences():
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+    op.execute("ALTER SEQUENCE selections_id_seq OWNED BY selections.id")
+
+
+def upgrade():
+    _detach_sequences()
+    op.execute("ALTER TABLE selections RENAME TO selections_unpartitioned")
+    op.execute("ALTER TABLE events RENAME TO events_unpartitioned")
+
+    op.execute("""
+        CREATE TABLE events (LIKE events_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (scheduled_start)
+        """)
+    op.execute("""
+        CREATE TABLE selections (
+            LIKE selections_unpartitioned INCLUDING DEFAULTS,
+            event_start timestamp with time zone NOT NULL
+        ) PARTITION BY RANGE (event_start)
+        """)
+
+    # Serialised so concurrent inserts into a new month do not race
+    op.execute("""
+        CREATE FUNCTION ensure_time_partition(p_ts timestamptz) RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_month timestamp := date_trunc('month', p_ts AT TIME ZONE 'UTC');
+            v_start timestamptz := v_month AT TIME ZONE 'UTC';
+            v_end timestamptz := (v_month + interval '1 month') AT TIME ZONE 'UTC';
+            v_suffix text := to_char(v_month, 'YYYYMM');
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('ensure_time_partition'));
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF events '
+                'FOR VALUES FROM (%L) TO (%L)',
+                'events_p' || v_suffix, v_start, v_end
+            );
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF selections '
+                'FOR VALUES FROM (%L) TO (%L)',
+                'selections_p' || v_suffix, v_start, v_end
+            );
+        END;
+        $$
+        """)
+
+    # Selections first: an events partition can only be detached once no
+    # attached selection references it. Detached partitions lose their
+    # foreign keys and move to the "archive" schema.
+    op.execute("""
+        CREATE FUNCTION detach_time_partitions(p_before timestamptz)
+        RETURNS SETOF text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_parent text;
+            v_child text;
+            v_constraint text;
+        BEGIN
+            CREATE SCHEMA IF NOT EXISTS archive;
+            FOREACH v_parent IN ARRAY ARRAY['selections', 'events'] LOOP
+                FOR v_child IN
+                    SELECT c.relname
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = v_parent::regclass
+                      AND c.relname ~ ('^' || v_parent || '_p[0-9]{6}$')
+                      AND (to_date(right(c.relname, 6), 'YYYYMM') + interval '1 month')
+                          AT TIME ZONE 'UTC' <= p_before
+                    ORDER BY c.relname
+                LOOP
+                    EXECUTE format(
+                        'ALTER TABLE %I DETACH PARTITION %I', v_parent, v_child
+                    );
+                    FOR v_constraint IN
+                        SELECT conname FROM pg_constraint
+                        WHERE conrelid = v_child::regclass AND contype = 'f'
+                    LOOP
+                        EXECUTE format(
+                            'ALTER TABLE %I DROP CONSTRAINT %I', v_child, v_constraint
+                        );
+                    END LOOP;
+                    EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_child);
+                    RETURN NEXT 'archive.' || v_child;
+                END LOOP;
+            END LOOP;
+        END;
+        $$
+        """)
+
+    # Every month holding data, plus a year ahead
+    op.execute("""
+        SELECT ensure_time_partition(month AT TIME ZONE 'UTC')
+        FROM generate_series(
+            date_trunc('month', LEAST(
+                (SELECT min(scheduled_start) FROM events_unpartitioned), now()
+            ) AT TIME ZONE 'UTC'),
+            date_trunc('month', GREATEST(
+                (SELECT max(scheduled_start) FROM events_unpartitioned), now()
+            ) AT TIME ZONE 'UTC') + interval '12 months',
+            interval '1 month'
+        ) AS month
+        """)
+
+    op.execute("INSERT INTO events SELECT * FROM events_unpartitioned")
+    op.execute("""
+        INSERT INTO selections
+        SELECT s.*, e.scheduled_start
+        FROM selections_unpartitioned s JOIN events_unpartitioned e ON e.id = s.event_id
+        """)
+    # The foreign key between them is their only dependent: the sequences
+    # were detached and the count triggers go with the tables
+    op.execute(
+        "ALTER TABLE selections_unpartitioned DROP CONSTRAINT selections_event_id_fkey"
+    )
+    op.execute("DROP TABLE selections_unpartitioned")
+    op.execute("DROP TABLE events_unpartitioned")
+    _attach_sequences()
+
+    op.execute(
+        "ALTER TABLE events ADD CONSTRAINT events_pkey PRIMARY KEY (id, scheduled_start)"
+    )
+    op.execute(
+        "ALTER TABLE events ADD CONSTRAINT events_slug_key "
+        "UNIQUE (slug, scheduled_start)"
+    )
+    op.execute(
+        "ALTER TABLE events ADD CONSTRAINT events_sport_id_fkey "
+        "FOREIGN KEY (sport_id) REFERENCES sports(id)"
+    )
+    op.execute(
+        "ALTER TABLE selections ADD CONSTRAINT selections_pkey "
+        "PRIMARY KEY (id, event_start)"
+    )
+    # Deferred because, before Postgres 15, moving an event to another
+    # partition runs the delete action instead of an update cascade; the
+    # repository moves its selections in the same transaction
+    op.execute("""
+        ALTER TABLE selections ADD CONSTRAINT selections_event_id_fkey
+        FOREIGN KEY (event_id, event_start) REFERENCES events(id, scheduled_start)
+        DEFERRABLE INITIALLY DEFERRED
+        """)
+
+    op.create_index("ix_events_sport_id", "events", ["sport_id"])
+    op.create_index(
+        "ix_events_pending_scheduled_start",
+        "events",
+        ["scheduled_start"],
+        postgresql_where="status = 'pending'",
+    )
+    op.create_index(
+        "ix_events_active_selections_count", "events", ["active_selections_count"]
+    )
+    op.create_index("ix_selections_event_id", "selections", ["event_id", "event_start"])
+    _create_name_indexes("events")
+    _create_name_indexes("selections")
+    _create_count_triggers()
+
+
+def downgrade():
+    _detach_sequences()
+    op.execute("ALTER TABLE selections RENAME TO selections_partitioned")
+    op.execute("ALTER TABLE events RENAME TO events_partitioned")
+
+    op.execute("CREATE TABLE events (LIKE events_partitioned INCLUDING DEFAULTS)")
+    op.execute(
+        "CREATE TABLE selections (LIKE selections_partitioned INCLUDING DEFAULTS)"
+    )
+    op.execute("INSERT INTO events SELECT * FROM events_partitioned")
+    op.execute("INSERT INTO selections SELECT * FROM selections_partitioned")
+    op.execute("ALTER TABLE selections DROP COLUMN event_start")
+    # Their partitions are dropped with them
+    op.execute(
+        "ALTER TABLE selections_partitioned DROP CONSTRAINT selections_event_id_fkey"
+    )
+    op.execute("DROP TABLE selections_partitioned")
+    op.execute("DROP TABLE events_partitioned")
+    op.execute("DROP FUNCTION detach_time_partitions(timestamptz)")
+    op.execute("DROP FUNCTION ensure_time_partition(timestamptz)")
+    _attach_sequences()
+
+    op.execute("ALTER TABLE events ADD CONSTRAINT events_pkey PRIMARY KEY (id)")
+    op.execute("ALTER TABLE events ADD CONSTRAINT events_slug_key UNIQUE (slug)")
+    op.execute(
+        "ALTER TABLE events ADD CONSTRAINT events_sport_id_fkey "
+        "FOREIGN KEY (sport_id) REFERENCES sports(id)"
+    )
+    op.execute("ALTER TABLE selections ADD CONSTRAINT selections_pkey PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE selections ADD CONSTRAINT selections_event_id_fkey "
+        "FOREIGN KEY (event_id) REFERENCES events(id)"
+    )
+
+    op.create_index("ix_events_sport_id", "events", ["sport_id"])
+    op.create_index(
+        "ix_events_pending_scheduled_start",
+        "events",
+        ["scheduled_start"],
+        postgresql_where="status = 'pending'",
+    )
+    op.create_index(
+        "ix_events_active_selections_count", "events", ["active_selections_count"]
+    )
+    op.create_index("ix_selections_event_id", "selections", ["event_id"])
+    _create_name_indexes("events")
+    _create_name_indexes("selections")
+    _create_count_triggers()
@@ -0,0 +1,19 @@
+from alembic import op
+
+revision = "1792368600"
+down_revision = "1792368500"
+
+# The version is bumped by the application's UPDATE statements, not by a
+# trigger: Postgres 12 has no BEFORE ROW triggers on partitioned tables, and
+# the active count triggers must not bump it
+TABLES = ("sports", "events", "selections")
+
+
+def upgrade():
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN version integer NOT NULL DEFAULT 1")
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.execute(f"ALTER TABLE {table} DROP COLUMN version")
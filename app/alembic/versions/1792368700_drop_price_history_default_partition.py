@@ -0,0 +1,33 @@
+from alembic import op
+
+revision = "1792368700"
+down_revision = "1792368600"
+
+
+def upgrade():
+    # A month partition cannot be created while the DEFAULT partition holds
+    # rows of that month, so move them into their month partitions and drop
+    # it. Months are created ahead by the app and commands.maintain_partitions.
+    op.execute(
+        "ALTER TABLE selection_price_history "
+        "DETACH PARTITION selection_price_history_default"
+    )
+    op.execute("""
+        SELECT create_price_history_partition(month)
+        FROM (
+            SELECT DISTINCT date_trunc('month', ts)::date AS month
+            FROM selection_price_history_default
+        ) AS months
+        """)
+    op.execute("""
+        INSERT INTO selection_price_history (selection_id, ts, price)
+        SELECT selection_id, ts, price FROM selection_price_history_default
+        """)
+    op.execute("DROP TABLE selection_price_history_default")
+
+
+def downgrade():
+    op.execute("""
+        CREATE TABLE selection_price_history_default
+        PARTITION OF selection_price_history DEFAULT
+        """)
@@ -0,0 +1,144 @@
+from alembic import op
+
+revision = "1792368800"
+down_revision = "1792368700"
+
+# Child table -> (parent, foreign key, count column, partition key of the
+# parent and its copy on the child)
+COUNTS = {
+    "selections": (
+        "events",
+        "event_id",
+        "active_selections_count",
+        ("scheduled_start", "event_start"),
+    ),
+    "events": ("sports", "sport_id", "active_events_count", None),
+}
+
+# Operation -> the transition tables its trigger references
+OPERATIONS = {
+    "insert": "NEW TABLE AS new_rows",
+    "update": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "OLD TABLE AS old_rows",
+}
+
+
+def _deltas(foreign_key: str, partition, sides) -> str:
+    """
+    Aggregate the transition rows into one count change per parent.
+
+    Every row takes part, inactive ones with a zero delta, so the parent
+    partition key is known even when only inactive rows moved. A row of the
+    new table wins over an old one, as the parent was moved first.
+    """
+    start = f", {partition[1]}" if partition else ""
+    rows = " UNION ALL ".join(
+        f"SELECT {foreign_key}{start}, {side} AS side, "
+        f"CASE WHEN active THEN {sign} ELSE 0 END AS delta FROM {table}"
+        for table, side, sign in sides
+    )
+    parent_start = (
+        f", (array_agg({partition[1]} ORDER BY side DESC))[1] AS parent_start"
+        if partition
+        else ""
+    )
+    return (
+        f"SELECT {foreign_key} AS parent_id{parent_start}, sum(delta) AS delta "
+        f"FROM ({rows}) r WHERE {foreign_key} IS NOT NULL "
+        f"GROUP BY {foreign_key} HAVING sum(delta) <> 0"
+    )
+
+
+def _apply(parent: str, column: str, partition, deltas: str) -> str:
+    # Materialized, so it is computed once and not per target partition
+    match = f" AND p.{partition[0]} = d.parent_start" if partition else ""
+    return (
+        f"WITH d AS MATERIALIZED ({deltas}) "
+        f"UPDATE {parent} p SET {column} = p.{column} + d.delta::integer "
+        f"FROM d WHERE p.id = d.parent_id{match}"
+    )
+
+
+def _create_statement_triggers(child: str):
+    parent, foreign_key, column, partition = COUNTS[child]
+    inserted, deleted, updated = (
+        _apply(parent, column, partition, _deltas(foreign_key, partition, sides))
+        for sides in (
+            [("new_rows", 1, 1)],
+            [("old_rows", 0, -1)],
+            [("old_rows", 0, -1), ("new_rows", 1, 1)],
+        )
+    )
+    op.execute(f"""
+        CREATE FUNCTION maintain_{column}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {inserted};
+            ELSIF TG_OP = 'DELETE' THEN
+                {deleted};
+            ELSIF EXISTS (
+                SELECT 1 FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE o.active IS DISTINCT FROM n.active
+                   OR o.{foreign_key} IS DISTINCT FROM n.{foreign_key}
+            ) THEN
+                {updated};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """)
+    # Transition tables need one trigger per operation
+    for operation, tables in OPERATIONS.items():
+        op.execute(f"""
+            CREATE TRIGGER {child}_maintain_{column}_{operation}
+            AFTER {operation.upper()} ON {child}
+            REFERENCING {tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_{column}()
+            """)
+
+
+def _drop_statement_triggers(child: str):
+    column = COUNTS[child][2]
+    for operation in OPERATIONS:
+        op.execute(f"DROP TRIGGER {child}_maintain_{column}_{operation} ON {child}")
+    op.execute(f"DROP FUNCTION maintain_{column}()")
+
+
+def upgrade():
+    # One UPDATE per statement and parent table instead of one per changed
+    # row, so the set-based write paths stay set-based. Postgres 12 does not
+    # prune the target partitions of an UPDATE ... FROM, the partition key is
+    # matched so each partition is probed with its whole primary key.
+    for child in COUNTS:
+        op.execute(f"DROP TRIGGER {child}_maintain_{COUNTS[child][2]} ON {child}")
+        op.execute(f"DROP FUNCTION maintain_{COUNTS[child][2]}()")
+        _create_statement_triggers(child)
+
+
+def downgrade():
+    for child, (parent, foreign_key, column, _) in COUNTS.items():
+        _drop_statement_triggers(child)
+        op.execute(f"""
+            CREATE FUNCTION maintain_{column}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE'
+                   AND OLD.active IS NOT DISTINCT FROM NEW.active
+                   AND OLD.{foreign_key} = NEW.{foreign_key} THEN
+                    RETURN NULL;
+                END IF;
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.active THEN
+                    UPDATE {parent} SET {column} = {column} - 1
+                    WHERE id = OLD.{foreign_key};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.active THEN
+                    UPDATE {parent} SET {column} = {column} + 1
+                    WHERE id = NEW.{foreign_key};
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER {child}_maintain_{column}
+            AFTER INSERT OR DELETE OR UPDATE OF active, {foreign_key} ON {child}
+            FOR EACH ROW EXECUTE FUNCTION maintain_{column}();
+            """)
@@ -0,0 +1,123 @@
+from alembic import op
+
+revision = "1792368900"
+down_revision = "1792368800"
+
+# Postgres 12 only allows unique constraints including the partition key, so
+# events (slug, scheduled_start) is not enough to keep slugs globally unique.
+# The non-partitioned event_slugs table holds one row per live event slug,
+# written by statement-level triggers in the transaction of the event write: a
+# duplicate slug fails on its primary key. events_slug_key stays, as the
+# arbiter of the upserts.
+
+# Operation -> the transition tables its trigger references
+OPERATIONS = {
+    "insert": "NEW TABLE AS new_rows",
+    "update": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "OLD TABLE AS old_rows",
+}
+
+
+def _create_detach_time_partitions(release_slugs: bool):
+    # Detached events leave the live table, so they give their slugs back
+    release = (
+        """
+                    IF v_parent = 'events' THEN
+                        EXECUTE format(
+                            'DELETE FROM event_slugs s USING %I e '
+                            'WHERE s.event_id = e.id', v_child
+                        );
+                    END IF;"""
+        if release_slugs
+        else ""
+    )
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION detach_time_partitions(p_before timestamptz)
+        RETURNS SETOF text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_parent text;
+            v_child text;
+            v_constraint text;
+        BEGIN
+            CREATE SCHEMA IF NOT EXISTS archive;
+            FOREACH v_parent IN ARRAY ARRAY['selections', 'events'] LOOP
+                FOR v_child IN
+                    SELECT c.relname
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = v_parent::regclass
+                      AND c.relname ~ ('^' || v_parent || '_p[0-9]{{6}}$')
+                      AND (to_date(right(c.relname, 6), 'YYYYMM') + interval '1 month')
+                          AT TIME ZONE 'UTC' <= p_before
+                    ORDER BY c.relname
+                LOOP
+                    EXECUTE format(
+                        'ALTER TABLE %I DETACH PARTITION %I', v_parent, v_child
+                    );{release}
+                    FOR v_constraint IN
+                        SELECT conname FROM pg_constraint
+                        WHERE conrelid = v_child::regclass AND contype = 'f'
+                    LOOP
+                        EXECUTE format(
+                            'ALTER TABLE %I DROP CONSTRAINT %I', v_child, v_constraint
+                        );
+                    END LOOP;
+                    EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_child);
+                    RETURN NEXT 'archive.' || v_child;
+                END LOOP;
+            END LOOP;
+        END;
+        $$
+        """)
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE event_slugs (
+            slug varchar PRIMARY KEY,
+            event_id integer NOT NULL UNIQUE
+        )
+        """)
+    # Fails, naming the slug, if events already share one
+    op.execute("INSERT INTO event_slugs (slug, event_id) SELECT slug, id FROM events")
+
+    op.execute("""
+        CREATE FUNCTION maintain_event_slugs() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO event_slugs (slug, event_id)
+                SELECT slug, id FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                DELETE FROM event_slugs s USING old_rows o
+                WHERE s.slug = o.slug AND s.event_id = o.id;
+            ELSE
+                -- Removed before added, so a statement can swap two slugs
+                DELETE FROM event_slugs s
+                USING old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE o.slug <> n.slug AND s.slug = o.slug AND s.event_id = o.id;
+                INSERT INTO event_slugs (slug, event_id)
+                SELECT n.slug, n.id FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE o.slug <> n.slug;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """)
+    for operation, tables in OPERATIONS.items():
+        op.execute(f"""
+            CREATE TRIGGER events_maintain_slugs_{operation}
+            AFTER {operation.upper()} ON events
+            REFERENCING {tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION maintain_event_slugs()
+            """)
+
+    _create_detach_time_partitions(release_slugs=True)
+
+
+def downgrade():
+    _create_detach_time_partitions(release_slugs=False)
+    for operation in OPERATIONS:
+        op.execute(f"DROP TRIGGER events_maintain_slugs_{operation} ON events")
+    op.execute("DROP FUNCTION maintain_event_slugs()")
+    op.execute("DROP TABLE event_slugs")
@@ -0,0 +1,170 @@
+from alembic import op
+
+revision = "1792369000"
+down_revision = "1792368900"
+
+# Counters bumped by statement-level triggers whenever a statement changes
+# rows, so the HTTP validators read one row instead of aggregating a table.
+# sports and events have one counter each. The selections have one per event,
+# so concurrent writes to different events do not queue on a shared row. A
+# statement changing no row, such as an unchanged upsert, bumps nothing.
+TABLES = ("sports", "events")
+
+# Operation -> the transition tables its trigger references
+OPERATIONS = {
+    "insert": "NEW TABLE AS new_rows",
+    "update": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "OLD TABLE AS old_rows",
+}
+
+
+def _create_triggers(table: str, function: str):
+    # Transition tables need one trigger per operation
+    for operation, tables in OPERATIONS.items():
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_generation_{operation}
+            AFTER {operation.upper()} ON {table}
+            REFERENCING {tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """)
+
+
+def _create_detach_time_partitions(bump_generations: bool):
+    # Detaching removes rows without firing the triggers, so it bumps the
+    # counters of the parent table and of the events of detached selections
+    bump = (
+        """
+                    IF v_parent = 'events' THEN
+                        UPDATE table_generations SET generation = generation + 1
+                        WHERE table_name = 'events';
+                    ELSE
+                        EXECUTE format(
+                            'UPDATE event_selection_generations g '
+                            'SET generation = g.generation + 1 '
+                            'FROM (SELECT DISTINCT event_id FROM %I) s '
+                            'WHERE g.event_id = s.event_id', v_child
+                        );
+                    END IF;"""
+        if bump_generations
+        else ""
+    )
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION detach_time_partitions(p_before timestamptz)
+        RETURNS SETOF text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_parent text;
+            v_child text;
+            v_constraint text;
+        BEGIN
+            CREATE SCHEMA IF NOT EXISTS archive;
+            FOREACH v_parent IN ARRAY ARRAY['selections', 'events'] LOOP
+                FOR v_child IN
+                    SELECT c.relname
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = v_parent::regclass
+                      AND c.relname ~ ('^' || v_parent || '_p[0-9]{{6}}$')
+                      AND (to_date(right(c.relname, 6), 'YYYYMM') + interval '1 month')
+                          AT TIME ZONE 'UTC' <= p_before
+                    ORDER BY c.relname
+                LOOP
+                    EXECUTE format(
+                        'ALTER TABLE %I DETACH PARTITION %I', v_parent, v_child
+                    );
+                    IF v_parent = 'events' THEN
+                        EXECUTE format(
+                            'DELETE FROM event_slugs s USING %I e '
+                            'WHERE s.event_id = e.id', v_child
+                        );
+                    END IF;{bump}
+                    FOR v_constraint IN
+                        SELECT conname FROM pg_constraint
+                        WHERE conrelid = v_child::regclass AND contype = 'f'
+                    LOOP
+                        EXECUTE format(
+                            'ALTER TABLE %I DROP CONSTRAINT %I', v_child, v_constraint
+                        );
+                    END LOOP;
+                    EXECUTE format('ALTER TABLE %I SET SCHEMA archive', v_child);
+                    RETURN NEXT 'archive.' || v_child;
+                END LOOP;
+            END LOOP;
+        END;
+        $$
+        """)
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE table_generations (
+            table_name text PRIMARY KEY,
+            generation bigint NOT NULL DEFAULT 0
+        )
+        """)
+    op.execute(
+        "INSERT INTO table_generations (table_name) "
+        f"VALUES {', '.join(f'({table!r})' for table in TABLES)}"
+    )
+    op.execute("""
+        CREATE TABLE event_selection_generations (
+            event_id integer PRIMARY KEY,
+            generation bigint NOT NULL DEFAULT 0
+        )
+        """)
+
+    op.execute("""
+        CREATE FUNCTION bump_table_generation() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM 1 FROM old_rows LIMIT 1;
+            ELSE
+                PERFORM 1 FROM new_rows LIMIT 1;
+            END IF;
+            IF FOUND THEN
+                UPDATE table_generations SET generation = generation + 1
+                WHERE table_name = TG_TABLE_NAME;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """)
+    # A selection moved to another event changes both events' lists
+    op.execute("""
+        CREATE FUNCTION bump_event_selection_generations() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO event_selection_generations AS g (event_id, generation)
+                SELECT DISTINCT event_id, 1 FROM new_rows
+                ON CONFLICT (event_id) DO UPDATE SET generation = g.generation + 1;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO event_selection_generations AS g (event_id, generation)
+                SELECT DISTINCT event_id, 1 FROM old_rows
+                ON CONFLICT (event_id) DO UPDATE SET generation = g.generation + 1;
+            ELSE
+                INSERT INTO event_selection_generations AS g (event_id, generation)
+                SELECT event_id, 1 FROM old_rows
+                UNION SELECT event_id, 1 FROM new_rows
+                ON CONFLICT (event_id) DO UPDATE SET generation = g.generation + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """)
+
+    for table in TABLES:
+        _create_triggers(table, "bump_table_generation")
+    _create_triggers("selections", "bump_event_selection_generations")
+
+    _create_detach_time_partitions(bump_generations=True)
+
+
+def downgrade():
+    _create_detach_time_partitions(bump_generations=False)
+    for table in TABLES + ("selections",):
+        for operation in OPERATIONS:
+            op.execute(f"DROP TRIGGER {table}_bump_generation_{operation} ON {table}")
+    op.execute("DROP FUNCTION bump_event_selection_generations()")
+    op.execute("DROP FUNCTION bump_table_generation()")
+    op.execute("DROP TABLE event_selection_generations")
+    op.execute("DROP TABLE table_generations")
@@ -0,0 +1,65 @@
+from alembic import op
+
+revision = "1792369100"
+down_revision = "1792369000"
+
+# Statement-level triggers sending the ids of the changed rows on the
+# changed_rows channel when the transaction commits, so the in-memory copies
+# of every process see the writes of the others. The ids are chunked to stay
+# below the 8000 bytes NOTIFY payload limit.
+TABLES = ("sports", "events", "selections")
+IDS_PER_PAYLOAD = 500
+
+# Operation -> the transition tables its trigger references
+OPERATIONS = {
+    "insert": "NEW TABLE AS new_rows",
+    "update": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "OLD TABLE AS old_rows",
+}
+
+
+def _notify(rows: str) -> str:
+    return f"""
+                FOR v_ids IN
+                    SELECT array_agg(id) FROM (
+                        SELECT id, (row_number() OVER () - 1) / {IDS_PER_PAYLOAD} AS chunk
+                        FROM {rows}
+                    ) r GROUP BY chunk
+                LOOP
+                    PERFORM pg_notify('changed_rows', json_build_object(
+                        'table', TG_TABLE_NAME, 'ids', v_ids
+                    )::text);
+                END LOOP;"""
+
+
+def upgrade():
+    op.execute(f"""
+        CREATE FUNCTION notify_changed_rows() RETURNS trigger AS $$
+        DECLARE
+            v_ids integer[];
+        BEGIN
+            IF TG_OP = 'DELETE' THEN{_notify("old_rows")}
+            ELSE{_notify("new_rows")}
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        """)
+    # Transition tables need one trigger per operation
+    for table in TABLES:
+        for operation, tables in OPERATIONS.items():
+            op.execute(f"""
+                CREATE TRIGGER {table}_notify_changed_rows_{operation}
+                AFTER {operation.upper()} ON {table}
+                REFERENCING {tables}
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_changed_rows()
+                """)
+
+
+def downgrade():
+    for table in TABLES:
+        for operation in OPERATIONS:
+            op.execute(
+                f"DROP TRIGGER {table}_notify_changed_rows_{operation} ON {table}"
+            )
+    op.execute("DROP FUNCTION notify_changed_rows()")
@@ -0,0 +1,62 @@
+from alembic import op
+
+revision = "1792369200"
+down_revision = "1792369100"
+
+# The primary keys of the partitioned tables include their partition key, so
+# nothing kept an id unique on its own. As event_slugs does for slugs, the
+# non-partitioned event_ids and selection_ids tables hold one row per id,
+# written by statement-level triggers in the transaction of the write: a
+# duplicate id fails on their primary key. Moving a row to another partition
+# keeps its id and leaves them unchanged. The ids of detached partitions stay
+# registered, so an archived id is not reused either.
+GUARDS = {"events": "event_ids", "selections": "selection_ids"}
+
+# Operation -> the transition tables its trigger references
+OPERATIONS = {
+    "insert": "NEW TABLE AS new_rows",
+    "update": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "OLD TABLE AS old_rows",
+}
+
+
+def upgrade():
+    for table, guard in GUARDS.items():
+        op.execute(f"CREATE TABLE {guard} (id integer PRIMARY KEY)")
+        # Fails, naming the id, if rows already share one
+        op.execute(f"INSERT INTO {guard} (id) SELECT id FROM {table}")
+
+        op.execute(f"""
+            CREATE FUNCTION maintain_{guard}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO {guard} (id) SELECT id FROM new_rows;
+                ELSIF TG_OP = 'DELETE' THEN
+                    DELETE FROM {guard} g USING old_rows o WHERE g.id = o.id;
+                ELSE
+                    -- Released before registered, so a statement can swap ids
+                    DELETE FROM {guard} g USING (
+                        SELECT id FROM old_rows EXCEPT SELECT id FROM new_rows
+                    ) o WHERE g.id = o.id;
+                    INSERT INTO {guard} (id)
+                    SELECT id FROM new_rows EXCEPT SELECT id FROM old_rows;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql;
+            """)
+        for operation, tables in OPERATIONS.items():
+            op.execute(f"""
+                CREATE TRIGGER {table}_maintain_ids_{operation}
+                AFTER {operation.upper()} ON {table}
+                REFERENCING {tables}
+                FOR EACH STATEMENT EXECUTE FUNCTION maintain_{guard}()
+                """)
+
+
+def downgrade():
+    for table, guard in GUARDS.items():
+        for operation in OPERATIONS:
+            op.execute(f"DROP TRIGGER {table}_maintain_ids_{operation} ON {table}")
+        op.execute(f"DROP FUNCTION maintain_{guard}()")
+        op.execute(f"DROP TABLE {guard}")
@@ -11,22 +11,48 @@ Dependencies:
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException
-from schemas import EventBase, EventUpdate, Filters
-from utils.dependencies import get_event_service, get_logger
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from schemas import (
+    BulkSettlement,
+    EventBase,
+    EventBulkUpsert,
+    EventSettlement,
+    EventUpdate,
+    Filters,
+)
+from utils.dependencies import get_event_service, get_market_service, get_logger
 from services.event_service import EventService
+from services.market_service import MarketService
+from db.database import StatementTimeoutError
+from utils.custom_exceptions import ValidationError, VersionConflictError
+from utils.etags import parse_if_match, version_etag
+from utils.http_cache import CACHE_MAX_AGE, conditional_get
+from utils.upsert_sql import UPSERT_STATUSES
 
 events_router = APIRouter()
 
 
 @events_router.get("/events/")
 async def get_all_events(
+    request: Request,
+    response: Response,
+    include_archived: bool = False,
+    fields: Optional[str] = None,
     service: EventService = Depends(get_event_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info("Fetching all events...")
-        return await service.get_all()
+        not_modified = conditional_get(
+            request, response, await service.get_validator(), CACHE_MAX_AGE["events"]
+        )
+        if not_modified is not None:
+            return not_modified
+        return await service.get_all(include_archived, fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching events: {e}")
         raise HTTPException(
@@ -50,17 +76,81 @@ async def create_event(
         )
 
 
+@events_router.post("/events/upsert")
+async def upsert_event(
+    event: EventBase,
+    response: Response,
+    service: EventService = Depends(get_event_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Upserting event {event.name}...")
+        [result] = await service.upsert_many([event.dict()])
+        if result["status"] == "created":
+            response.status_code = 201
+        response.headers["ETag"] = version_etag(result["row"]["version"])
+        return result["row"]
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error upserting event: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error upserting event."
+        )
+
+
+@events_router.post("/events/upsert/bulk")
+async def upsert_events(
+    bulk: EventBulkUpsert,
+    service: EventService = Depends(get_event_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Upserting {len(bulk.events)} events...")
+        results = await service.upsert_many([event.dict() for event in bulk.events])
+        counts = {status: 0 for status in UPSERT_STATUSES}
+        for result in results:
+            counts[result["status"]] += 1
+        return {
+            **counts,
+            "events": [
+                {
+                    "id": result["row"]["id"],
+                    "slug": result["row"]["slug"],
+                    "scheduled_start": result["row"]["scheduled_start"],
+                    "status": result["status"],
+                }
+                for result in results
+            ],
+        }
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error upserting events: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error upserting events."
+        )
+
+
 @events_router.put("/events/{event_id}")
 async def update_event(
     event_id: int,
     event: EventUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     service: EventService = Depends(get_event_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info(f"Updating event with ID {event_id}...")
-        updated_event = await service.update(event_id, event.dict())
+        updated_event = await service.update(
+            event_id, event.dict(), parse_if_match(if_match)
+        )
+        if updated_event:
+            response.headers["ETag"] = version_etag(updated_event["version"])
         return updated_event
+    except VersionConflictError as ve:
+        raise HTTPException(status_code=412, detail=str(ve))
     except Exception as e:
         logger.error(f"Error updating event {event_id}: {e}")
         raise HTTPException(
@@ -68,17 +158,138 @@ async def update_event(
         )
 
 
+@events_router.post("/events/settle")
+async def settle_events(
+    bulk: BulkSettlement,
+    service: EventService = Depends(get_event_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Settling {len(bulk.settlements)} events...")
+        result = await service.settle_many(
+            [settlement.dict() for settlement in bulk.settlements]
+        )
+        return {
+            "events": len(result["events"]),
+            "selections": len(result["selections"]),
+        }
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error settling events: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error settling events."
+        )
+
+
+@events_router.post("/events/{event_id}/settle")
+async def settle_event(
+    event_id: int,
+    settlement: EventSettlement,
+    service: EventService = Depends(get_event_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Settling event with ID {event_id}...")
+        return await service.settle(event_id, settlement.dict())
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error settling event {event_id}: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Internal server error settling event {event_id}."
+        )
+
+
+@events_router.post("/events/{event_id}/suspend")
+async def suspend_event_markets(
+    event_id: int,
+    service: MarketService = Depends(get_market_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Suspending the markets of event {event_id}...")
+        return await service.set_markets_active("event", event_id, False)
+    except Exception as e:
+        logger.error(f"Error suspending the markets of event {event_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error suspending the markets of event {event_id}.",
+        )
+
+
+@events_router.post("/events/{event_id}/resume")
+async def resume_event_markets(
+    event_id: int,
+    service: MarketService = Depends(get_market_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Resuming the markets of event {event_id}...")
+        return await service.set_markets_active("event", event_id, True)
+    except Exception as e:
+        logger.error(f"Error resuming the markets of event {event_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error resuming the markets of event {event_id}.",
+        )
+
+
 @events_router.post("/events/filters/")
 async def filter_events(
     criteria: Filters,
+    fields: Optional[str] = None,
     service: EventService = Depends(get_event_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info("Filter for events based on given criteria...")
-        return await service.filter_events(criteria.dict())
+        return await service.filter_events(criteria.dict(), fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except StatementTimeoutError:
+        raise HTTPException(
+            status_code=503, detail="name_regex exceeded the query time budget."
+        )
     except Exception as e:
         logger.error(f"Error searching for events: {e}")
         raise HTTPException(
             status_code=500, detail="Internal server error searching for events."
         )
+
+
+@events_router.get("/events/market-stats")
+async def get_market_stats(
+    service: MarketService = Depends(get_market_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info("Computing market stats for all active events...")
+        return await service.get_market_stats()
+    except Exception as e:
+        logger.error(f"Error computing market stats: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error computing market stats."
+        )
+
+
+@events_router.get("/events/{event_id}/market-stats")
+async def get_event_market_stats(
+    event_id: int,
+    service: MarketService = Depends(get_market_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Computing market stats for event {event_id}...")
+        stats = await service.get_event_market_stats(event_id)
+    except Exception as e:
+        logger.error(f"Error computing market stats for event {event_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error computing market stats for event {event_id}.",
+        )
+    if stats is None:
+        raise HTTPException(
+            status_code=404, detail=f"No active priced selections for event {event_id}."
+        )
+    return stats
@@ -0,0 +1,24 @@
+"""
+health_router module.
+
+Liveness and readiness probes. Liveness answers as soon as the process serves
+HTTP; readiness only flips once the database pool is warm.
+"""
+
+from fastapi import APIRouter, Response
+from db.database import is_db_ready
+
+health_router = APIRouter()
+
+
+@health_router.get("/health/live")
+async def live():
+    return {"status": "ok"}
+
+
+@health_router.get("/health/ready")
+async def ready(response: Response):
+    if not is_db_ready():
+        response.status_code = 503
+        return {"status": "starting"}
+    return {"status": "ready"}
@@ -0,0 +1,15 @@
+"""
+metrics_router module.
+
+Exposes the in-process counters and summaries of this worker.
+"""
+
+from fastapi import APIRouter
+from utils.metrics import get_metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics")
+async def get_all_metrics():
+    return get_metrics().snapshot()
@@ -0,0 +1,42 @@
+"""
+routers module.
+
+Single place where the v1 API routers are registered, so the application can
+include them eagerly at import time or build them lazily on first use.
+"""
+
+from fastapi import FastAPI
+
+
+def include_routers(app: FastAPI, prefix: str = "/api/v1"):
+    """
+    Include every v1 router into the given application.
+
+    Args:
+        app (FastAPI): The application receiving the routers.
+        prefix (str): The path prefix for the routes.
+    """
+    from api.v1.events.routes import events_router
+    from api.v1.sports.routes import sports_router
+    from api.v1.selections.routes import selections_router
+    from api.v1.metrics.routes import metrics_router
+    from api.v1.search.routes import search_router
+
+    app.include_router(sports_router, prefix=prefix, tags=["sports"])
+    app.include_router(events_router, prefix=prefix, tags=["events"])
+    app.include_router(selections_router, prefix=prefix, tags=["selections"])
+    app.include_router(search_router, prefix=prefix, tags=["search"])
+    app.include_router(metrics_router, prefix=prefix, tags=["metrics"])
+
+
+def create_api() -> FastAPI:
+    """
+    Build a standalone application holding the v1 routers, to be mounted
+    under "/api/v1".
+
+    Returns:
+        FastAPI: The v1 API application.
+    """
+    api = FastAPI()
+    include_routers(api, prefix="")
+    return api
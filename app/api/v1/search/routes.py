@@ -0,0 +1,47 @@
+"""
+search_router module.
+
+This module provides the search endpoints shared by sports, events and
+selections.
+"""
+
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query
+from schemas import SearchCriteria
+from services.search_service import SearchService
+from utils.custom_exceptions import ValidationError
+from utils.dependencies import get_search_service, get_logger
+
+search_router = APIRouter()
+
+
+@search_router.post("/search/")
+async def search(
+    criteria: SearchCriteria,
+    service: SearchService = Depends(get_search_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info("Searching across sports, events and selections...")
+        return await service.search(criteria.dict())
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error searching: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error searching.")
+
+
+@search_router.get("/search/autocomplete")
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    service: SearchService = Depends(get_search_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        return await service.autocomplete(q, limit)
+    except Exception as e:
+        logger.error(f"Error autocompleting '{q}': {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error searching names."
+        )
@@ -11,23 +11,43 @@ Dependencies:
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from schemas import SelectionBase, SelectionUpdate, SelectionFilter
 from services.selection_service import SelectionService
-from utils.custom_exceptions import CreationError, ValidationError, ForeignKeyError
-from utils.dependencies import get_selection_service, get_logger
+from db.database import StatementTimeoutError
+from services.price_history_service import PriceHistoryService
+from utils.custom_exceptions import (
+    CreationError,
+    ValidationError,
+    ForeignKeyError,
+    VersionConflictError,
+)
+from utils.etags import parse_if_match, version_etag
+from utils.http_cache import CACHE_MAX_AGE, conditional_get
+from utils.dependencies import (
+    get_selection_service,
+    get_price_history_service,
+    get_logger,
+)
 
 selections_router = APIRouter()
 
 
 @selections_router.get("/selections/")
 async def get_all_selections(
+    fields: Optional[str] = None,
     service: SelectionService = Depends(get_selection_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info("Fetching all selections...")
-        return await service.get_all()
+        return await service.get_all(fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching selections: {e}")
         raise HTTPException(
@@ -61,15 +81,22 @@ async def create_selection(
 async def update_selection(
     selection_id: int,
     selection: SelectionUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     service: SelectionService = Depends(get_selection_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info(f"Updating selection with ID {selection_id}...")
-        updated_selection = await service.update(selection_id, selection.dict())
+        updated_selection = await service.update(
+            selection_id, selection.dict(), parse_if_match(if_match)
+        )
         if not updated_selection:
             raise ValueError("Updated selection is None or not found")
+        response.headers["ETag"] = version_etag(updated_selection["version"])
         return updated_selection
+    except VersionConflictError as ve:
+        raise HTTPException(status_code=412, detail=str(ve))
     except ForeignKeyError as fe:
         logger.error(f"Foreign key error: {fe}")
         raise HTTPException(status_code=400, detail=str(fe))
@@ -84,12 +111,25 @@ async def update_selection(
 @selections_router.get("/selections/event/{event_id}")
 async def get_selections_by_event_id(
     event_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
     service: SelectionService = Depends(get_selection_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info(f"Get selection with event ID {event_id}...")
-        return await service.get_selections_by_event_id(event_id)
+        not_modified = conditional_get(
+            request,
+            response,
+            await service.get_validator_by_event_id(event_id),
+            CACHE_MAX_AGE["selections"],
+        )
+        if not_modified is not None:
+            return not_modified
+        return await service.get_selections_by_event_id(event_id, fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching selections with event ID {event_id} - {e}")
         raise HTTPException(
@@ -101,12 +141,15 @@ async def get_selections_by_event_id(
 @selections_router.get("/selections/sport/{sport_id}")
 async def get_selections_by_sport_id(
     sport_id: int,
+    fields: Optional[str] = None,
     service: SelectionService = Depends(get_selection_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info(f"Get selection with sport ID {sport_id}...")
-        return await service.get_selections_by_sport_id(sport_id)
+        return await service.get_selections_by_sport_id(sport_id, fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching selections with sport ID {sport_id} - {e}")
         raise HTTPException(
@@ -118,14 +161,63 @@ async def get_selections_by_sport_id(
 @selections_router.post("/selections/filter/")
 async def filter_selections(
     criteria: SelectionFilter,
+    fields: Optional[str] = None,
     service: SelectionService = Depends(get_selection_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info("Filtering for selections")
-        return await service.filter_selections(criteria.dict())
+        return await service.filter_selections(criteria.dict(), fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except StatementTimeoutError:
+        raise HTTPException(
+            status_code=503, detail="name_regex exceeded the query time budget."
+        )
     except Exception as e:
         logger.error(f"Error searching for selections: {e}")
         raise HTTPException(
             status_code=500, detail="Internal server error searching for selections."
         )
+
+
+@selections_router.get("/selections/{selection_id}/history")
+async def get_selection_price_history(
+    selection_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    service: PriceHistoryService = Depends(get_price_history_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    logger.info(f"Streaming price history of selection {selection_id}...")
+    # Checked before the stream starts, as its headers go out with the 200
+    try:
+        start, end = service.time_range(start, end)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    return StreamingResponse(
+        service.stream_history(selection_id, start, end),
+        media_type="application/x-ndjson",
+    )
+
+
+@selections_router.get("/selections/{selection_id}/history/ohlc")
+async def get_selection_price_ohlc(
+    selection_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: str = "minute",
+    service: PriceHistoryService = Depends(get_price_history_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Fetching OHLC of selection {selection_id}...")
+        return await service.get_ohlc(selection_id, start, end, interval)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error fetching OHLC of selection {selection_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error fetching OHLC of selection {selection_id}.",
+        )
@@ -1,23 +1,43 @@
 import logging
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from schemas import SportBase, SportUpdate, Filters
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from schemas import SportBase, SportBulkUpsert, SportUpdate, Filters
+from services.market_service import MarketService
 from services.sport_service import SportService
-from utils.dependencies import get_sport_service, get_logger
+from db.database import StatementTimeoutError
+from utils.custom_exceptions import (
+    UpdateError,
+    ValidationError,
+    VersionConflictError,
+)
+from utils.dependencies import get_market_service, get_sport_service, get_logger
+from utils.etags import parse_if_match, version_etag
+from utils.http_cache import CACHE_MAX_AGE, conditional_get
 from utils.slugify import to_slug
-
+from utils.upsert_sql import UPSERT_STATUSES
 
 sports_router = APIRouter()
 
 
 @sports_router.get("/sports/")
 async def get_all_sports(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
     service: SportService = Depends(get_sport_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info("Fetching all sports...")
-        return await service.get_all()
+        not_modified = conditional_get(
+            request, response, await service.get_validator(), CACHE_MAX_AGE["sports"]
+        )
+        if not_modified is not None:
+            return not_modified
+        return await service.get_all(fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         logger.error(f"Error fetching sports: {e}")
         raise HTTPException(
@@ -41,19 +61,78 @@ async def create_sport(
         )
 
 
+@sports_router.post("/sports/upsert")
+async def upsert_sport(
+    sport: SportBase,
+    response: Response,
+    service: SportService = Depends(get_sport_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Upserting sport {sport.name}...")
+        [result] = await service.upsert_many([sport.dict()])
+        if result["status"] == "created":
+            response.status_code = 201
+        response.headers["ETag"] = version_etag(result["row"]["version"])
+        return result["row"]
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error upserting sport: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error upserting sport."
+        )
+
+
+@sports_router.post("/sports/upsert/bulk")
+async def upsert_sports(
+    bulk: SportBulkUpsert,
+    service: SportService = Depends(get_sport_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Upserting {len(bulk.sports)} sports...")
+        results = await service.upsert_many([sport.dict() for sport in bulk.sports])
+        counts = {status: 0 for status in UPSERT_STATUSES}
+        for result in results:
+            counts[result["status"]] += 1
+        return {
+            **counts,
+            "ids": {result["row"]["slug"]: result["row"]["id"] for result in results},
+        }
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error upserting sports: {e}")
+        raise HTTPException(
+            status_code=500, detail="Internal server error upserting sports."
+        )
+
+
 @sports_router.put("/sports/{sport_id}")
 async def updating_sport(
     sport_id: int,
     sport: SportUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     service: SportService = Depends(get_sport_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     try:
         logger.info(f"Updating sport with ID {sport_id}...")
-        updated_sport = await service.update(sport_id, sport.dict())
+        updated_sport = await service.update(
+            sport_id, sport.dict(), parse_if_match(if_match)
+        )
         if not updated_sport:
             raise HTTPException(status_code=404, detail="Sport not found")
+        response.headers["ETag"] = version_etag(updated_sport["version"])
         return updated_sport
+    except HTTPException:
+        raise
+    except VersionConflictError as ve:
+        raise HTTPException(status_code=412, detail=str(ve))
+    except UpdateError as ue:
+        raise HTTPException(status_code=404, detail=str(ue))
     except Exception as e:
         logger.error(f"Error updating sport {sport_id}: {e}")
         raise HTTPException(
@@ -61,15 +140,57 @@ async def updating_sport(
         )
 
 
+@sports_router.post("/sports/{sport_id}/suspend")
+async def suspend_sport_markets(
+    sport_id: int,
+    service: MarketService = Depends(get_market_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Suspending the markets of sport {sport_id}...")
+        return await service.set_markets_active("sport", sport_id, False)
+    except Exception as e:
+        logger.error(f"Error suspending the markets of sport {sport_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error suspending the markets of sport {sport_id}.",
+        )
+
+
+@sports_router.post("/sports/{sport_id}/resume")
+async def resume_sport_markets(
+    sport_id: int,
+    service: MarketService = Depends(get_market_service),
+    logger: logging.Logger = Depends(get_logger),
+):
+    try:
+        logger.info(f"Resuming the markets of sport {sport_id}...")
+        return await service.set_markets_active("sport", sport_id, True)
+    except Exception as e:
+        logger.error(f"Error resuming the markets of sport {sport_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error resuming the markets of sport {sport_id}.",
+        )
+
+
 @sports_router.post("/sports/filters/")
 async def filter_sports(
     criteria: Filters,
+    fields: Optional[str] = None,
     service: SportService = Depends(get_sport_service),
     logger: logging.Logger = Depends(get_logger),
 ):
     # try:
     # logger.info("Filter for sports based on given criteria...")
-    return await service.filter_sports(criteria.dict())
+    try:
+        return await service.filter_sports(criteria.dict(), fields)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    except StatementTimeoutError:
+        raise HTTPException(
+            status_code=503, detail="name_regex exceeded the query time budget."
+        )
     # except Exception as e:
     # logger.error(f"Error searching for sports: {e}")
     # raise HTTPException(
@@ -0,0 +1,219 @@
+"""
+Move ended or cancelled events whose selections are all settled out of the
+database, into gzipped NDJSON files under ARCHIVE_DIR.
+
+Each batch of events is locked, streamed with its selections through a
+server-side cursor into the archive files, then deleted, in one repeatable
+read transaction. The files are complete on disk before the transaction
+commits and are removed if it fails, so a row is never lost; a crash between
+the two can at worst leave it both archived and live, and the read path
+prefers the live copy.
+
+Each batch also sends the IDs of its rows on the "archived_rows" channel, at
+commit, so that running applications drop them from their catalog, name index
+and price store.
+
+A batch failing with a serialization error, because one of its rows was
+updated concurrently, is retried a few times and then skipped for this run.
+
+Usage (from app/):
+    python -m commands.archive_settled [--batch-size 500] [--older-than-days 7]
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from asyncpg.exceptions import SerializationError
+
+from db.archive_feed import ARCHIVE_CHANNEL, archive_payloads
+from db.archive_store import ArchiveStore, get_archive_store
+from db.database import close_db_connection, connect_to_db, get_db_pool
+
+logger = logging.getLogger(__name__)
+
+SETTLED_OUTCOMES = ("win", "lose", "void")
+
+SERIALIZATION_RETRIES = 3
+
+ARCHIVABLE = """
+    FROM events e
+    WHERE e.status IN ('ended', 'cancelled')
+      AND e.scheduled_start < $3
+      AND e.id > $1
+      AND NOT EXISTS (
+          SELECT 1 FROM selections s
+          WHERE s.event_id = e.id AND s.event_start = e.scheduled_start
+            AND s.outcome <> ALL($4::selectionoutcome[])
+      )
+    ORDER BY e.id
+    LIMIT $2
+"""
+
+# Locked with SKIP LOCKED so that events being edited are left for a later run
+ARCHIVABLE_EVENTS = f"SELECT * {ARCHIVABLE} FOR UPDATE SKIP LOCKED"
+
+# The last event of a batch, read without locking to skip that batch
+LAST_ARCHIVABLE_ID = f"SELECT max(id) FROM (SELECT e.id {ARCHIVABLE}) batch"
+
+SELECTIONS_OF_EVENTS = """
+    SELECT * FROM selections
+    WHERE event_id = ANY($1::int[]) AND event_start = ANY($2::timestamptz[])
+    ORDER BY event_id, id
+"""
+
+
+async def archive_batch(
+    connection, store: ArchiveStore, after_id: int, batch_size: int, cutoff: datetime
+) -> Optional[Dict[str, int]]:
+    """
+    Archive and delete one batch of settled events and their selections.
+
+    Args:
+        connection (asyncpg.Connection): The connection to use.
+        store (ArchiveStore): Where the rows are written.
+        after_id (int): Only events with a greater ID are considered.
+        batch_size (int): The maximum number of events in the batch.
+        cutoff (datetime): Only events scheduled before it are considered.
+
+    Returns:
+        Optional[Dict[str, int]]: The number of archived rows per table and the
+                                  last event ID under "last_id", or None when
+                                  no event is left.
+    """
+    batch = store.open_batch()
+    try:
+        async with connection.transaction(isolation="repeatable_read"):
+            events = await connection.fetch(
+                ARCHIVABLE_EVENTS, after_id, batch_size, cutoff, SETTLED_OUTCOMES
+            )
+            if not events:
+                return None
+            ids = [event["id"] for event in events]
+            starts = list({event["scheduled_start"] for event in events})
+
+            for event in events:
+                batch.write("events", dict(event))
+            selection_ids = []
+            async for row in connection.cursor(
+                SELECTIONS_OF_EVENTS, ids, starts, prefetch=batch_size
+            ):
+                batch.write("selections", dict(row))
+                selection_ids.append(row["id"])
+
+            await connection.execute(
+                "DELETE FROM selections "
+                "WHERE event_id = ANY($1::int[]) AND event_start = ANY($2::timestamptz[])",
+                ids,
+                starts,
+            )
+            await connection.execute(
+                "DELETE FROM events "
+                "WHERE id = ANY($1::int[]) AND scheduled_start = ANY($2::timestamptz[])",
+                ids,
+                starts,
+            )
+            # Delivered to the listeners when the transaction commits
+            for payload in archive_payloads(ids, selection_ids):
+                await connection.execute(
+                    "SELECT pg_notify($1, $2)", ARCHIVE_CHANNEL, payload
+                )
+            batch.close()
+    except BaseException:
+        batch.discard()
+        raise
+
+    return {
+        "events": batch.counts.get("events", 0),
+        "selections": batch.counts.get("selections", 0),
+        "last_id": ids[-1],
+    }
+
+
+async def archive_settled(
+    db_pool,
+    store: Optional[ArchiveStore] = None,
+    batch_size: int = 500,
+    older_than_days: int = 7,
+) -> Dict[str, int]:
+    """
+    Archive every settled event, batch by batch.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        store (Optional[ArchiveStore]): Where the rows are written, by default
+                                        the store under ARCHIVE_DIR.
+        batch_size (int): The number of events per transaction.
+        older_than_days (int): Keep events scheduled more recently than this.
+
+    Returns:
+        Dict[str, int]: The number of archived "events" and "selections".
+    """
+    store = store or get_archive_store()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    totals = {"events": 0, "selections": 0}
+    after_id = 0
+
+    async with db_pool.acquire() as connection:
+        while True:
+            for attempt in range(1, SERIALIZATION_RETRIES + 1):
+                try:
+                    archived = await archive_batch(
+                        connection, store, after_id, batch_size, cutoff
+                    )
+                    break
+                except SerializationError as e:
+                    logger.warning(
+                        f"Batch after event ID {after_id} hit a concurrent update "
+                        f"(attempt {attempt}): {e}"
+                    )
+            else:
+                skipped = await connection.fetchval(
+                    LAST_ARCHIVABLE_ID, after_id, batch_size, cutoff, SETTLED_OUTCOMES
+                )
+                if skipped is None:
+                    break
+                logger.error(
+                    f"Skipped the events after ID {after_id} up to {skipped}, "
+                    "left for a later run"
+                )
+                after_id = skipped
+                continue
+            if archived is None:
+                break
+            after_id = archived["last_id"]
+            totals["events"] += archived["events"]
+            totals["selections"] += archived["selections"]
+            logger.info(
+                f"Archived {archived['events']} events and "
+                f"{archived['selections']} selections up to event ID {after_id}"
+            )
+    return totals
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--older-than-days", type=int, default=7)
+    args = parser.parse_args()
+
+    await connect_to_db()
+    try:
+        totals = await archive_settled(
+            get_db_pool(),
+            batch_size=args.batch_size,
+            older_than_days=args.older_than_days,
+        )
+        logger.info(
+            f"Archived {totals['events']} events and "
+            f"{totals['selections']} selections in total"
+        )
+    finally:
+        await close_db_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Create the monthly events, selections and price history partitions ahead of
+time and detach the old events and selections ones into the "archive" schema.
+
+Event and selection writes create the partition of their month on demand, so
+for them this only keeps the creation off the request path and bounds the size
+of the live tables. Price history months must exist before their ticks arrive,
+as the table has no DEFAULT partition. Run it daily from cron.
+
+Usage (from app/):
+    python -m commands.maintain_partitions [--months-ahead 12] [--retain-months 24]
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import List, Optional
+
+from db.database import close_db_connection, connect_to_db, get_db_pool
+from repositories.price_history_repository import PriceHistoryRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def maintain_partitions(
+    db_pool, months_ahead: int = 12, retain_months: Optional[int] = None
+) -> List[str]:
+    """
+    Ensure the partitions of the coming months and detach the expired ones.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        months_ahead (int): The number of future months to create.
+        retain_months (Optional[int]): The number of past months kept
+                                       attached, None to detach nothing.
+
+    Returns:
+        List[str]: The qualified names of the detached partitions.
+    """
+    await PriceHistoryRepository(db_pool, logger).ensure_partitions(months_ahead)
+    async with db_pool.acquire() as connection:
+        await connection.execute(
+            "SELECT ensure_time_partition(now() + make_interval(months => m)) "
+            "FROM generate_series(0, $1) AS m",
+            months_ahead,
+        )
+        if retain_months is None:
+            return []
+        async with connection.transaction():
+            rows = await connection.fetch(
+                "SELECT detach_time_partitions("
+                "date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' "
+                "- make_interval(months => $1)) AS name",
+                retain_months,
+            )
+    return [row["name"] for row in rows]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--months-ahead", type=int, default=12)
+    parser.add_argument("--retain-months", type=int, default=None)
+    args = parser.parse_args()
+
+    await connect_to_db()
+    try:
+        detached = await maintain_partitions(
+            get_db_pool(), args.months_ahead, args.retain_months
+        )
+        logger.info(
+            f"Partitions ensured {args.months_ahead} months ahead, "
+            f"{len(detached)} detached: {', '.join(detached) or '-'}"
+        )
+    finally:
+        await close_db_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""
+Recompute the denormalised active_events_count (sports) and
+active_selections_count (events) columns.
+
+The triggers keep them current; this repairs rows written while the triggers
+were disabled or restored from a dump.
+
+Usage (from app/):
+    python -m commands.repair_active_counts
+"""
+
+import asyncio
+import logging
+
+from db.database import close_db_connection, connect_to_db, get_db_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def repair_active_counts(db_pool) -> dict:
+    """
+    Recompute the active counts and fix the rows that drifted.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+
+    Returns:
+        dict: The number of fixed rows under "sports_fixed" and "events_fixed".
+    """
+    async with db_pool.acquire() as connection:
+        row = await connection.fetchrow("SELECT * FROM repair_active_counts()")
+    return dict(row)
+
+
+async def main():
+    await connect_to_db()
+    try:
+        fixed = await repair_active_counts(get_db_pool())
+        logger.info(
+            f"Repaired active counts: {fixed['sports_fixed']} sports, "
+            f"{fixed['events_fixed']} events"
+        )
+    finally:
+        await close_db_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
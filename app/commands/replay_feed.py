@@ -0,0 +1,421 @@
+"""
+Replay a recorded NDJSON feed of sport, event and selection writes and price
+ticks, against the services directly or a running API over HTTP, and report
+the throughput and latency.
+
+Each line is one operation:
+    {"ts": "2026-05-01T18:00:00+00:00", "entity": "sport", "op": "create",
+     "data": {"name": "Football", "active": true}}
+    {"entity": "event", "op": "update", "id": 12, "data": {"status": "started"}}
+    {"entity": "price", "id": 345, "data": {"price": 1.85}}
+
+"data" is validated with the request schemas of the API, and "ts" is only used
+with --speed. Sport and event creates are upserted in batches of consecutive
+lines, so a feed can be replayed more than once. A batch runs alone: the
+operations read before it complete first, and the ones after it start once it
+is written, so they can reference its rows. The other operations run on
+--concurrency workers, the ones on a same row in feed order. IDs are those of
+the target database, so replay against a restored copy of the recorded one.
+
+Usage (from app/):
+    python -m commands.replay_feed FILE [--target services|http]
+        [--base-url http://localhost:8000] [--concurrency 8] [--batch-size 500]
+        [--speed 1.0]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from itertools import count
+from typing import Dict, Iterable, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from db.database import close_db_connection, connect_to_db, get_db_pool
+from repositories.event_repository import EventRepository
+from repositories.selection_repository import SelectionRepository
+from repositories.sport_repository import SportRepository
+from schemas import (
+    EventBase,
+    EventUpdate,
+    SelectionBase,
+    SelectionUpdate,
+    SportBase,
+    SportUpdate,
+)
+from services.event_service import EventService
+from services.selection_service import SelectionService
+from services.sport_service import SportService
+
+logger = logging.getLogger(__name__)
+
+SCHEMAS = {
+    ("sport", "create"): SportBase,
+    ("sport", "update"): SportUpdate,
+    ("event", "create"): EventBase,
+    ("event", "update"): EventUpdate,
+    ("selection", "create"): SelectionBase,
+    ("selection", "update"): SelectionUpdate,
+    ("price", "update"): SelectionUpdate,
+}
+
+# Entities whose creates are batched into bulk upserts
+BATCHED = ("sport", "event")
+
+# Operations waiting per worker before reading the feed pauses
+QUEUE_SIZE = 100
+
+
+def parse_operation(line: str) -> dict:
+    """
+    Parse and validate one line of a feed.
+
+    Args:
+        line (str): The JSON operation.
+
+    Returns:
+        dict: The "entity", "op", "id", "ts" and validated "data" (a schema
+              instance) of the operation.
+
+    Raises:
+        ValueError: If the line is not a valid operation.
+    """
+    operation = json.loads(line)
+    if not isinstance(operation, dict):
+        raise ValueError("An operation must be a JSON object")
+    entity = operation.get("entity")
+    op = "update" if entity == "price" else operation.get("op")
+    schema = SCHEMAS.get((entity, op))
+    if schema is None:
+        raise ValueError(f"Unknown operation {op!r} on {entity!r}")
+    row_id = operation.get("id")
+    if op == "update" and (not isinstance(row_id, int) or isinstance(row_id, bool)):
+        raise ValueError(f"An {entity} update needs an integer id")
+    data = operation.get("data", {})
+    if not isinstance(data, dict):
+        raise ValueError("The data of an operation must be a JSON object")
+    if entity == "price" and data.get("price") is None:
+        raise ValueError("A price tick needs a price")
+    ts = operation.get("ts")
+    return {
+        "entity": entity,
+        "op": op,
+        "id": row_id,
+        "ts": datetime.fromisoformat(ts) if ts else None,
+        "data": schema(**data),
+    }
+
+
+class ServiceTarget:
+    """
+    Replays operations through the services, in this process.
+    """
+
+    def __init__(self, db_pool, logger: logging.Logger):
+        """
+        Initialize the ServiceTarget.
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+            logger (logging.Logger): The logger of the services.
+        """
+        self.db_pool = db_pool
+        self.logger = logger
+
+    def _service(self, entity: str):
+        # The repositories hold a stateful QueryBuilder, so, as for each API
+        # request in utils.dependencies, every operation gets its own
+        event_repository = EventRepository(self.db_pool, self.logger)
+        if entity == "sport":
+            return SportService(
+                SportRepository(self.db_pool, self.logger),
+                event_repository,
+                self.logger,
+            )
+        if entity == "event":
+            return EventService(event_repository, self.logger)
+        return SelectionService(
+            SelectionRepository(self.db_pool, self.logger),
+            event_repository,
+            self.logger,
+        )
+
+    async def upsert(self, entity: str, rows: List[BaseModel]):
+        await self._service(entity).upsert_many([row.dict() for row in rows])
+
+    async def create(self, entity: str, row: BaseModel):
+        await self._service(entity).create(row.dict())
+
+    async def update(self, entity: str, row_id: int, row: BaseModel):
+        await self._service(entity).update(row_id, row.dict())
+
+
+class HttpTarget:
+    """
+    Replays operations against a running API.
+    """
+
+    PATHS = {
+        "sport": "/api/v1/sports/",
+        "event": "/api/v1/events/",
+        "selection": "/api/v1/selections/",
+        "price": "/api/v1/selections/",
+    }
+
+    def __init__(self, client):
+        """
+        Initialize the HttpTarget.
+
+        Args:
+            client (httpx.AsyncClient): The client, with the API base URL.
+        """
+        self.client = client
+
+    async def upsert(self, entity: str, rows: List[BaseModel]):
+        response = await self.client.post(
+            f"{self.PATHS[entity]}upsert/bulk",
+            json={f"{entity}s": [jsonable_encoder(row) for row in rows]},
+        )
+        response.raise_for_status()
+
+    async def create(self, entity: str, row: BaseModel):
+        response = await self.client.post(
+            self.PATHS[entity], json=jsonable_encoder(row)
+        )
+        response.raise_for_status()
+
+    async def update(self, entity: str, row_id: int, row: BaseModel):
+        response = await self.client.put(
+            f"{self.PATHS[entity]}{row_id}",
+            json=jsonable_encoder(row, exclude_unset=True),
+        )
+        response.raise_for_status()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    # Nearest rank, values being sorted
+    return values[max(0, min(len(values) - 1, round(q * len(values)) - 1))]
+
+
+class ReplayStats:
+    """
+    Operation counts and call latencies of a replay.
+    """
+
+    def __init__(self):
+        self.operations: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.invalid = 0
+
+    def observe(self, kind: str, operations: int, seconds: float, failed: bool):
+        self.operations[kind] += operations
+        if failed:
+            self.errors[kind] += operations
+        self.latencies[kind].append(seconds)
+
+    def report(self, elapsed: float) -> dict:
+        """
+        Summarize the replay.
+
+        Args:
+            elapsed (float): The wall-clock duration of the replay, in seconds.
+
+        Returns:
+            dict: The operation and error counts, the throughput in operations
+                  per second and, per kind of call, the latency percentiles
+                  in milliseconds.
+        """
+        total = sum(self.operations.values())
+        latency = {}
+        for kind, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            latency[kind] = {
+                "calls": len(values),
+                "operations": self.operations[kind],
+                "errors": self.errors[kind],
+                **{
+                    name: round(_percentile(values, q) * 1000, 3)
+                    for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+                },
+                "max": round(values[-1] * 1000, 3),
+            }
+        return {
+            "operations": total,
+            "errors": sum(self.errors.values()),
+            "invalid": self.invalid,
+            "elapsed": round(elapsed, 3),
+            "throughput": round(total / elapsed, 1) if elapsed else None,
+            "latency": latency,
+        }
+
+
+async def _run(stats: ReplayStats, kind: str, operations: int, call):
+    started = time.perf_counter()
+    failed = False
+    try:
+        await call
+    except Exception as e:
+        failed = True
+        logger.warning(f"{kind} failed: {e}")
+    stats.observe(kind, operations, time.perf_counter() - started, failed)
+
+
+async def _work(queue: asyncio.Queue, target, stats: ReplayStats):
+    while True:
+        operation = await queue.get()
+        try:
+            kind = f"{operation['entity']}.{operation['op']}"
+            if operation["op"] == "create":
+                call = target.create(operation["entity"], operation["data"])
+            else:
+                call = target.update(
+                    operation["entity"], operation["id"], operation["data"]
+                )
+            await _run(stats, kind, 1, call)
+        finally:
+            queue.task_done()
+
+
+async def replay(
+    lines: Iterable[str],
+    target,
+    concurrency: int = 8,
+    batch_size: int = 500,
+    speed: Optional[float] = None,
+) -> dict:
+    """
+    Replay a feed against a target.
+
+    Args:
+        lines (Iterable[str]): The NDJSON lines of the feed.
+        target (Union[ServiceTarget, HttpTarget]): Where to send the operations.
+        concurrency (int): The number of operations in flight at once.
+        batch_size (int): The maximum number of creates per bulk upsert.
+        speed (Optional[float]): The replay speed relative to the "ts" of the
+                                 operations, 1 being real time; None replays
+                                 as fast as possible.
+
+    Returns:
+        dict: The report of ReplayStats.
+    """
+    stats = ReplayStats()
+    queues = [asyncio.Queue(maxsize=QUEUE_SIZE) for _ in range(concurrency)]
+    workers = [asyncio.create_task(_work(queue, target, stats)) for queue in queues]
+    creates = count()
+    batch: List[dict] = []
+    first_ts = None
+    started = time.perf_counter()
+
+    async def drain():
+        await asyncio.gather(*(queue.join() for queue in queues))
+
+    async def flush():
+        if not batch:
+            return
+        entity = batch[0]["entity"]
+        rows = [operation["data"] for operation in batch]
+        batch.clear()
+        await drain()
+        await _run(stats, f"{entity}.upsert", len(rows), target.upsert(entity, rows))
+
+    try:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                operation = parse_operation(line)
+            except (TypeError, ValueError) as e:
+                stats.invalid += 1
+                logger.warning(f"Line {number} skipped: {e}")
+                continue
+
+            if speed and operation["ts"]:
+                if first_ts is None:
+                    first_ts = operation["ts"]
+                due = (operation["ts"] - first_ts).total_seconds() / speed
+                delay = due - (time.perf_counter() - started)
+                if delay > 0:
+                    await flush()
+                    await asyncio.sleep(delay)
+
+            entity = operation["entity"]
+            if entity in BATCHED and operation["op"] == "create":
+                if batch and (batch[0]["entity"] != entity or len(batch) >= batch_size):
+                    await flush()
+                batch.append(operation)
+                continue
+
+            await flush()
+            # Operations on a same row share a worker, so they keep their order
+            if operation["op"] == "create":
+                key = next(creates)
+            else:
+                key = hash(
+                    ("selection" if entity == "price" else entity, operation["id"])
+                )
+            await queues[key % concurrency].put(operation)
+
+        await flush()
+        await drain()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    return stats.report(time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("file", help="The NDJSON feed, - for stdin")
+    parser.add_argument("--target", choices=("services", "http"), default="services")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--speed", type=float, default=None)
+    args = parser.parse_args()
+
+    feed = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    try:
+        if args.target == "http":
+            import httpx
+
+            async with httpx.AsyncClient(
+                base_url=args.base_url,
+                timeout=30,
+                limits=httpx.Limits(max_connections=args.concurrency + 1),
+            ) as client:
+                report = await replay(
+                    feed,
+                    HttpTarget(client),
+                    args.concurrency,
+                    args.batch_size,
+                    args.speed,
+                )
+        else:
+            await connect_to_db()
+            try:
+                report = await replay(
+                    feed,
+                    ServiceTarget(get_db_pool(), logger),
+                    args.concurrency,
+                    args.batch_size,
+                    args.speed,
+                )
+            finally:
+                await close_db_connection()
+    finally:
+        if feed is not sys.stdin:
+            feed.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
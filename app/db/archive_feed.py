@@ -0,0 +1,69 @@
+import json
+from typing import List
+
+from db.change_feed import publish_change
+from db.database import listen
+
+# Channel of the NOTIFY sent by commands.archive_settled for each batch
+ARCHIVE_CHANNEL = "archived_rows"
+
+# Below the 8000 bytes NOTIFY payload limit
+MAX_PAYLOAD_BYTES = 7000
+
+
+def archive_payloads(
+    events: List[int], selections: List[int], max_bytes: int = MAX_PAYLOAD_BYTES
+) -> List[str]:
+    """
+    Split the IDs of archived rows into NOTIFY payloads, selections first.
+
+    Args:
+        events (List[int]): The IDs of the archived events.
+        selections (List[int]): The IDs of their archived selections.
+        max_bytes (int): The maximum size of a payload.
+
+    Returns:
+        List[str]: JSON objects mapping "selections" or "events" to IDs.
+    """
+    payloads = []
+    for table, ids in (("selections", selections), ("events", events)):
+        chunk: List[int] = []
+        size = len(table) + 10
+        for row_id in ids:
+            length = len(str(row_id)) + 2
+            if chunk and size + length > max_bytes:
+                payloads.append(json.dumps({table: chunk}))
+                chunk, size = [], len(table) + 10
+            chunk.append(row_id)
+            size += length
+        if chunk:
+            payloads.append(json.dumps({table: chunk}))
+    return payloads
+
+
+def apply_archive_payload(payload: str):
+    """
+    Publish the deletion of archived rows on the change feed, so the catalog,
+    name index and price store of this process drop them.
+
+    Args:
+        payload (str): A payload built by archive_payloads.
+    """
+    for table, ids in json.loads(payload).items():
+        for row_id in ids:
+            publish_change(table, {"id": row_id}, None, deleted=True)
+
+
+async def listen_for_archived_rows(db_pool, check_interval: float = 5.0):
+    """
+    LISTEN on ARCHIVE_CHANNEL until cancelled.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        check_interval (float): Seconds between two checks of the connection.
+    """
+
+    async def on_payload(payload: str):
+        apply_archive_payload(payload)
+
+    await listen(db_pool, ARCHIVE_CHANNEL, on_payload, check_interval)
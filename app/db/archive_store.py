@@ -0,0 +1,186 @@
+import gzip
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, Iterator, List
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+# Decoded archived rows kept in memory, least recently read files evicted first
+ARCHIVE_CACHE_ROWS = int(os.getenv("ARCHIVE_CACHE_ROWS", "100000"))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot archive {type(value).__name__} values")
+
+
+class ArchiveStore:
+    """
+    Archived rows on local disk, as gzipped NDJSON files.
+
+    Each archived batch writes one immutable file per table, named
+    `<table>/part-<timestamp>-<sequence>.ndjson.gz`. A file is written under a
+    temporary name and renamed when complete, so readers never see a partial
+    batch. Files never change, so their decoded rows are cached, up to
+    cache_rows rows in total.
+    """
+
+    def __init__(
+        self, directory: str = ARCHIVE_DIR, cache_rows: int = ARCHIVE_CACHE_ROWS
+    ):
+        """
+        Initialize the ArchiveStore.
+
+        Args:
+            directory (str): The root directory of the archive.
+            cache_rows (int): The number of decoded rows cached, 0 to disable
+                              the cache.
+        """
+        self.directory = directory
+        self.cache_rows = cache_rows
+        self._sequence = 0
+        self._cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._cached_rows = 0
+
+    def _table_dir(self, table: str) -> str:
+        return os.path.join(self.directory, table)
+
+    def open_batch(self) -> "ArchiveBatch":
+        """
+        Start writing a batch of archived rows.
+
+        Returns:
+            ArchiveBatch: The batch, to close once its rows are written.
+        """
+        self._sequence += 1
+        return ArchiveBatch(
+            self, f"part-{time.time_ns()}-{self._sequence:06d}.ndjson.gz"
+        )
+
+    def files(self, table: str) -> List[str]:
+        directory = self._table_dir(table)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(".ndjson.gz")
+        )
+
+    def _read_file(self, path: str) -> List[dict]:
+        rows = self._cache.get(path)
+        if rows is not None:
+            self._cache.move_to_end(path)
+            return rows
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            rows = [json.loads(line) for line in archive]
+        if len(rows) <= self.cache_rows:
+            self._cache[path] = rows
+            self._cached_rows += len(rows)
+            while self._cached_rows > self.cache_rows:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_rows -= len(evicted)
+        return rows
+
+    def evict(self, path: str):
+        rows = self._cache.pop(path, None)
+        if rows is not None:
+            self._cached_rows -= len(rows)
+
+    def iter_rows(self, table: str) -> Iterator[dict]:
+        """
+        Stream every archived row of a table, in archival order, one file in
+        memory at a time.
+
+        Args:
+            table (str): "events" or "selections".
+
+        Yields:
+            dict: The archived rows, timestamps as ISO 8601 strings.
+        """
+        for path in self.files(table):
+            yield from self._read_file(path)
+
+    def read(self, table: str) -> List[dict]:
+        """
+        Read every archived row of a table, in archival order.
+
+        Args:
+            table (str): "events" or "selections".
+
+        Returns:
+            List[dict]: The archived rows, timestamps as ISO 8601 strings.
+        """
+        return list(self.iter_rows(table))
+
+
+class ArchiveBatch:
+    """
+    The files of one archived batch, streamed row by row.
+    """
+
+    def __init__(self, store: ArchiveStore, name: str):
+        self.store = store
+        self.name = name
+        self._files: Dict[str, gzip.GzipFile] = {}
+        self.paths: List[str] = []
+        self.counts: Dict[str, int] = {}
+
+    def write(self, table: str, row: dict):
+        archive = self._files.get(table)
+        if archive is None:
+            directory = self.store._table_dir(table)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, self.name)
+            archive = gzip.open(path + ".tmp", "wt", encoding="utf-8")
+            self._files[table] = archive
+            self.paths.append(path)
+        archive.write(json.dumps(row, default=_json_default) + "\n")
+        self.counts[table] = self.counts.get(table, 0) + 1
+
+    def close(self) -> List[str]:
+        """
+        Flush the files to disk and give them their final names.
+
+        Returns:
+            List[str]: The paths of the files written.
+        """
+        for archive in self._files.values():
+            archive.close()
+        self._files = {}
+        for path in self.paths:
+            os.replace(path + ".tmp", path)
+        return self.paths
+
+    def discard(self):
+        """
+        Remove the files of the batch, e.g. when deleting its rows failed.
+        """
+        for archive in self._files.values():
+            archive.close()
+        self._files = {}
+        for path in self.paths:
+            self.store.evict(path)
+            for candidate in (path, path + ".tmp"):
+                if os.path.exists(candidate):
+                    os.remove(candidate)
+
+
+_archive_store = None
+
+
+def get_archive_store() -> ArchiveStore:
+    global _archive_store
+    if _archive_store is None:
+        _archive_store = ArchiveStore()
+    return _archive_store
@@ -0,0 +1,317 @@
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from db.change_feed import subscribe_to_changes
+
+logger = logging.getLogger(__name__)
+
+# The generation counters of the database, which change with every write to
+# the tables: a sum of the per-event counters grows with each of them
+GENERATIONS_QUERY = (
+    "SELECT (SELECT string_agg(table_name || '.' || generation, '-' "
+    "ORDER BY table_name) FROM table_generations) || '-' || "
+    "(SELECT coalesce(sum(generation), 0) FROM event_selection_generations)"
+)
+
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(), digest_size=6
+    ).hexdigest()
+
+
+class CatalogTable:
+    """
+    Compact in-memory copy of a table.
+
+    Rows are kept as tuples in column order, keyed by id, with secondary
+    indexes (all ids and active ids) on the configured foreign-key columns.
+    """
+
+    __slots__ = ("name", "columns", "rows", "index_columns", "indexes", "active")
+
+    def __init__(self, name: str, index_columns: Tuple[str, ...] = ()):
+        self.name = name
+        self.columns: Tuple[str, ...] = ()
+        self.rows: Dict[int, tuple] = {}
+        self.index_columns = index_columns
+        self.indexes: Dict[str, Dict[int, Set[int]]] = {c: {} for c in index_columns}
+        self.active: Dict[str, Dict[int, Set[int]]] = {c: {} for c in index_columns}
+
+    def load(self, rows: Iterable[dict]):
+        for row in rows:
+            self.upsert(row)
+
+    def _to_dict(self, values: tuple) -> dict:
+        row = dict(zip(self.columns, values))
+        for column in self.columns[len(values) :]:
+            row[column] = None
+        return row
+
+    def _unindex(self, row_id: int, row: dict):
+        for column in self.index_columns:
+            self.indexes[column].get(row[column], set()).discard(row_id)
+            self.active[column].get(row[column], set()).discard(row_id)
+
+    def _index(self, row_id: int, row: dict):
+        for column in self.index_columns:
+            self.indexes[column].setdefault(row[column], set()).add(row_id)
+            if row.get("active"):
+                self.active[column].setdefault(row[column], set()).add(row_id)
+
+    def upsert(self, row: dict):
+        """
+        Insert or replace a row. Partial rows are merged into the stored one.
+
+        Args:
+            row (dict): The row, which must contain its "id".
+        """
+        new_columns = [column for column in row if column not in self.columns]
+        if new_columns:
+            self.columns = self.columns + tuple(new_columns)
+
+        row_id = row["id"]
+        previous = self.rows.get(row_id)
+        merged = self._to_dict(previous) if previous is not None else {}
+        if previous is not None:
+            self._unindex(row_id, merged)
+        merged.update(row)
+
+        self.rows[row_id] = tuple(merged.get(column) for column in self.columns)
+        self._index(row_id, merged)
+
+    def delete(self, row_id: int):
+        values = self.rows.pop(row_id, None)
+        if values is not None:
+            self._unindex(row_id, self._to_dict(values))
+
+    def get(self, row_id: int) -> Optional[dict]:
+        values = self.rows.get(row_id)
+        return self._to_dict(values) if values is not None else None
+
+    def all(self) -> List[dict]:
+        return [self._to_dict(values) for values in self.rows.values()]
+
+    def ids_by(self, column: str, value: int) -> Set[int]:
+        return self.indexes[column].get(value, set())
+
+    def lookup(self, column: str, value: int) -> List[dict]:
+        return [
+            self._to_dict(self.rows[row_id])
+            for row_id in sorted(self.ids_by(column, value))
+        ]
+
+    def count_active(self, column: str, value: int) -> int:
+        return len(self.active[column].get(value, ()))
+
+
+class Catalog:
+    """
+    Read-only snapshot of sports, events and selections served from memory.
+
+    It is loaded once from the database and kept current through the change
+    feed published by the repository write paths. Each process holds its own
+    snapshot, so writes done by other processes are only picked up on the
+    next refresh.
+
+    The generations are derived from content: the snapshot is identified by
+    the database generation counters it was read at, and each applied change
+    is chained into a digest. Processes holding the same rows therefore hand
+    out the same validators.
+    """
+
+    # Child table -> (parent table, foreign key, denormalised active count)
+    COUNT_COLUMNS = {
+        "selections": ("events", "event_id", "active_selections_count"),
+        "events": ("sports", "sport_id", "active_events_count"),
+    }
+
+    def __init__(self):
+        self.tables: Dict[str, CatalogTable] = self._empty_tables()
+        self.loaded = False
+        # Bumped by every load, so derived indexes know when to rebuild
+        self.load_count = 0
+        self.snapshot_id = ""
+        # (table, parent id or None) -> digest of the changes since the load
+        self.generations: Dict[Tuple[str, Optional[int]], str] = defaultdict(str)
+
+    @staticmethod
+    def _empty_tables() -> Dict[str, CatalogTable]:
+        return {
+            "sports": CatalogTable("sports"),
+            "events": CatalogTable("events", ("sport_id",)),
+            "selections": CatalogTable("selections", ("event_id",)),
+        }
+
+    def load_rows(
+        self,
+        sports: list,
+        events: list,
+        selections: list,
+        snapshot_id: Optional[str] = None,
+    ):
+        """
+        Replace the snapshot with the given rows.
+
+        Args:
+            sports (list): Sport rows.
+            events (list): Event rows.
+            selections (list): Selection rows.
+            snapshot_id (Optional[str]): Identifies the database state the
+                                         rows were read at, a digest of the
+                                         rows when not given.
+        """
+        tables = self._empty_tables()
+        tables["sports"].load(sports)
+        tables["events"].load(events)
+        tables["selections"].load(selections)
+        self.tables = tables
+        if snapshot_id is None:
+            snapshot_id = _digest(
+                *(table.rows for table in tables.values()),
+                *(table.columns for table in tables.values()),
+            )
+        self.snapshot_id = snapshot_id
+        self.generations = defaultdict(str)
+        self.loaded = True
+        self.load_count += 1
+
+    async def load(self, db_pool):
+        """
+        Load the snapshot from the database.
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+        """
+        # One snapshot, so the rows match the generations read with them
+        async with db_pool.acquire() as connection:
+            async with connection.transaction(
+                isolation="repeatable_read", readonly=True
+            ):
+                generation = await connection.fetchval(GENERATIONS_QUERY)
+                sports = await connection.fetch("SELECT * FROM sports ORDER BY id")
+                events = await connection.fetch("SELECT * FROM events ORDER BY id")
+                selections = await connection.fetch(
+                    "SELECT * FROM selections ORDER BY id"
+                )
+
+        self.load_rows(
+            [dict(row) for row in sports],
+            [dict(row) for row in events],
+            [dict(row) for row in selections],
+            snapshot_id=_digest(generation),
+        )
+        logger.info(
+            f"Catalog loaded: {len(sports)} sports, {len(events)} events, "
+            f"{len(selections)} selections"
+        )
+
+    def apply_change(
+        self,
+        table: str,
+        row: dict,
+        changes: Optional[dict] = None,
+        deleted: bool = False,
+    ):
+        if table not in self.tables or row is None:
+            return
+        parent_ids = self._parent_ids(table, row["id"])
+        if deleted:
+            self.tables[table].delete(row["id"])
+        else:
+            self.tables[table].upsert(row)
+        parent_ids |= self._parent_ids(table, row["id"])
+        change = (table, sorted(row.items()), deleted)
+        self._advance((table, None), change)
+        for parent_id in parent_ids:
+            self._advance((table, parent_id), change)
+        self._sync_counts(table, parent_ids)
+
+    def _advance(self, key: Tuple[str, Optional[int]], change):
+        self.generations[key] = _digest(self.generations[key], change)
+
+    def generation(self, table: str, parent_id: Optional[int] = None) -> str:
+        """
+        Identify the state of a table, or of the children of one parent row,
+        in this snapshot. It changes with every change applied to them.
+
+        Args:
+            table (str): The table.
+            parent_id (Optional[int]): The parent row, e.g. the event of
+                                       selections, None for the whole table.
+
+        Returns:
+            str: An opaque token, derived from the loaded database state and
+                 the changes applied since.
+        """
+        return f"{self.snapshot_id}-{self.generations[(table, parent_id)] or 0}"
+
+    def _parent_ids(self, table: str, row_id: int) -> Set[int]:
+        if table not in self.COUNT_COLUMNS:
+            return set()
+        foreign_key = self.COUNT_COLUMNS[table][1]
+        row = self.tables[table].get(row_id)
+        return {row[foreign_key]} if row and row[foreign_key] is not None else set()
+
+    def _sync_counts(self, table: str, parent_ids: Set[int]):
+        """
+        Mirror the database triggers: refresh the active count column of the
+        parents whose children changed, when the snapshot has that column.
+        """
+        if not parent_ids:
+            return
+        parent, foreign_key, column = self.COUNT_COLUMNS[table]
+        parent_table = self.tables[parent]
+        if column not in parent_table.columns:
+            return
+        for parent_id in parent_ids:
+            if parent_id in parent_table.rows:
+                count = self.tables[table].count_active(foreign_key, parent_id)
+                parent_table.upsert({"id": parent_id, column: count})
+                self._advance((parent, None), (parent_id, column, count))
+
+    def get_all(self, table: str) -> List[dict]:
+        return self.tables[table].all()
+
+    def get_selections_by_event_id(self, event_id: int) -> List[dict]:
+        return self.tables["selections"].lookup("event_id", event_id)
+
+    def get_selections_by_sport_id(self, sport_id: int) -> List[dict]:
+        selections = []
+        for event_id in sorted(self.tables["events"].ids_by("sport_id", sport_id)):
+            selections.extend(self.get_selections_by_event_id(event_id))
+        return selections
+
+    def get_active_selections_count(self, event_id: int) -> int:
+        return self.tables["selections"].count_active("event_id", event_id)
+
+    def get_active_events_count(self, sport_id: int) -> int:
+        return self.tables["events"].count_active("sport_id", sport_id)
+
+
+_catalog = Catalog()
+
+
+async def load_catalog(db_pool):
+    await _catalog.load(db_pool)
+    subscribe_to_changes(_catalog.apply_change)
+
+
+async def refresh_catalog_periodically(db_pool, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _catalog.load(db_pool)
+        except Exception as e:
+            logger.error(f"Error refreshing the catalog: {e}")
+
+
+def get_catalog() -> Optional[Catalog]:
+    """
+    Returns:
+        Optional[Catalog]: The catalog when it is loaded, None otherwise.
+    """
+    return _catalog if _catalog.loaded else None
@@ -0,0 +1,57 @@
+import logging
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ChangeCallback = Callable[[str, dict, Optional[dict], bool], None]
+
+
+class ChangeFeed:
+    """
+    In-process feed of the rows written through the repositories.
+
+    Subscribers are plain callables receiving (table, row, changes, deleted)
+    where `row` is the row as stored after the write and `changes` the data
+    that was sent to the database (None when unknown).
+    """
+
+    def __init__(self):
+        self._subscribers: List[ChangeCallback] = []
+
+    def subscribe(self, callback: ChangeCallback):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: ChangeCallback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(
+        self,
+        table: str,
+        row: dict,
+        changes: Optional[dict] = None,
+        deleted: bool = False,
+    ):
+        for callback in list(self._subscribers):
+            try:
+                callback(table, row, changes, deleted)
+            except Exception as e:
+                logger.error(f"Error publishing change on {table}: {e}")
+
+
+_change_feed = ChangeFeed()
+
+
+def subscribe_to_changes(callback: ChangeCallback):
+    _change_feed.subscribe(callback)
+
+
+def unsubscribe_from_changes(callback: ChangeCallback):
+    _change_feed.unsubscribe(callback)
+
+
+def publish_change(
+    table: str, row: dict, changes: Optional[dict] = None, deleted: bool = False
+):
+    _change_feed.publish(table, row, changes, deleted)
@@ -1,6 +1,13 @@
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
 import asyncpg
 
+logger = logging.getLogger(__name__)
+
 
 class DatabaseError(Exception):
     pass
@@ -18,6 +25,12 @@ class NotConnectedError(DatabaseError):
     pass
 
 
+class StatementTimeoutError(DatabaseError):
+    """Exception raised when a query exceeds its statement_timeout budget."""
+
+    pass
+
+
 class CustomPostgresError(asyncpg.PostgresError):
     """Custom exception to wrap asyncpg.PostgresError."""
 
@@ -51,6 +64,9 @@ class DatabaseConnection:
         except Exception as e:
             raise DatabaseError(f"Error closing the database connection: {e}")
 
+    def is_ready(self) -> bool:
+        return self._pool is not None
+
     def get_db_pool(self):
         if self._pool is None:
             raise NotConnectedError("The connection pool is not initialized.")
@@ -70,3 +86,92 @@ async def close_db_connection():
 
 def get_db_pool():
     return _db_instance.get_db_pool()
+
+
+def is_db_ready() -> bool:
+    return _db_instance.is_ready()
+
+
+@asynccontextmanager
+async def statement_timeout(connection, timeout_ms: Optional[int]):
+    """
+    Run the queries of the block under a per-transaction statement_timeout.
+
+    SET LOCAL only lasts until the end of the transaction, so the pooled
+    connection goes back with the server default.
+
+    Args:
+        connection: The connection acquired from the pool.
+        timeout_ms (Optional[int]): The budget in milliseconds, None for no limit.
+
+    Raises:
+        StatementTimeoutError: If a query of the block is cancelled by the timeout.
+    """
+    if timeout_ms is None:
+        yield connection
+        return
+
+    try:
+        async with connection.transaction():
+            await connection.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            yield connection
+    except asyncpg.exceptions.QueryCanceledError as e:
+        raise StatementTimeoutError(f"Query exceeded {int(timeout_ms)} ms: {e}")
+
+
+async def listen(
+    db_pool,
+    channel: str,
+    on_payload: Callable[[str], Awaitable[None]],
+    check_interval: float = 5.0,
+    on_reconnect: Optional[Callable[[], Awaitable[None]]] = None,
+):
+    """
+    LISTEN on a channel on a dedicated connection, reconnecting when it is
+    lost, until cancelled. Payloads are handed to on_payload one at a time,
+    in the order they were received.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        channel (str): The channel.
+        on_payload (Callable[[str], Awaitable[None]]): Handles one payload.
+        check_interval (float): Seconds between two checks of the connection.
+        on_reconnect (Optional[Callable[[], Awaitable[None]]]): Called after
+            each reconnection, as the payloads sent meanwhile were missed.
+    """
+    payloads: asyncio.Queue = asyncio.Queue()
+
+    def on_notification(connection, pid, channel, payload):
+        payloads.put_nowait(payload)
+
+    async def consume():
+        while True:
+            payload = await payloads.get()
+            try:
+                await on_payload(payload)
+            except Exception as e:
+                logger.error(f"Error handling a {channel} notification: {e}")
+
+    consumer = asyncio.create_task(consume())
+    connected = False
+    try:
+        while True:
+            try:
+                async with db_pool.acquire() as connection:
+                    await connection.add_listener(channel, on_notification)
+                    try:
+                        if connected and on_reconnect is not None:
+                            await on_reconnect()
+                        connected = True
+                        while not connection.is_closed():
+                            await asyncio.sleep(check_interval)
+                    finally:
+                        if not connection.is_closed():
+                            await connection.remove_listener(channel, on_notification)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error listening on {channel}: {e}")
+            await asyncio.sleep(check_interval)
+    finally:
+        consumer.cancel()
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db.catalog import get_catalog
+from db.change_feed import subscribe_to_changes
+from utils.slugify import to_slug
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("sports", "events", "selections")
+
+# Without the catalog, the writes of other processes are only picked up by a
+# rebuild from the database once the index is older than this (0 for never)
+NAME_INDEX_MAX_AGE = float(os.getenv("NAME_INDEX_MAX_AGE", "60"))
+
+
+def name_keys(name: Optional[str]) -> Tuple[str, List[str]]:
+    """
+    Normalise a name the way slugs are built and list the keys it is found by.
+
+    Args:
+        name (Optional[str]): The sport, event or selection name.
+
+    Returns:
+        Tuple[str, List[str]]: The slug of the whole name, and the slug from
+                               each following word on ("real-madrid-cf" gives
+                               "madrid-cf" and "cf").
+    """
+    slug = to_slug(name) if name and name.strip() else ""
+    tokens = slug.split("-") if slug else []
+    return slug, ["-".join(tokens[i:]) for i in range(1, len(tokens))]
+
+
+class NameIndex:
+    """
+    Prefix index over the names of sports, events and selections.
+
+    Each table keeps two sorted lists of (key, id): whole-name slugs, and the
+    slugs starting at every later word. A query is a bisect into each list,
+    so matches at the start of the name come first, then matches at a word.
+    """
+
+    def __init__(self):
+        self.names: Dict[str, Dict[int, str]] = {table: {} for table in TABLES}
+        self.prefixes: Dict[str, List[Tuple[str, int]]] = {t: [] for t in TABLES}
+        self.words: Dict[str, List[Tuple[str, int]]] = {t: [] for t in TABLES}
+        self.loaded = False
+        self.loaded_at = 0.0
+        # The catalog load the index was built from, None if built from the
+        # database
+        self.catalog_load: Optional[int] = None
+
+    def load_rows(self, rows_by_table: Dict[str, Iterable[dict]]):
+        """
+        Replace the index with the given rows.
+
+        Args:
+            rows_by_table (Dict[str, Iterable[dict]]): Rows with "id" and "name"
+                                                       for each table.
+        """
+        names = {table: {} for table in TABLES}
+        prefixes = {table: [] for table in TABLES}
+        words = {table: [] for table in TABLES}
+        for table in TABLES:
+            for row in rows_by_table.get(table, ()):
+                names[table][row["id"]] = row["name"]
+                slug, word_keys = name_keys(row["name"])
+                if slug:
+                    prefixes[table].append((slug, row["id"]))
+                words[table].extend((key, row["id"]) for key in word_keys)
+            prefixes[table].sort()
+            words[table].sort()
+
+        self.names, self.prefixes, self.words = names, prefixes, words
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _discard(entries: List[Tuple[str, int]], entry: Tuple[str, int]):
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def remove(self, table: str, row_id: int):
+        name = self.names[table].pop(row_id, None)
+        if name is None:
+            return
+        slug, word_keys = name_keys(name)
+        if slug:
+            self._discard(self.prefixes[table], (slug, row_id))
+        for key in word_keys:
+            self._discard(self.words[table], (key, row_id))
+
+    def upsert(self, table: str, row_id: int, name: Optional[str]):
+        if self.names[table].get(row_id) == name:
+            return
+        self.remove(table, row_id)
+        if name is None:
+            return
+        self.names[table][row_id] = name
+        slug, word_keys = name_keys(name)
+        if slug:
+            insort(self.prefixes[table], (slug, row_id))
+        for key in word_keys:
+            insort(self.words[table], (key, row_id))
+
+    def apply_change(
+        self,
+        table: str,
+        row: dict,
+        changes: Optional[dict] = None,
+        deleted: bool = False,
+    ):
+        if table not in self.names or row is None:
+            return
+        if deleted:
+            self.remove(table, row["id"])
+        elif "name" in row:
+            self.upsert(table, row["id"], row["name"])
+
+    def search(self, table: str, query: str, limit: int = 10) -> List[dict]:
+        """
+        Find the names of a table starting, or having a word starting, with
+        the query.
+
+        Args:
+            table (str): "sports", "events" or "selections".
+            query (str): The text typed so far.
+            limit (int): The maximum number of matches.
+
+        Returns:
+            List[dict]: The "id" and "name" of the matches, start-of-name
+                        matches first, each group in alphabetical order.
+        """
+        prefix, _ = name_keys(query)
+        if not prefix:
+            return []
+
+        names = self.names[table]
+        matches, seen = [], set()
+        for entries in (self.prefixes[table], self.words[table]):
+            i = bisect_left(entries, (prefix,))
+            while i < len(entries) and len(matches) < limit:
+                key, row_id = entries[i]
+                if not key.startswith(prefix):
+                    break
+                if row_id not in seen:
+                    seen.add(row_id)
+                    matches.append({"id": row_id, "name": names[row_id]})
+                i += 1
+        return matches
+
+    def autocomplete(self, query: str, limit: int = 10) -> Dict[str, List[dict]]:
+        return {table: self.search(table, query, limit) for table in TABLES}
+
+
+_name_index = NameIndex()
+_load_lock = asyncio.Lock()
+
+
+def _is_current(index: NameIndex, catalog) -> bool:
+    if not index.loaded:
+        return False
+    if catalog is not None:
+        return index.catalog_load == catalog.load_count
+    if index.catalog_load is not None:
+        return False
+    return (
+        NAME_INDEX_MAX_AGE <= 0
+        or time.monotonic() - index.loaded_at <= NAME_INDEX_MAX_AGE
+    )
+
+
+async def load_name_index(db_pool) -> NameIndex:
+    """
+    Build the name index, from the catalog when it is loaded or from the
+    database otherwise, and keep it current through the change feed.
+
+    It is rebuilt whenever the catalog is reloaded, as the reload brings in
+    the writes the feed did not carry. Without the catalog it is rebuilt
+    once older than NAME_INDEX_MAX_AGE, to pick up the writes of other
+    processes.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+
+    Returns:
+        NameIndex: The loaded index.
+    """
+    if _is_current(_name_index, get_catalog()):
+        return _name_index
+
+    async with _load_lock:
+        catalog = get_catalog()
+        if _is_current(_name_index, catalog):
+            return _name_index
+
+        if catalog is not None:
+            catalog_load = catalog.load_count
+            rows = {table: catalog.get_all(table) for table in TABLES}
+        else:
+            catalog_load = None
+            rows = {}
+            async with db_pool.acquire() as connection:
+                for table in TABLES:
+                    records = await connection.fetch(f"SELECT id, name FROM {table}")
+                    rows[table] = [dict(record) for record in records]
+
+        _name_index.load_rows(rows)
+        _name_index.catalog_load = catalog_load
+        subscribe_to_changes(_name_index.apply_change)
+        logger.info(
+            "Name index loaded: "
+            + ", ".join(f"{len(_name_index.names[t])} {t}" for t in TABLES)
+        )
+    return _name_index
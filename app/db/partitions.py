@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from typing import Set, Tuple, Union
+
+# Months whose partitions this process already ensured
+_ensured_months: Set[Tuple[int, int]] = set()
+
+
+def partition_month(ts: Union[datetime, str]) -> Tuple[int, int]:
+    """
+    Get the UTC month holding a timestamp, which names its partition.
+
+    Args:
+        ts (Union[datetime, str]): The timestamp, naive ones being UTC.
+
+    Returns:
+        Tuple[int, int]: The year and the month.
+    """
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.year, ts.month
+
+
+async def ensure_time_partition(connection, ts: Union[datetime, str, None]):
+    """
+    Create the events and selections partitions of the month of a timestamp
+    if they do not exist. The database call is made once per month and process.
+
+    Args:
+        connection (asyncpg.Connection): The connection the row is written on.
+        ts (Union[datetime, str, None]): The scheduled start of the event.
+    """
+    if ts is None:
+        return
+    month = partition_month(ts)
+    if month in _ensured_months:
+        return
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts)
+    await connection.execute("SELECT ensure_time_partition($1)", ts)
+    _ensured_months.add(month)
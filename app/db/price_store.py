@@ -0,0 +1,358 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from db.change_feed import subscribe_to_changes
+
+logger = logging.getLogger(__name__)
+
+# The prices of the active selections of active events
+ACTIVE_PRICES_QUERY = (
+    "SELECT s.id, s.event_id, e.sport_id, s.price FROM selections s "
+    "JOIN events e ON s.event_id = e.id AND s.event_start = e.scheduled_start "
+    "WHERE s.active = TRUE AND e.active = TRUE"
+)
+
+
+class PriceStore:
+    """
+    Columnar store of selection prices, sorted by event.
+
+    Each selection is one position across the `ids`, `event_ids`, `sport_ids`
+    and `prices` arrays, so per-event and per-sport aggregates are computed
+    with vectorised group-by reductions instead of Python loops over rows.
+    """
+
+    __slots__ = ("ids", "event_ids", "sport_ids", "prices")
+
+    def __init__(self, ids, event_ids, sport_ids, prices):
+        """
+        Initialize the PriceStore. Selections without a positive price are
+        dropped, as they have no implied probability.
+
+        Args:
+            ids (array-like): Selection IDs.
+            event_ids (array-like): Event ID of each selection.
+            sport_ids (array-like): Sport ID of each selection.
+            prices (array-like): Decimal price of each selection.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        valid = prices > 0
+        order = np.argsort(np.asarray(event_ids)[valid], kind="stable")
+
+        self.ids = np.asarray(ids, dtype=np.int64)[valid][order]
+        self.event_ids = np.asarray(event_ids, dtype=np.int64)[valid][order]
+        self.sport_ids = np.asarray(sport_ids, dtype=np.int64)[valid][order]
+        self.prices = prices[valid][order]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "PriceStore":
+        """
+        Build a store from rows holding "id", "event_id", "sport_id" and "price".
+
+        Args:
+            rows (Iterable[dict]): Selection price rows.
+
+        Returns:
+            PriceStore: The columnar store.
+        """
+        rows = list(rows)
+        count = len(rows)
+        return cls(
+            np.fromiter((row["id"] for row in rows), np.int64, count),
+            np.fromiter((row["event_id"] for row in rows), np.int64, count),
+            np.fromiter((row["sport_id"] for row in rows), np.int64, count),
+            np.fromiter((row["price"] for row in rows), np.float64, count),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def implied_probabilities(self) -> np.ndarray:
+        return 1.0 / self.prices
+
+    @staticmethod
+    def _group_starts(sorted_keys: np.ndarray) -> np.ndarray:
+        if len(sorted_keys) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+
+    @staticmethod
+    def _reduce(sorted_keys: np.ndarray, values: np.ndarray) -> dict:
+        starts = PriceStore._group_starts(sorted_keys)
+        counts = np.diff(np.append(starts, len(sorted_keys)))
+        if len(starts) == 0:
+            names = ("keys", "count", "min", "max", "mean", "sum")
+            return {name: np.empty(0) for name in names}
+        total = np.add.reduceat(values, starts)
+        return {
+            "keys": sorted_keys[starts],
+            "count": counts,
+            "min": np.minimum.reduceat(values, starts),
+            "max": np.maximum.reduceat(values, starts),
+            "mean": total / counts,
+            "sum": total,
+        }
+
+    def _event_groups(self):
+        prices = self._reduce(self.event_ids, self.prices)
+        probabilities = self._reduce(self.event_ids, self.implied_probabilities())
+        starts = self._group_starts(self.event_ids)
+        return prices, probabilities["sum"] - 1.0, self.sport_ids[starts]
+
+    def stats_by_event(self) -> List[dict]:
+        """
+        Compute the market statistics of every event in the store.
+
+        Returns:
+            List[dict]: One entry per event with the selections count,
+                        overround and min/max/mean price.
+        """
+        prices, overround, sport_ids = self._event_groups()
+        return [
+            {
+                "event_id": int(prices["keys"][i]),
+                "sport_id": int(sport_ids[i]),
+                "selections_count": int(prices["count"][i]),
+                "overround": float(overround[i]),
+                "min_price": float(prices["min"][i]),
+                "max_price": float(prices["max"][i]),
+                "mean_price": float(prices["mean"][i]),
+            }
+            for i in range(len(prices["keys"]))
+        ]
+
+    def stats_by_sport(self) -> List[dict]:
+        """
+        Compute the market statistics of every sport in the store.
+
+        Returns:
+            List[dict]: One entry per sport with the events and selections
+                        counts, mean event overround and min/max/mean price.
+        """
+        order = np.argsort(self.sport_ids, kind="stable")
+        prices = self._reduce(self.sport_ids[order], self.prices[order])
+
+        _, overround, event_sport_ids = self._event_groups()
+        sport_order = np.argsort(event_sport_ids, kind="stable")
+        events = self._reduce(event_sport_ids[sport_order], overround[sport_order])
+
+        return [
+            {
+                "sport_id": int(prices["keys"][i]),
+                "events_count": int(events["count"][i]),
+                "selections_count": int(prices["count"][i]),
+                "mean_overround": float(events["mean"][i]),
+                "min_price": float(prices["min"][i]),
+                "max_price": float(prices["max"][i]),
+                "mean_price": float(prices["mean"][i]),
+            }
+            for i in range(len(prices["keys"]))
+        ]
+
+    def _event_slice(self, event_id: int) -> slice:
+        start, end = np.searchsorted(self.event_ids, [event_id, event_id + 1])
+        return slice(int(start), int(end))
+
+    def selection_ids(self, event_id: int) -> List[int]:
+        """
+        Returns:
+            List[int]: The IDs of the priced selections of an event.
+        """
+        return self.ids[self._event_slice(event_id)].tolist()
+
+    def event_stats(
+        self, event_id: int, opening_prices: Optional[Dict[int, float]] = None
+    ) -> Optional[dict]:
+        """
+        Compute the market statistics of one event, including the implied
+        probability and the price drift of each selection.
+
+        Args:
+            event_id (int): The ID of the event.
+            opening_prices (Optional[Dict[int, float]]): The first price of
+                each selection in the drift window. The drift of a selection
+                without one is None.
+
+        Returns:
+            Optional[dict]: The event statistics, or None if the event has no
+                            priced selections in the store.
+        """
+        rows = self._event_slice(event_id)
+        start, end = rows.start, rows.stop
+        if start == end:
+            return None
+
+        prices = self.prices[rows]
+        implied = 1.0 / prices
+        book = implied.sum()
+        opening_prices = opening_prices or {}
+        openings = np.fromiter(
+            (opening_prices.get(i, np.nan) for i in self.ids[rows].tolist()),
+            np.float64,
+            end - start,
+        )
+        drifts = prices - openings
+        return {
+            "event_id": int(event_id),
+            "sport_id": int(self.sport_ids[start]),
+            "selections_count": int(end - start),
+            "overround": float(book - 1.0),
+            "min_price": float(prices.min()),
+            "max_price": float(prices.max()),
+            "mean_price": float(prices.mean()),
+            "selections": [
+                {
+                    "id": int(selection_id),
+                    "price": float(price),
+                    "implied_probability": float(probability),
+                    "fair_probability": float(probability / book),
+                    "opening_price": None if np.isnan(opening) else float(opening),
+                    "price_drift": None if np.isnan(drift) else float(drift),
+                }
+                for selection_id, price, probability, opening, drift in zip(
+                    self.ids[rows], prices, implied, openings, drifts
+                )
+            ],
+        }
+
+
+class LivePriceStore:
+    """
+    PriceStore of the active selections kept in memory, like the catalog.
+
+    Price changes of the listed selections are written into the arrays in
+    place. Changes to which selections are listed (new, deleted, suspended or
+    moved selections, and activated or suspended events) mark the store stale,
+    and the next read reloads it with one query.
+    """
+
+    def __init__(self):
+        self.store = PriceStore([], [], [], [])
+        self.positions: Dict[int, int] = {}
+        self.loaded = False
+        self.stale = False
+        self.loaded_at = 0.0
+        self.max_age = 0.0
+        self._loading = False
+        self._lock = asyncio.Lock()
+
+    def load_rows(self, rows: Iterable):
+        """
+        Replace the store with the given rows.
+
+        Args:
+            rows (Iterable): Rows holding "id", "event_id", "sport_id" and
+                             "price", e.g. asyncpg records.
+        """
+        store = PriceStore.from_rows(rows)
+        self.store = store
+        self.positions = {
+            selection_id: position
+            for position, selection_id in enumerate(store.ids.tolist())
+        }
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+
+    async def load(self, db_pool):
+        """
+        Load the store from the database.
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+        """
+        self._loading = True
+        self.stale = False
+        try:
+            async with db_pool.acquire() as connection:
+                rows = await connection.fetch(ACTIVE_PRICES_QUERY)
+            # A change seen during the fetch leaves the store stale
+            stale = self.stale
+            self.load_rows(rows)
+            self.stale = stale
+        finally:
+            self._loading = False
+
+    async def get(self, db_pool) -> PriceStore:
+        """
+        Return the store, reloaded first when it is stale or older than
+        max_age seconds (0 for no limit).
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+
+        Returns:
+            PriceStore: The current prices.
+        """
+        if self._needs_reload():
+            async with self._lock:
+                if self._needs_reload():
+                    await self.load(db_pool)
+        return self.store
+
+    def _needs_reload(self) -> bool:
+        if self.stale:
+            return True
+        return self.max_age > 0 and time.monotonic() - self.loaded_at > self.max_age
+
+    def apply_change(
+        self,
+        table: str,
+        row: dict,
+        changes: Optional[dict] = None,
+        deleted: bool = False,
+    ):
+        if row is None:
+            return
+        if self._loading:
+            self.stale = True
+        elif table == "selections":
+            self._apply_selection(row, deleted)
+        elif table == "events":
+            if (
+                deleted
+                or changes is None
+                or "active" in changes
+                or "sport_id" in changes
+            ):
+                self.stale = True
+
+    def _apply_selection(self, row: dict, deleted: bool):
+        position = self.positions.get(row["id"])
+        if position is None:
+            # Unlisted: it only matters if it may have become listable
+            if not deleted and row.get("active") is not False:
+                self.stale = True
+            return
+        price = row.get("price")
+        if (
+            deleted
+            or row.get("active") is False
+            or row.get("event_id", self.store.event_ids[position])
+            != self.store.event_ids[position]
+            or price is None
+            or price <= 0
+        ):
+            self.stale = True
+            return
+        self.store.prices[position] = price
+
+
+_price_store = LivePriceStore()
+
+
+async def load_price_store(db_pool, max_age: float = 0):
+    _price_store.max_age = max_age
+    await _price_store.load(db_pool)
+    subscribe_to_changes(_price_store.apply_change)
+
+
+def get_price_store() -> Optional[LivePriceStore]:
+    """
+    Returns:
+        Optional[LivePriceStore]: The store when it is loaded, None otherwise.
+    """
+    return _price_store if _price_store.loaded else None
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from db.change_feed import subscribe_to_changes
+
+logger = logging.getLogger(__name__)
+
+
+class PriceTickBuffer:
+    """
+    Collects selection price changes from the change feed and appends them to
+    the price history in batches, so a price update costs an in-memory append
+    instead of an extra INSERT round trip.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 1000,
+        flush_interval: float = 0.5,
+        max_buffered: int = 100_000,
+    ):
+        """
+        Initialize the PriceTickBuffer.
+
+        Args:
+            max_batch (int): Number of ticks that triggers an early flush.
+            flush_interval (float): Maximum seconds a tick waits before a flush.
+            max_buffered (int): Ticks kept while the database is unavailable;
+                                the oldest are dropped beyond this.
+        """
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._ticks = deque(maxlen=max_buffered)
+        self._batch_ready: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+    def record(self, selection_id: int, price: float, ts: Optional[datetime] = None):
+        if len(self._ticks) == self._ticks.maxlen:
+            logger.warning("Price tick buffer is full, dropping the oldest tick")
+        self._ticks.append((selection_id, ts or datetime.now(timezone.utc), price))
+        if self._batch_ready is not None and len(self._ticks) >= self.max_batch:
+            self._batch_ready.set()
+
+    def on_change(self, table: str, row: dict, changes: Optional[dict], deleted: bool):
+        if table != "selections" or deleted or not changes:
+            return
+        if changes.get("price") is not None:
+            self.record(row["id"], row["price"])
+
+    async def flush(self, repository):
+        """
+        Write the buffered ticks. On failure they are put back to be retried
+        with the next batch.
+
+        Args:
+            repository (PriceHistoryRepository): The price history repository.
+        """
+        if not self._ticks:
+            return
+        ticks = list(self._ticks)
+        self._ticks.clear()
+        try:
+            await repository.insert_ticks(ticks)
+        except Exception as e:
+            logger.error(f"Error flushing {len(ticks)} price ticks: {e}")
+            self._ticks.extendleft(reversed(ticks))
+
+    async def run(self, repository):
+        """
+        Flush the buffer every `flush_interval` seconds, or as soon as a full
+        batch is waiting, until cancelled.
+
+        Args:
+            repository (PriceHistoryRepository): The price history repository.
+        """
+        self._batch_ready = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self._batch_ready.wait(), timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._batch_ready.clear()
+                await self.flush(repository)
+        finally:
+            await self.flush(repository)
+
+
+_price_tick_buffer = PriceTickBuffer()
+
+# The price history has no DEFAULT partition, so the months ahead are created
+# periodically rather than only at startup
+PARTITION_CHECK_SECONDS = 3600
+
+
+async def ensure_partitions_periodically(
+    repository, interval: float = PARTITION_CHECK_SECONDS
+):
+    """
+    Create the coming price history partitions every `interval` seconds,
+    until cancelled.
+
+    Args:
+        repository (PriceHistoryRepository): The price history repository.
+        interval (float): Seconds between two checks.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await repository.ensure_partitions()
+        except Exception as e:
+            logger.error(f"Error creating price history partitions: {e}")
+
+
+def start_price_history(repository) -> asyncio.Task:
+    """
+    Feed selection price changes into the price history, and keep its
+    partitions created ahead.
+
+    Args:
+        repository (PriceHistoryRepository): The price history repository.
+
+    Returns:
+        asyncio.Task: The background flushing and partitioning task.
+    """
+    subscribe_to_changes(_price_tick_buffer.on_change)
+    return asyncio.create_task(_run_price_history(repository))
+
+
+async def _run_price_history(repository):
+    partitions = asyncio.create_task(ensure_partitions_periodically(repository))
+    try:
+        await _price_tick_buffer.run(repository)
+    finally:
+        partitions.cancel()
+        await asyncio.gather(partitions, return_exceptions=True)
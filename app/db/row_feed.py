@@ -0,0 +1,77 @@
+import json
+from typing import List
+
+from db.catalog import get_catalog
+from db.change_feed import publish_change
+from db.database import listen
+from db.price_store import get_price_store
+
+# Channel of the NOTIFY sent by the row triggers for each changed statement
+CHANGED_ROWS_CHANNEL = "changed_rows"
+
+TABLES = ("sports", "events", "selections")
+
+
+async def apply_changed_rows(db_pool, payload: str):
+    """
+    Read the rows named by a notification and publish them on the change
+    feed, so the catalog, name index and price store of this process see the
+    writes of the other ones. Rows that are gone are published as deleted.
+
+    The rows the catalog already holds as they are, such as the writes of
+    this process, are skipped.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        payload (str): A JSON object with the "table" and the "ids" of the
+                       changed rows.
+    """
+    message = json.loads(payload)
+    table, ids = message["table"], message["ids"]
+    if table not in TABLES:
+        return
+    async with db_pool.acquire() as connection:
+        records = await connection.fetch(
+            f"SELECT * FROM {table} WHERE id = ANY($1::int[])", ids
+        )
+
+    catalog = get_catalog()
+    found: List[int] = []
+    for record in records:
+        row = dict(record)
+        found.append(row["id"])
+        if catalog is None or catalog.tables[table].get(row["id"]) != row:
+            publish_change(table, row)
+    for row_id in set(ids).difference(found):
+        if catalog is None or row_id in catalog.tables[table].rows:
+            publish_change(table, {"id": row_id}, None, deleted=True)
+
+
+async def reload_after_reconnect(db_pool):
+    # The notifications sent while disconnected were missed
+    catalog = get_catalog()
+    if catalog is not None:
+        await catalog.load(db_pool)
+    price_store = get_price_store()
+    if price_store is not None:
+        price_store.stale = True
+
+
+async def listen_for_changed_rows(db_pool, check_interval: float = 5.0):
+    """
+    LISTEN on CHANGED_ROWS_CHANNEL until cancelled.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        check_interval (float): Seconds between two checks of the connection.
+    """
+
+    async def on_payload(payload: str):
+        await apply_changed_rows(db_pool, payload)
+
+    async def on_reconnect():
+        await reload_after_reconnect(db_pool)
+
+    await listen(
+        db_pool, CHANGED_ROWS_CHANNEL, on_payload, check_interval, on_reconnect
+    )
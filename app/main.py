@@ -1,24 +1,163 @@
+import asyncio
+import logging
+import os
+
 from fastapi import FastAPI
 
-from db.database import connect_to_db, close_db_connection
+from db.archive_feed import listen_for_archived_rows
+from db.database import (
+    DatabaseError,
+    connect_to_db,
+    close_db_connection,
+    get_db_pool,
+    is_db_ready,
+)
+
+from api.v1.health.routes import health_router
+from utils.compression import CompressionMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+def env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("1", "true", "yes")
+
+
+# Opt-in fast startup: the API routers are imported on first use (or by a
+# background warm-up) and the pool connects without blocking startup.
+LAZY_STARTUP = env_flag("LAZY_STARTUP")
+
+# Opt-in in-memory catalog serving the read endpoints without Postgres, with
+# the market statistics computed from an in-memory price store. The writes of
+# other processes reach it through the changed_rows notifications, the
+# periodic refresh is optional.
+CATALOG_SNAPSHOT = env_flag("CATALOG_SNAPSHOT")
+CATALOG_REFRESH_SECONDS = float(os.getenv("CATALOG_REFRESH_SECONDS", "0"))
 
-from api.v1.events.routes import events_router
-from api.v1.sports.routes import sports_router
-from api.v1.selections.routes import selections_router
+# Opt-in append-only price history fed by the selection write paths.
+PRICE_HISTORY = env_flag("PRICE_HISTORY")
 
+# Opt-in scheduler starting pending events at their scheduled start. Every
+# worker may enable it, an advisory lock keeps a single one active.
+EVENT_SCHEDULER = env_flag("EVENT_SCHEDULER")
+
+# Response compression: bodies below the minimum size are sent as is, and the
+# compressed bodies of GET responses are cached (0 MB disables the cache).
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_CACHE_MB = int(os.getenv("COMPRESSION_CACHE_MB", "32"))
+
+BACKGROUND_TASKS = (
+    "warm_up_task",
+    "catalog_refresh_task",
+    "row_listener_task",
+    "archive_listener_task",
+    "price_history_task",
+    "event_scheduler_task",
+)
 
 app = FastAPI()
 
-app.include_router(sports_router, prefix="/api/v1", tags=["sports"])
-app.include_router(events_router, prefix="/api/v1", tags=["events"])
-app.include_router(selections_router, prefix="/api/v1", tags=["selections"])
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    cache_bytes=COMPRESSION_CACHE_MB << 20,
+)
+
+app.include_router(health_router, tags=["health"])
+
+if LAZY_STARTUP:
+    from utils.lazy_app import LazyASGIApp
+
+    lazy_api = LazyASGIApp("api.v1.routers:create_api")
+    app.mount("/api/v1", lazy_api)
+else:
+    from api.v1.routers import include_routers
+
+    include_routers(app)
+
+
+# The optional features are imported once enabled, so they stay out of the
+# import of this module and of the lazy startup they would otherwise slow down.
+async def on_db_connected():
+    if CATALOG_SNAPSHOT:
+        from db.catalog import load_catalog, refresh_catalog_periodically
+        from db.price_store import load_price_store
+        from db.row_feed import listen_for_changed_rows
+
+        await load_catalog(get_db_pool())
+        await load_price_store(get_db_pool(), CATALOG_REFRESH_SECONDS)
+        app.state.row_listener_task = asyncio.create_task(
+            listen_for_changed_rows(get_db_pool())
+        )
+        if CATALOG_REFRESH_SECONDS > 0:
+            app.state.catalog_refresh_task = asyncio.create_task(
+                refresh_catalog_periodically(get_db_pool(), CATALOG_REFRESH_SECONDS)
+            )
+
+    # Archival deletes rows behind the catalog, name index and price store
+    app.state.archive_listener_task = asyncio.create_task(
+        listen_for_archived_rows(get_db_pool())
+    )
+
+    if PRICE_HISTORY:
+        from db.price_tick_buffer import start_price_history
+        from repositories.price_history_repository import PriceHistoryRepository
+
+        repository = PriceHistoryRepository(get_db_pool(), logger)
+        await repository.ensure_partitions()
+        app.state.price_history_task = start_price_history(repository)
+
+    if EVENT_SCHEDULER:
+        from services.event_scheduler import EventScheduler
+
+        scheduler = EventScheduler(get_db_pool(), logger)
+        app.state.event_scheduler_task = asyncio.create_task(scheduler.run())
+
+
+async def load_routers():
+    # Logged here, so a failing import neither goes unnoticed nor keeps the
+    # pool from connecting; the first request retries it
+    try:
+        await lazy_api.load()
+    except Exception as e:
+        logger.error(f"Error warming up the API routers: {e}")
+
+
+async def warm_up():
+    # The routers are imported in a worker thread while the pool connects
+    routers_task = asyncio.create_task(load_routers())
+
+    delay = 0.5
+    while True:
+        try:
+            await connect_to_db()
+            break
+        except DatabaseError as e:
+            logger.error(f"Error warming up the database pool: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10)
+
+    await on_db_connected()
+    logger.info("Database pool is warm.")
+    await routers_task
 
 
 @app.on_event("startup")
 async def startup():
-    await connect_to_db()
+    if LAZY_STARTUP:
+        app.state.warm_up_task = asyncio.create_task(warm_up())
+    else:
+        await connect_to_db()
+        await on_db_connected()
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    await close_db_connection()
+    tasks = [getattr(app.state, name, None) for name in BACKGROUND_TASKS]
+    tasks = [task for task in tasks if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    if is_db_ready():
+        await close_db_connection()
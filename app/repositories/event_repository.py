@@ -1,13 +1,35 @@
+import asyncio
 import logging
 
-from datetime import datetime
-from db.database import get_db_pool
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from db.archive_store import get_archive_store
+from db.catalog import get_catalog
+from db.change_feed import publish_change
+from db.database import get_db_pool, statement_timeout
+from db.partitions import ensure_time_partition
+from utils.custom_exceptions import ValidationError
+from utils.fields import project
 from utils.query_builder import QueryBuilder
 from .errors import RepositoryError
+from .upserts import upsert_rows
+from .validators import catalog_validator, fetch_validator
+from .versioning import check_version
 from schemas import EventType
 
 
 class EventRepository:
+    UPSERT_COLUMNS = (
+        ("name", "varchar"),
+        ("slug", "varchar"),
+        ("active", "bool"),
+        ("type", "eventtype"),
+        ("sport_id", "int"),
+        ("status", "eventstatus"),
+        ("scheduled_start", "timestamptz"),
+        ("actual_start", "timestamptz"),
+    )
+
     def __init__(self, db_pool: get_db_pool, logger: logging.Logger):
         """
         Initialize the EventRepository.
@@ -17,13 +39,17 @@ class EventRepository:
             logger (logging.Logger): An instance of the logging logger.
         """
         self.db_pool = db_pool
-        self.query_builder = QueryBuilder("events")
+        self.query_builder = QueryBuilder("events", version_column="version")
         self.logger = logger
 
-    async def get_all(self) -> list:
+    async def get_all(self, fields: Optional[Tuple[str, ...]] = None) -> list:
         """
         Fetch all events from the database.
 
+        Args:
+            fields (Optional[Tuple[str, ...]]): The columns to return, from
+                                                utils.fields.parse_fields.
+
         Returns:
             list: List of dictionary representations of events.
                   Returns an empty list if there's an error.
@@ -31,7 +57,11 @@ class EventRepository:
         Raises:
             RepositoryError: If there's an error during database access.
         """
-        query = self.query_builder.build_query()
+        catalog = get_catalog()
+        if catalog is not None:
+            return project(catalog.get_all("events"), fields)
+
+        query = self.query_builder.build_query(fields)
 
         try:
             async with self.db_pool.acquire() as connection:
@@ -42,6 +72,42 @@ class EventRepository:
             self.logger.error(f"Error fetching events: {e}")
             raise RepositoryError(f"Error fetching events: {e}")
 
+    async def get_validator(self) -> str:
+        """
+        Identify the current state of the events without reading them.
+
+        Returns:
+            str: A token changing whenever an event does.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        validator = catalog_validator("events")
+        if validator is not None:
+            return validator
+        try:
+            return await fetch_validator(self.db_pool, "events")
+        except Exception as e:
+            self.logger.error(f"Error fetching the events validator: {e}")
+            raise RepositoryError(f"Error fetching the events validator: {e}")
+
+    async def get_archived(self) -> list:
+        """
+        Fetch the events moved to the archive by commands.archive_settled.
+
+        Returns:
+            list: List of dictionary representations of archived events.
+
+        Raises:
+            RepositoryError: If the archive files cannot be read.
+        """
+        try:
+            return await asyncio.to_thread(get_archive_store().read, "events")
+
+        except Exception as e:
+            self.logger.error(f"Error reading archived events: {e}")
+            raise RepositoryError(f"Error reading archived events: {e}")
+
     async def create(self, event: dict) -> dict:
         """
         Create a new event in the database.
@@ -60,25 +126,126 @@ class EventRepository:
 
         try:
             async with self.db_pool.acquire() as connection:
+                await ensure_time_partition(
+                    connection,
+                    event.get("scheduled_start") or datetime.now(timezone.utc),
+                )
                 row = await connection.fetchrow(insert_query)
+                publish_change("events", dict(row), event)
                 return dict(row)
 
         except Exception as e:
             self.logger.error(f"Error creating event: {e}")
             raise RepositoryError(f"Error creating event: {e}")
 
-    async def update(self, event_id: int, event: dict) -> dict:
+    async def upsert_many(self, events: List[dict]) -> List[dict]:
+        """
+        Create or update events by slug, leaving unchanged events unwritten.
+
+        Slugs are globally unique through event_slugs, but the upsert
+        statement is keyed by (slug, scheduled_start), the unique key of the
+        partitioned table. Events whose scheduled start changed are therefore
+        first moved, with their selections, as update does, in the same
+        transaction.
+
+        Args:
+            events (List[dict]): The events, holding every column of
+                                 UPSERT_COLUMNS, with unique slugs.
+
+        Returns:
+            List[dict]: The "status" ("created", "updated" or "unchanged") and
+                        the stored "row" of each event.
+
+        Raises:
+            ValidationError: If an event references a missing sport.
+            RepositoryError: If there's an error during database access.
+        """
+        slugs = [event["slug"] for event in events]
+        starts = [event["scheduled_start"] for event in events]
+        try:
+            async with self.db_pool.acquire() as connection:
+                for scheduled_start in set(starts):
+                    await ensure_time_partition(connection, scheduled_start)
+                async with connection.transaction():
+                    moved = await self._move_rescheduled(connection, slugs, starts)
+                    results = await upsert_rows(
+                        connection,
+                        "events",
+                        self.UPSERT_COLUMNS,
+                        ("slug", "scheduled_start"),
+                        events,
+                    )
+            for result in results:
+                if result["row"]["id"] in moved and result["status"] == "unchanged":
+                    result["status"] = "updated"
+                    publish_change("events", result["row"], result["row"])
+            return results
+        except ValidationError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error upserting events: {e}")
+            raise RepositoryError(f"Error upserting events: {e}")
+
+    @staticmethod
+    async def _move_rescheduled(connection, slugs: List[str], starts: list) -> set:
+        """
+        Move the existing events whose scheduled start differs from the given
+        one, and their selections, inside the caller's transaction.
+
+        Returns:
+            set: The IDs of the moved events.
+        """
+        rows = await connection.fetch(
+            "SELECT e.id, i.scheduled_start FROM event_slugs s "
+            "JOIN unnest($1::varchar[], $2::timestamptz[]) AS i(slug, scheduled_start) "
+            "ON i.slug = s.slug "
+            "JOIN events e ON e.id = s.event_id "
+            "WHERE e.scheduled_start <> i.scheduled_start "
+            "FOR UPDATE OF s",
+            slugs,
+            starts,
+        )
+        if not rows:
+            return set()
+        ids = [row["id"] for row in rows]
+        new_starts = [row["scheduled_start"] for row in rows]
+        await connection.execute(
+            "UPDATE events e SET scheduled_start = m.scheduled_start, "
+            "version = e.version + 1 "
+            "FROM unnest($1::int[], $2::timestamptz[]) AS m(id, scheduled_start) "
+            "WHERE e.id = m.id",
+            ids,
+            new_starts,
+        )
+        await connection.execute(
+            "UPDATE selections s SET event_start = m.scheduled_start "
+            "FROM unnest($1::int[], $2::timestamptz[]) AS m(id, scheduled_start) "
+            "WHERE s.event_id = m.id AND s.event_start <> m.scheduled_start",
+            ids,
+            new_starts,
+        )
+        return set(ids)
+
+    async def update(
+        self, event_id: int, event: dict, expected_version: Optional[int] = None
+    ) -> dict:
         """
         Update an event in the database.
 
+        A new scheduled start can move the event to another partition, so its
+        selections' event_start is moved along in the same transaction.
+
         Args:
             event_id (int): The ID of the event to be updated.
             event (dict): Dictionary representing the updated event data.
+            expected_version (Optional[int]): Only update the event at this
+                                              version.
 
         Returns:
             dict: Dictionary representing the updated event, or None if not found.
 
         Raises:
+            VersionConflictError: If the event is not at the expected version.
             RepositoryError: If there's an error during database access.
         """
         self.query_builder.add_condition("id", event_id)
@@ -87,8 +254,22 @@ class EventRepository:
 
         try:
             async with self.db_pool.acquire() as connection:
-                row = await connection.fetchrow(update_query)
+                await ensure_time_partition(connection, event.get("scheduled_start"))
+                async with connection.transaction():
+                    if not await check_version(
+                        connection, "events", event_id, expected_version
+                    ):
+                        return None
+                    row = await connection.fetchrow(update_query)
+                    if row and "scheduled_start" in event:
+                        await connection.execute(
+                            "UPDATE selections SET event_start = $2 "
+                            "WHERE event_id = $1 AND event_start <> $2",
+                            event_id,
+                            row["scheduled_start"],
+                        )
                 if row:
+                    publish_change("events", dict(row), event)
                     return dict(row)
                 return None
 
@@ -96,13 +277,14 @@ class EventRepository:
             self.logger.error(f"Error updating event with ID {event_id}: {e}")
             raise RepositoryError(f"Error updating event with ID {event_id}: {e}")
 
-    async def filter_events(self, query, params):
+    async def filter_events(self, query, params, timeout_ms: Optional[int] = None):
         """
         Filter events based on the provided query and parameters.
 
         Args:
             query (str): The SQL query string.
             params (tuple): The parameters for the query.
+            timeout_ms (Optional[int]): The statement_timeout budget of the query.
 
         Returns:
             list: List of dictionary representations of filtered events.
@@ -112,7 +294,8 @@ class EventRepository:
         """
         try:
             async with self.db_pool.acquire() as connection:
-                rows = await connection.fetch(query, *params)
+                async with statement_timeout(connection, timeout_ms):
+                    rows = await connection.fetch(query, *params)
                 return [dict(row) for row in rows]
 
         except RepositoryError as e:
@@ -132,10 +315,14 @@ class EventRepository:
         Raises:
             RepositoryError: If there's an error during database access.
         """
-        query = "SELECT COUNT(*) FROM events WHERE sport_id=$1 AND active=TRUE"
+        catalog = get_catalog()
+        if catalog is not None:
+            return catalog.get_active_events_count(sport_id)
+
+        query = "SELECT active_events_count FROM sports WHERE id=$1"
         try:
             async with self.db_pool.acquire() as connection:
-                return await connection.fetchval(query, sport_id)
+                return await connection.fetchval(query, sport_id) or 0
 
         except RepositoryError as e:
             self.logger.error(f"Error fetching active events count: {e}")
@@ -163,9 +350,168 @@ class EventRepository:
             async with self.db_pool.acquire() as connection:
                 row = await connection.fetchrow(update_query)
                 if row:
+                    publish_change("events", dict(row), event)
                     return dict(row)
                 return None
 
         except RepositoryError as e:
             self.logger.error(f"Error setting event as inactive: {e}")
             raise RepositoryError(f"Error setting event as inactive: {e}")
+
+    async def get_pending_events_until(self, until: datetime) -> list:
+        """
+        Fetch the pending events scheduled to start up to the given time.
+
+        Args:
+            until (datetime): Upper bound of the scheduled start.
+
+        Returns:
+            list: The "id" and "scheduled_start" of each pending event.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        query = (
+            "SELECT id, scheduled_start FROM events "
+            "WHERE status = 'pending' AND scheduled_start <= $1 "
+            "ORDER BY scheduled_start"
+        )
+        try:
+            async with self.db_pool.acquire() as connection:
+                rows = await connection.fetch(query, until)
+                return [dict(row) for row in rows]
+
+        except Exception as e:
+            self.logger.error(f"Error fetching pending events: {e}")
+            raise RepositoryError(f"Error fetching pending events: {e}")
+
+    async def start_events(self, event_ids: list) -> list:
+        """
+        Move the given pending events whose scheduled start has passed to
+        "started", in a single statement.
+
+        Args:
+            event_ids (list): The IDs of the events to start.
+
+        Returns:
+            list: Dictionary representations of the started events.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        query = (
+            "UPDATE events SET status = 'started', actual_start = CURRENT_TIMESTAMP, "
+            "version = version + 1 "
+            "WHERE id = ANY($1::int[]) AND status = 'pending' "
+            "AND scheduled_start <= CURRENT_TIMESTAMP RETURNING *"
+        )
+        try:
+            async with self.db_pool.acquire() as connection:
+                rows = await connection.fetch(query, event_ids)
+                events = [dict(row) for row in rows]
+                for event in events:
+                    publish_change("events", event, {"status": "started"})
+                return events
+
+        except Exception as e:
+            self.logger.error(f"Error starting events: {e}")
+            raise RepositoryError(f"Error starting events: {e}")
+
+    async def settle_events(
+        self, outcomes: List[Tuple[int, int, str]], winners: List[Tuple[int, int]]
+    ) -> dict:
+        """
+        Settle events in one transaction: set the outcome of their selections
+        with a single set-based update, then mark the events ended and inactive.
+
+        Args:
+            outcomes (List[Tuple[int, int, str]]): (event ID, selection ID,
+                                                   outcome) of the selections
+                                                   settled one by one.
+            winners (List[Tuple[int, int]]): (event ID, winning selection ID) of
+                                             the events whose other selections
+                                             all lose.
+
+        Returns:
+            dict: The settled "events" and "selections" rows.
+
+        Raises:
+            ValidationError: If an event does not exist or a selection is not
+                             one of its event's; nothing is settled then.
+            RepositoryError: If there's an error during database access.
+        """
+        event_ids = list(
+            dict.fromkeys([o[0] for o in outcomes] + [w[0] for w in winners])
+        )
+        settle_query = """
+            WITH outcomes AS (
+                SELECT o.event_id, o.selection_id, o.outcome, e.scheduled_start
+                FROM unnest($1::int[], $2::int[], $3::selectionoutcome[])
+                    AS o(event_id, selection_id, outcome)
+                JOIN events e ON e.id = o.event_id
+                UNION ALL
+                SELECT s.event_id, s.id,
+                       CASE WHEN s.id = w.winner_id THEN 'win' ELSE 'lose' END
+                           ::selectionoutcome,
+                       e.scheduled_start
+                FROM unnest($4::int[], $5::int[]) AS w(event_id, winner_id)
+                JOIN events e ON e.id = w.event_id
+                JOIN selections s
+                    ON s.event_id = e.id AND s.event_start = e.scheduled_start
+            )
+            UPDATE selections s SET outcome = o.outcome, version = s.version + 1
+            FROM outcomes o
+            WHERE s.id = o.selection_id AND s.event_id = o.event_id
+              AND s.event_start = o.scheduled_start
+            RETURNING s.*
+        """
+        end_query = (
+            "UPDATE events SET status = 'ended', active = FALSE, version = version + 1 "
+            "WHERE id = ANY($1::int[]) RETURNING *"
+        )
+
+        try:
+            async with self.db_pool.acquire() as connection:
+                async with connection.transaction():
+                    selections = await connection.fetch(
+                        settle_query,
+                        [o[0] for o in outcomes],
+                        [o[1] for o in outcomes],
+                        [o[2] for o in outcomes],
+                        [w[0] for w in winners],
+                        [w[1] for w in winners],
+                    )
+                    events = await connection.fetch(end_query, event_ids)
+
+                    missing_events = set(event_ids) - {e["id"] for e in events}
+                    if missing_events:
+                        raise ValidationError(
+                            f"Events not found: {sorted(missing_events)}"
+                        )
+                    settled = {(s["event_id"], s["id"]) for s in selections}
+                    foreign = [
+                        selection_id
+                        for event_id, selection_id in [o[:2] for o in outcomes]
+                        + winners
+                        if (event_id, selection_id) not in settled
+                    ]
+                    if foreign:
+                        raise ValidationError(
+                            f"Selections not found in their event: {sorted(foreign)}"
+                        )
+
+            events = [dict(row) for row in events]
+            selections = [dict(row) for row in selections]
+            for selection in selections:
+                publish_change(
+                    "selections", selection, {"outcome": selection["outcome"]}
+                )
+            for event in events:
+                publish_change("events", event, {"status": "ended", "active": False})
+            return {"events": events, "selections": selections}
+
+        except ValidationError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error settling events: {e}")
+            raise RepositoryError(f"Error settling events: {e}")
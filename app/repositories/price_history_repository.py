@@ -0,0 +1,178 @@
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Tuple
+
+from db.database import get_db_pool
+from .errors import RepositoryError
+
+
+class PriceHistoryRepository:
+    """
+    A repository class responsible for the append-only selection price history.
+    """
+
+    OHLC_INTERVALS = ("minute", "hour", "day")
+
+    def __init__(self, db_pool: get_db_pool, logger: logging.Logger):
+        """
+        Initialize the PriceHistoryRepository.
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+            logger (logging.Logger): An instance of the logging logger.
+        """
+        self.db_pool = db_pool
+        self.logger = logger
+
+    async def insert_ticks(self, ticks: List[Tuple[int, datetime, float]]):
+        """
+        Append a batch of price ticks using the COPY protocol.
+
+        Args:
+            ticks (List[Tuple[int, datetime, float]]): (selection_id, ts, price) tuples.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        try:
+            async with self.db_pool.acquire() as connection:
+                await connection.copy_records_to_table(
+                    "selection_price_history",
+                    records=ticks,
+                    columns=["selection_id", "ts", "price"],
+                )
+        except Exception as e:
+            self.logger.error(f"Error inserting {len(ticks)} price ticks: {e}")
+            raise RepositoryError(f"Error inserting price ticks: {str(e)}")
+
+    async def ensure_partitions(self, months_ahead: int = 2):
+        """
+        Create the monthly partitions from the current month up to
+        `months_ahead` months ahead, if they don't exist yet. Ticks of a month
+        without a partition are rejected, there is no DEFAULT partition.
+
+        Args:
+            months_ahead (int): Number of future months to prepare.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        query = (
+            "SELECT create_price_history_partition("
+            "(date_trunc('month', CURRENT_DATE) + make_interval(months => m))::date) "
+            "FROM generate_series(0, $1) AS m"
+        )
+        try:
+            async with self.db_pool.acquire() as connection:
+                await connection.execute(query, months_ahead)
+        except Exception as e:
+            self.logger.error(f"Error creating price history partitions: {e}")
+            raise RepositoryError(f"Error creating price history partitions: {str(e)}")
+
+    async def stream_history(
+        self,
+        selection_id: int,
+        start: datetime,
+        end: datetime,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict]:
+        """
+        Stream the price ticks of a selection in a time range, oldest first,
+        through a server-side cursor.
+
+        Args:
+            selection_id (int): The ID of the selection.
+            start (datetime): Inclusive lower bound of the range.
+            end (datetime): Exclusive upper bound of the range.
+            batch_size (int): Number of rows fetched per round trip.
+
+        Yields:
+            dict: The "ts" and "price" of each tick.
+        """
+        query = (
+            "SELECT ts, price FROM selection_price_history "
+            "WHERE selection_id = $1 AND ts >= $2 AND ts < $3 ORDER BY ts"
+        )
+        async with self.db_pool.acquire() as connection:
+            async with connection.transaction():
+                async for row in connection.cursor(
+                    query, selection_id, start, end, prefetch=batch_size
+                ):
+                    yield dict(row)
+
+    async def get_ohlc(
+        self,
+        selection_id: int,
+        start: datetime,
+        end: datetime,
+        interval: str = "minute",
+    ) -> List[dict]:
+        """
+        Downsample the price ticks of a selection to open/high/low/close bars.
+
+        Args:
+            selection_id (int): The ID of the selection.
+            start (datetime): Inclusive lower bound of the range.
+            end (datetime): Exclusive upper bound of the range.
+            interval (str): Bar size, one of "minute", "hour" or "day".
+
+        Returns:
+            List[dict]: One bar per interval with ticks, oldest first.
+
+        Raises:
+            ValueError: If the interval is not supported.
+            RepositoryError: If there's an error during database access.
+        """
+        if interval not in self.OHLC_INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}")
+
+        query = (
+            "SELECT date_trunc($4, ts) AS bucket, "
+            "(array_agg(price ORDER BY ts))[1] AS open, "
+            "max(price) AS high, min(price) AS low, "
+            "(array_agg(price ORDER BY ts DESC))[1] AS close, "
+            "count(*) AS ticks "
+            "FROM selection_price_history "
+            "WHERE selection_id = $1 AND ts >= $2 AND ts < $3 "
+            "GROUP BY bucket ORDER BY bucket"
+        )
+        try:
+            async with self.db_pool.acquire() as connection:
+                rows = await connection.fetch(query, selection_id, start, end, interval)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            self.logger.error(
+                f"Error fetching OHLC for selection ID {selection_id}: {e}"
+            )
+            raise RepositoryError(f"Error: {str(e)}")
+
+    async def get_opening_prices(
+        self, selection_ids: List[int], start: datetime
+    ) -> Dict[int, float]:
+        """
+        Fetch the first price of each selection since a point in time.
+
+        Args:
+            selection_ids (List[int]): The IDs of the selections.
+            start (datetime): Inclusive lower bound of the range.
+
+        Returns:
+            Dict[int, float]: The price of the first tick of each selection
+                              having one, by selection ID.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        query = (
+            "SELECT DISTINCT ON (selection_id) selection_id, price "
+            "FROM selection_price_history "
+            "WHERE selection_id = ANY($1::int[]) AND ts >= $2 "
+            "ORDER BY selection_id, ts"
+        )
+        try:
+            async with self.db_pool.acquire() as connection:
+                rows = await connection.fetch(query, selection_ids, start)
+            return {row["selection_id"]: row["price"] for row in rows}
+        except Exception as e:
+            self.logger.error(f"Error fetching opening prices: {e}")
+            raise RepositoryError(f"Error: {str(e)}")
@@ -0,0 +1,44 @@
+import logging
+from typing import List
+
+from db.database import get_db_pool
+from .errors import RepositoryError
+
+
+class SearchRepository:
+    """
+    A repository class running the cross-entity search queries.
+    """
+
+    def __init__(self, db_pool: get_db_pool, logger: logging.Logger):
+        """
+        Initialize the SearchRepository.
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+            logger (logging.Logger): The logger instance for logging events and errors.
+        """
+        self.db_pool = db_pool
+        self.logger = logger
+
+    async def search(self, query: str, params: list) -> List[dict]:
+        """
+        Run a search query built by utils.search_sql_query.
+
+        Args:
+            query (str): The SQL query string.
+            params (list): The parameters for the query.
+
+        Returns:
+            List[dict]: List of dictionary representations of the matched rows.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        try:
+            async with self.db_pool.acquire() as connection:
+                rows = await connection.fetch(query, *params)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error running search query: {e}")
+            raise RepositoryError(f"Error running search query: {e}")
@@ -1,10 +1,96 @@
-from typing import List
+from typing import List, Optional, Tuple
 import logging
 
-from db.database import get_db_pool
+from db.catalog import get_catalog
+from db.change_feed import publish_change
+from db.database import get_db_pool, statement_timeout
+from db.price_store import ACTIVE_PRICES_QUERY, PriceStore, get_price_store
 from schemas import SelectionOutcome
+from utils.custom_exceptions import ForeignKeyError, UpdateError
+from utils.fields import project, select_list
 from utils.query_builder import QueryBuilder
 from .errors import RepositoryError
+from .validators import catalog_validator, fetch_validator
+from .versioning import check_version
+
+# Channel of the NOTIFY sent when markets are suspended or resumed, one per call
+MARKET_STATUS_CHANNEL = "market_status"
+
+MARKET_SCOPES = {"event": "id", "sport": "sport_id"}
+
+
+def market_status_query(scope: str, active: bool) -> str:
+    """
+    Build the statement flipping the active flag of every selection of an event
+    or sport, cascading to the events and sports, and notifying listeners.
+
+    Suspending deactivates a sport only once none of its events is active;
+    resuming reopens only unsettled selections of pending or started events.
+    The active count triggers fire at the end of the statement, so the sport
+    cascade subtracts the events deactivated by the statement itself.
+
+    Args:
+        scope (str): "event" or "sport", what $1 is the ID of.
+        active (bool): True to resume, False to suspend.
+
+    Returns:
+        str: The SQL, taking the scope ID as $1 and returning the [ID, version]
+             pairs of the changed "selections", "events" and "sports".
+    """
+    value = "TRUE" if active else "FALSE"
+    open_events = "AND status IN ('pending', 'started')" if active else ""
+    open_selections = "AND s.outcome = 'unsettled'" if active else ""
+    sports = (
+        "sp.id = $1" if scope == "sport" else "sp.id IN (SELECT sport_id FROM target)"
+    )
+    if not active:
+        sports += (
+            " AND sp.active_events_count <= "
+            "(SELECT count(*) FROM changed_events ce WHERE ce.sport_id = sp.id)"
+        )
+    return f"""
+        WITH target AS (
+            SELECT id, scheduled_start, sport_id FROM events
+            WHERE {MARKET_SCOPES[scope]} = $1 {open_events}
+        ), changed_selections AS (
+            UPDATE selections s SET active = {value}, version = s.version + 1
+            FROM target t
+            WHERE s.event_id = t.id AND s.event_start = t.scheduled_start
+              AND s.active IS DISTINCT FROM {value} {open_selections}
+            RETURNING s.id, s.version
+        ), changed_events AS (
+            UPDATE events e SET active = {value}, version = e.version + 1
+            FROM target t
+            WHERE e.id = t.id AND e.scheduled_start = t.scheduled_start
+              AND e.active IS DISTINCT FROM {value}
+            RETURNING e.id, e.version, e.sport_id
+        ), changed_sports AS (
+            UPDATE sports sp SET active = {value}, version = sp.version + 1
+            WHERE {sports} AND sp.active IS DISTINCT FROM {value}
+            RETURNING sp.id, sp.version
+        ), changed AS (
+            SELECT
+                (SELECT coalesce(array_agg(ARRAY[id, version]), '{{}}')
+                 FROM changed_selections)
+                    AS selections,
+                (SELECT coalesce(array_agg(ARRAY[id, version]), '{{}}')
+                 FROM changed_events)
+                    AS events,
+                (SELECT coalesce(array_agg(ARRAY[id, version]), '{{}}')
+                 FROM changed_sports)
+                    AS sports
+        )
+        SELECT selections, events, sports, pg_notify(
+            '{MARKET_STATUS_CHANNEL}',
+            json_build_object(
+                'scope', '{scope}', 'id', $1, 'active', {value},
+                'selections', coalesce(array_length(selections, 1), 0),
+                'events', coalesce(array_length(events, 1), 0),
+                'sports', coalesce(array_length(sports, 1), 0)
+            )::text
+        )
+        FROM changed
+    """
 
 
 class SelectionRepository:
@@ -21,21 +107,40 @@ class SelectionRepository:
             logger (logging.Logger): An instance of the logging logger.
         """
         self.db_pool = db_pool
-        self.query_builder = QueryBuilder("selections")
+        self.query_builder = QueryBuilder("selections", version_column="version")
         self.logger = logger
 
-    async def get_all(self) -> list:
+    async def _event_start(self, connection, event_id: int):
+        # The partition key of a selection is its event's scheduled start;
+        # the share lock keeps the event from moving until the insert commits
+        event_start = await connection.fetchval(
+            "SELECT scheduled_start FROM events WHERE id = $1 FOR KEY SHARE",
+            event_id,
+        )
+        if event_start is None:
+            raise RepositoryError(f"Event with ID {event_id} not found")
+        return event_start
+
+    async def get_all(self, fields: Optional[Tuple[str, ...]] = None) -> list:
         """
         Fetch all selections from the database.
 
+        Args:
+            fields (Optional[Tuple[str, ...]]): The columns to return, from
+                                                utils.fields.parse_fields.
+
         Returns:
             list: List of dictionary representations of selections.
 
         Raises:
             RepositoryError: If there's an error during database access.
         """
+        catalog = get_catalog()
+        if catalog is not None:
+            return project(catalog.get_all("selections"), fields)
+
         try:
-            query = self.query_builder.build_query()
+            query = self.query_builder.build_query(fields)
             async with self.db_pool.acquire() as connection:
                 rows = await connection.fetch(query)
                 return [dict(row) for row in rows]
@@ -57,11 +162,16 @@ class SelectionRepository:
             RepositoryError: If there's a specific database error during the creation.
         """
         try:
-            self.query_builder.add_insert_data(selection)
-            insert_query = self.query_builder.build_insert_query()
             async with self.db_pool.acquire() as connection:
-                row = await connection.fetchrow(insert_query)
+                async with connection.transaction():
+                    selection["event_start"] = await self._event_start(
+                        connection, selection["event_id"]
+                    )
+                    self.query_builder.add_insert_data(selection)
+                    insert_query = self.query_builder.build_insert_query()
+                    row = await connection.fetchrow(insert_query)
                 if row:
+                    publish_change("selections", dict(row), selection)
                     return dict(row)
                 else:
                     raise RepositoryError("Record not found after insertion")
@@ -69,28 +179,60 @@ class SelectionRepository:
             self.logger.error(f"Error creating selection: {e}")
             raise RepositoryError(f"Error creating selection: {str(e)}")
 
-    async def update(self, selection_id: int, selection: dict) -> dict:
+    async def update(
+        self,
+        selection_id: int,
+        selection: dict,
+        expected_version: Optional[int] = None,
+    ) -> dict:
         """
         Update an existing selection in the database.
 
         Args:
             selection_id (int): The ID of the selection to update.
             selection (dict): Dictionary containing updated selection data.
+            expected_version (Optional[int]): Only update the selection at this
+                                              version.
 
         Returns:
             dict: Dictionary representing the updated selection.
 
         Raises:
+            VersionConflictError: If the selection is not at the expected version.
             UpdateError, ForeignKeyError: If there's an error during the update.
         """
         try:
-            self.query_builder.add_condition("id", selection_id)
-            self.query_builder.add_update_data(selection)
-            update_query = self.query_builder.build_update_query()
             self.logger.info(f"Updating selection with ID {selection_id}...")
             async with self.db_pool.acquire() as connection:
-                row = await connection.fetchrow(update_query)
+                async with connection.transaction():
+                    if not await check_version(
+                        connection, "selections", selection_id, expected_version
+                    ):
+                        raise UpdateError(
+                            f"Selection with ID {selection_id} not found."
+                        )
+                    if "event_id" in selection:
+                        selection["event_start"] = await self._event_start(
+                            connection, selection["event_id"]
+                        )
+                    # Clients send the price with every update, only a new
+                    # one is published as a change (and a price tick)
+                    previous_price = None
+                    if "price" in selection:
+                        previous_price = await connection.fetchval(
+                            "SELECT price FROM selections WHERE id = $1 "
+                            "FOR NO KEY UPDATE",
+                            selection_id,
+                        )
+                    self.query_builder.add_condition("id", selection_id)
+                    self.query_builder.add_update_data(selection)
+                    update_query = self.query_builder.build_update_query()
+                    row = await connection.fetchrow(update_query)
                 if row:
+                    changes = dict(selection)
+                    if previous_price is not None and previous_price == row["price"]:
+                        del changes["price"]
+                    publish_change("selections", dict(row), changes)
                     return dict(row)
                 raise UpdateError(f"Selection with ID {selection_id} not found.")
         except RepositoryError as e:
@@ -114,12 +256,14 @@ class SelectionRepository:
         Raises:
             RepositoryError: If there's an error during database access.
         """
-        count_query = (
-            "SELECT COUNT(*) FROM selections WHERE event_id=$1 AND active=TRUE"
-        )
+        catalog = get_catalog()
+        if catalog is not None:
+            return catalog.get_active_selections_count(event_id)
+
+        count_query = "SELECT active_selections_count FROM events WHERE id=$1"
         try:
             async with self.db_pool.acquire() as connection:
-                return await connection.fetchval(count_query, event_id)
+                return await connection.fetchval(count_query, event_id) or 0
         except Exception as e:
             self.logger.error(
                 f"Error fetching active selections count for event ID {event_id}: {e}"
@@ -149,12 +293,15 @@ class SelectionRepository:
             )
             raise RepositoryError(f"Error: {str(e)}")
 
-    async def filter_selections(self, query, params) -> List[dict]:
+    async def filter_selections(
+        self, query, params, timeout_ms: Optional[int] = None
+    ) -> List[dict]:
         """
         Search selections based on a regex pattern.
 
         Args:
             regex (str): The regex pattern to search for.
+            timeout_ms (Optional[int]): The statement_timeout budget of the query.
 
         Returns:
             List[dict]: List of dictionary representations of matched selections.
@@ -164,28 +311,143 @@ class SelectionRepository:
         """
         try:
             async with self.db_pool.acquire() as connection:
-                rows = await connection.fetch(query, *params)
+                async with statement_timeout(connection, timeout_ms):
+                    rows = await connection.fetch(query, *params)
                 return [dict(row) for row in rows]
         except RepositoryError as e:
             self.logger.error(f"Error searching selections with regex: {e}")
             raise Exception(f"Error searching selections: {str(e)}")
 
-    async def get_selections_by_event_id(self, event_id: int) -> List[dict]:
-        query = f"SELECT * FROM selections WHERE event_id = {event_id};"
+    async def get_validator_by_event_id(self, event_id: int) -> str:
+        """
+        Identify the current state of the selections of an event without
+        reading them.
+
+        Args:
+            event_id (int): The ID of the event.
+
+        Returns:
+            str: A token changing whenever one of the selections does.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        validator = catalog_validator("selections", event_id)
+        if validator is not None:
+            return validator
+        try:
+            return await fetch_validator(self.db_pool, "selections", event_id)
+        except Exception as e:
+            self.logger.error(f"Error fetching the selections validator: {e}")
+            raise RepositoryError(f"Error fetching the selections validator: {e}")
+
+    async def get_selections_by_event_id(
+        self, event_id: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> List[dict]:
+        catalog = get_catalog()
+        if catalog is not None:
+            return project(catalog.get_selections_by_event_id(event_id), fields)
+
+        # The event_start condition lets the planner prune to one partition
+        query = (
+            f"SELECT {select_list(fields)} FROM selections WHERE event_id = $1 "
+            "AND event_start = (SELECT scheduled_start FROM events WHERE id = $1)"
+        )
         try:
             async with self.db_pool.acquire() as connection:
-                rows = await connection.fetch(query)
+                rows = await connection.fetch(query, event_id)
                 return [dict(row) for row in rows]
         except RepositoryError as e:
             self.logger.error(f"Error getting selections with event ID: {e}")
             raise Exception(f"Error getting selections: {str(e)}")
 
-    async def get_selections_by_sport_id(self, sport_id: int) -> List[dict]:
-        query = f"SELECT s.* FROM selections s JOIN events e ON s.event_id = e.id WHERE e.sport_id= {sport_id};"
+    async def get_selections_by_sport_id(
+        self, sport_id: int, fields: Optional[Tuple[str, ...]] = None
+    ) -> List[dict]:
+        catalog = get_catalog()
+        if catalog is not None:
+            return project(catalog.get_selections_by_sport_id(sport_id), fields)
+
+        query = (
+            f"SELECT {select_list(fields, 's')} FROM selections s "
+            "JOIN events e ON s.event_id = e.id AND s.event_start = e.scheduled_start "
+            "WHERE e.sport_id = $1"
+        )
         try:
             async with self.db_pool.acquire() as connection:
-                rows = await connection.fetch(query)
+                rows = await connection.fetch(query, sport_id)
                 return [dict(row) for row in rows]
         except RepositoryError as e:
             self.logger.error(f"Error getting selections with sport ID: {e}")
             raise Exception(f"Error getting selections: {str(e)}")
+
+    async def get_active_prices(self, event_id: Optional[int] = None) -> PriceStore:
+        """
+        Fetch the prices of the active selections of active events, with only
+        the columns the market statistics need, straight into a PriceStore.
+        The in-memory store is used instead when it is loaded.
+
+        Args:
+            event_id (Optional[int]): Restrict the prices to this event.
+
+        Returns:
+            PriceStore: The selection "ids", "event_ids", "sport_ids" and
+                        "prices".
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        try:
+            price_store = get_price_store()
+            if price_store is not None:
+                return await price_store.get(self.db_pool)
+
+            query = ACTIVE_PRICES_QUERY
+            params = []
+            if event_id is not None:
+                query += " AND s.event_id = $1"
+                params.append(event_id)
+            async with self.db_pool.acquire() as connection:
+                rows = await connection.fetch(query, *params)
+            return PriceStore.from_rows(rows)
+        except Exception as e:
+            self.logger.error(f"Error fetching active selection prices: {e}")
+            raise RepositoryError(f"Error: {str(e)}")
+
+    async def set_market_active(self, scope: str, scope_id: int, active: bool) -> dict:
+        """
+        Suspend or resume every selection of an event or sport with one
+        set-based statement, which also cascades to the events and sports and
+        sends one notification on MARKET_STATUS_CHANNEL.
+
+        Args:
+            scope (str): "event" or "sport".
+            scope_id (int): The ID of the event or sport.
+            active (bool): True to resume, False to suspend.
+
+        Returns:
+            dict: The IDs of the changed "selections", "events" and "sports".
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        try:
+            async with self.db_pool.acquire() as connection:
+                row = await connection.fetchrow(
+                    market_status_query(scope, active), scope_id
+                )
+        except Exception as e:
+            self.logger.error(f"Error setting {scope} {scope_id} markets: {e}")
+            raise RepositoryError(f"Error: {str(e)}")
+
+        changed = {}
+        for table in ("selections", "events", "sports"):
+            changed[table] = []
+            for row_id, version in row[table]:
+                changed[table].append(row_id)
+                publish_change(
+                    table,
+                    {"id": row_id, "active": active, "version": version},
+                    {"active": active},
+                )
+        return changed
@@ -1,10 +1,17 @@
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 
-from db.database import get_db_pool
+from db.catalog import get_catalog
+from db.change_feed import publish_change
+from db.database import get_db_pool, statement_timeout
 from schemas import SportBase
+from utils.custom_exceptions import UpdateError
+from utils.fields import project
 from utils.query_builder import QueryBuilder
 from .errors import RepositoryError
+from .upserts import upsert_rows
+from .validators import catalog_validator, fetch_validator
+from .versioning import check_version
 
 
 class SportRepository:
@@ -17,13 +24,17 @@ class SportRepository:
             logger (logging.Logger): An instance of the logging logger.
         """
         self.db_pool = db_pool
-        self.query_builder = QueryBuilder("sports")
+        self.query_builder = QueryBuilder("sports", version_column="version")
         self.logger = logger
 
-    async def get_all(self) -> List[dict]:
+    async def get_all(self, fields: Optional[Tuple[str, ...]] = None) -> List[dict]:
         """
         Fetch all sports from the database.
 
+        Args:
+            fields (Optional[Tuple[str, ...]]): The columns to return, from
+                                                utils.fields.parse_fields.
+
         Returns:
             List[dict]: List of dictionary representations of sports.
                         Returns an empty list if there's an error.
@@ -31,8 +42,12 @@ class SportRepository:
         Raises:
             RepositoryError: If there's an error during database access.
         """
+        catalog = get_catalog()
+        if catalog is not None:
+            return project(catalog.get_all("sports"), fields)
+
         try:
-            query = self.query_builder.build_query()
+            query = self.query_builder.build_query(fields)
             async with self.db_pool.acquire() as connection:
                 rows = await connection.fetch(query)
                 return [dict(row) for row in rows]
@@ -40,6 +55,25 @@ class SportRepository:
             self.logger.error(f"Error fetching all sports: {str(e)}")
             raise RepositoryError(f"Error: {str(e)}")
 
+    async def get_validator(self) -> str:
+        """
+        Identify the current state of the sports without reading them.
+
+        Returns:
+            str: A token changing whenever a sport does.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        validator = catalog_validator("sports")
+        if validator is not None:
+            return validator
+        try:
+            return await fetch_validator(self.db_pool, "sports")
+        except Exception as e:
+            self.logger.error(f"Error fetching the sports validator: {e}")
+            raise RepositoryError(f"Error fetching the sports validator: {e}")
+
     async def create(self, sport: dict) -> dict:
         """
         Create a new sport in the database.
@@ -59,6 +93,7 @@ class SportRepository:
             async with self.db_pool.acquire() as connection:
                 row = await connection.fetchrow(insert_query)
                 if row:
+                    publish_change("sports", dict(row), sport)
                     return dict(row)
                 else:
                     raise RepositoryError("Record not found after insertion")
@@ -66,18 +101,52 @@ class SportRepository:
             self.logger.error(f"Error creating sport: {str(e)}")
             raise RepositoryError(f"Error creating sport: {str(e)}")
 
-    async def update(self, sport_id: int, sport: dict) -> dict:
+    async def upsert_many(self, sports: List[dict]) -> List[dict]:
+        """
+        Create or update sports by slug in one statement, leaving unchanged
+        sports unwritten.
+
+        Args:
+            sports (List[dict]): The "name", "slug" and "active" of each sport,
+                                 with unique slugs.
+
+        Returns:
+            List[dict]: The "status" ("created", "updated" or "unchanged") and
+                        the stored "row" of each sport.
+
+        Raises:
+            RepositoryError: If there's an error during database access.
+        """
+        try:
+            async with self.db_pool.acquire() as connection:
+                return await upsert_rows(
+                    connection,
+                    "sports",
+                    (("name", "varchar"), ("slug", "varchar"), ("active", "bool")),
+                    ("slug",),
+                    sports,
+                )
+        except Exception as e:
+            self.logger.error(f"Error upserting sports: {e}")
+            raise RepositoryError(f"Error upserting sports: {e}")
+
+    async def update(
+        self, sport_id: int, sport: dict, expected_version: Optional[int] = None
+    ) -> dict:
         """
         Update a sport in the database.
 
         Args:
             sport_id (int): The ID of the sport to be updated.
             sport (dict): Dictionary representing the updated sport data.
+            expected_version (Optional[int]): Only update the sport at this
+                                              version.
 
         Returns:
             dict: Dictionary representing the updated sport, or None if not found.
 
         Raises:
+            VersionConflictError: If the sport is not at the expected version.
             UpdateError: If the sport with the specified ID is not found.
             ForeignKeyError: If an invalid sport ID is provided.
         """
@@ -86,10 +155,16 @@ class SportRepository:
             self.query_builder.add_update_data(sport)
             update_query = self.query_builder.build_update_query()
             async with self.db_pool.acquire() as connection:
-                row = await connection.fetchrow(update_query)
+                async with connection.transaction():
+                    if not await check_version(
+                        connection, "sports", sport_id, expected_version
+                    ):
+                        return None
+                    row = await connection.fetchrow(update_query)
                 if row:
+                    publish_change("sports", dict(row), sport)
                     return dict(row)
-                raise UpdateError(f"Sport with ID {selection_id} not found.")
+                raise UpdateError(f"Sport with ID {sport_id} not found.")
         except RepositoryError as e:
             if "selections_event_id_fkey" in str(e):
                 raise RepositoryError("Invalid sport ID provided.") from e
@@ -97,10 +172,13 @@ class SportRepository:
                 f"Error updating sport with ID {sport_id}. Error: {str(e)}"
             )
 
-    async def filter_sports(self, query, params) -> List[dict]:
+    async def filter_sports(
+        self, query, params, timeout_ms: Optional[int] = None
+    ) -> List[dict]:
         try:
             async with self.db_pool.acquire() as connection:
-                rows = await connection.fetch(query, *params)
+                async with statement_timeout(connection, timeout_ms):
+                    rows = await connection.fetch(query, *params)
                 return [dict(row) for row in rows]
 
         except RepositoryError as e:
@@ -114,6 +192,8 @@ class SportRepository:
         Args:
             sport_id (int): The ID of the sport to be marked as inactive.
         """
-        update_query = "UPDATE sports SET active=FALSE WHERE id=$1"
+        update_query = "UPDATE sports SET active=FALSE, version = version + 1 WHERE id=$1 RETURNING *"
         async with self.db_pool.acquire() as connection:
-            await connection.execute(update_query, sport_id)
+            row = await connection.fetchrow(update_query, sport_id)
+            if row:
+                publish_change("sports", dict(row), {"active": False})
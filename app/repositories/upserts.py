@@ -0,0 +1,49 @@
+from typing import List, Tuple
+
+from asyncpg.exceptions import ForeignKeyViolationError
+
+from db.change_feed import publish_change
+from utils.custom_exceptions import ValidationError
+from utils.upsert_sql import upsert_query
+
+
+async def upsert_rows(
+    connection,
+    table: str,
+    columns: Tuple[Tuple[str, str], ...],
+    conflict: Tuple[str, ...],
+    rows: List[dict],
+) -> List[dict]:
+    """
+    Upsert rows in one statement and publish the ones actually written.
+
+    Args:
+        connection (asyncpg.Connection): The connection to use.
+        table (str): The table.
+        columns (Tuple[Tuple[str, str], ...]): (column, Postgres type) pairs.
+        conflict (Tuple[str, ...]): The columns of the unique constraint.
+        rows (List[dict]): The rows, holding every column.
+
+    Returns:
+        List[dict]: The "status" ("created", "updated" or "unchanged") and the
+                    stored "row" of each input row.
+
+    Raises:
+        ValidationError: If a row references a missing parent.
+    """
+    arrays = [[row[name] for row in rows] for name, _ in columns]
+    try:
+        records = await connection.fetch(
+            upsert_query(table, columns, conflict), *arrays
+        )
+    except ForeignKeyViolationError as e:
+        raise ValidationError(f"Invalid reference in {table}: {e.detail or e}")
+
+    results = []
+    for record in records:
+        row = dict(record)
+        status = row.pop("upsert_status")
+        if status != "unchanged":
+            publish_change(table, row, row)
+        results.append({"status": status, "row": row})
+    return results
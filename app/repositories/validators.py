@@ -0,0 +1,53 @@
+from typing import Optional
+
+from db.catalog import get_catalog
+
+# Counters maintained by statement-level triggers: one per table, and one per
+# parent row for the tables listed here (table -> counter table, parent key)
+TABLE_GENERATION_QUERY = (
+    "SELECT generation FROM table_generations WHERE table_name = $1"
+)
+PARENT_GENERATIONS = {
+    "selections": ("event_selection_generations", "event_id"),
+}
+
+
+async def fetch_validator(db_pool, table: str, parent_id: Optional[int] = None) -> str:
+    """
+    Read the generation counter of a table, or of the children of one parent
+    row, bumped by the database on every statement changing them.
+
+    Args:
+        db_pool (asyncpg.pool.Pool): The database connection pool.
+        table (str): The table.
+        parent_id (Optional[int]): The parent row, e.g. the event of
+                                   selections, None for the whole table.
+
+    Returns:
+        str: The generation, as an opaque token.
+    """
+    if parent_id is None:
+        query, args = TABLE_GENERATION_QUERY, (table,)
+    else:
+        counters, parent_key = PARENT_GENERATIONS[table]
+        # No row until the first write to the parent's children
+        query = (
+            f"SELECT coalesce((SELECT generation FROM {counters} "
+            f"WHERE {parent_key} = $1), 0)"
+        )
+        args = (parent_id,)
+    async with db_pool.acquire() as connection:
+        generation = await connection.fetchval(query, *args)
+    return f"db:{generation}"
+
+
+def catalog_validator(table: str, parent_id: Optional[int] = None) -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: The generation of the table in the in-memory catalog,
+                       None when the catalog is not loaded.
+    """
+    catalog = get_catalog()
+    if catalog is None:
+        return None
+    return "catalog:" + catalog.generation(table, parent_id)
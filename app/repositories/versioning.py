@@ -0,0 +1,47 @@
+from typing import Optional
+
+from asyncpg.exceptions import LockNotAvailableError
+
+from utils.custom_exceptions import VersionConflictError
+
+
+async def check_version(
+    connection, table: str, row_id: int, expected_version: Optional[int]
+) -> bool:
+    """
+    Lock a row for a conditional update, inside the caller's transaction.
+
+    The lock is taken with NOWAIT, so a writer racing another one fails at once
+    instead of queueing behind its row lock.
+
+    Args:
+        connection (asyncpg.Connection): The connection of the transaction.
+        table (str): The table of the row.
+        row_id (int): The ID of the row.
+        expected_version (Optional[int]): The version the caller read, None to
+                                          skip the check.
+
+    Returns:
+        bool: False if the row does not exist.
+
+    Raises:
+        VersionConflictError: If the row is locked by another writer or its
+                              version is not the expected one.
+    """
+    if expected_version is None:
+        return True
+    try:
+        version = await connection.fetchval(
+            f"SELECT version FROM {table} WHERE id = $1 FOR NO KEY UPDATE NOWAIT",
+            row_id,
+        )
+    except LockNotAvailableError:
+        raise VersionConflictError(f"{table} {row_id} is being updated")
+    if version is None:
+        return False
+    if version != expected_version:
+        raise VersionConflictError(
+            f"{table} {row_id} is at version {version}, not {expected_version}",
+            current_version=version,
+        )
+    return True
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, conint, constr
+from pydantic import BaseModel, conint, conlist, constr
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 
 class EventType(Enum):
@@ -41,11 +41,19 @@ class SportBase(BaseModel):
     active: bool
 
 
+class SportBulkUpsert(BaseModel):
+    sports: conlist(SportBase, min_length=1, max_length=10000)
+
+
 class SportUpdate(BaseModel):
     name: Optional[str] = None
     active: Optional[bool] = None
 
 
+class EventBulkUpsert(BaseModel):
+    events: conlist(EventBase, min_length=1, max_length=10000)
+
+
 class SelectionOutcome(Enum):
     UNSETTLED = "unsettled"
     VOID = "void"
@@ -69,6 +77,21 @@ class SelectionUpdate(BaseModel):
     outcome: Optional[SelectionOutcome] = None
 
 
+class EventSettlement(BaseModel):
+    # Either the outcome of each selection, or the winning selection, all the
+    # other selections of the event losing
+    outcomes: Optional[Dict[int, SelectionOutcome]] = None
+    winner_id: Optional[int] = None
+
+
+class EventSettlementItem(EventSettlement):
+    event_id: int
+
+
+class BulkSettlement(BaseModel):
+    settlements: conlist(EventSettlementItem, min_length=1, max_length=10000)
+
+
 class SelectionFilter(BaseModel):
     name_regex: Optional[constr(strip_whitespace=True)] = None
     active: Optional[bool] = None
@@ -80,3 +103,45 @@ class Filters(BaseModel):
     start_time_from: Optional[datetime] = None
     start_time_to: Optional[datetime] = None
     timezone: Optional[str] = None
+
+
+class SportSearch(BaseModel):
+    slug: Optional[str] = None
+    name: Optional[str] = None
+    name_prefix: Optional[constr(min_length=1)] = None
+    active: Optional[bool] = None
+
+
+class EventSearch(BaseModel):
+    slug: Optional[str] = None
+    name: Optional[str] = None
+    name_prefix: Optional[constr(min_length=1)] = None
+    active: Optional[bool] = None
+    type: Optional[EventType] = None
+    status: Optional[EventStatus] = None
+    scheduled_start_from: Optional[datetime] = None
+    scheduled_start_to: Optional[datetime] = None
+
+
+class SelectionSearch(BaseModel):
+    name: Optional[str] = None
+    name_prefix: Optional[constr(min_length=1)] = None
+    active: Optional[bool] = None
+    outcome: Optional[SelectionOutcome] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+
+
+class SearchTarget(Enum):
+    SPORT = "sport"
+    EVENT = "event"
+    SELECTION = "selection"
+
+
+class SearchCriteria(BaseModel):
+    sport: Optional[SportSearch] = None
+    event: Optional[EventSearch] = None
+    selection: Optional[SelectionSearch] = None
+    target: Optional[SearchTarget] = None
+    limit: conint(ge=1, le=1000) = 100
+    offset: conint(ge=0) = 0
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from repositories.event_repository import EventRepository
+from utils.metrics import get_metrics
+
+# Key of the Postgres advisory lock electing the single scheduler leader.
+SCHEDULER_LOCK_KEY = 888030
+
+
+class EventScheduler:
+    """
+    Background scheduler moving pending events to "started" at their
+    scheduled start.
+
+    Upcoming starts are kept in a timer heap refreshed from the database; due
+    events are flipped in batched single-statement updates. Only the worker
+    holding the advisory lock runs the schedule, the others wait as standby.
+    """
+
+    def __init__(
+        self,
+        db_pool,
+        logger: logging.Logger,
+        horizon: timedelta = timedelta(minutes=10),
+        refresh_interval: float = 30.0,
+        batch_size: int = 500,
+    ):
+        """
+        Initialize the EventScheduler.
+
+        Args:
+            db_pool (asyncpg.pool.Pool): The database connection pool.
+            logger (logging.Logger): The logger instance for logging events and errors.
+            horizon (timedelta): How far ahead upcoming starts are loaded.
+            refresh_interval (float): Seconds between reloads of upcoming starts.
+            batch_size (int): Maximum events started per statement.
+        """
+        self.db_pool = db_pool
+        self.event_repository = EventRepository(db_pool, logger)
+        self.logger = logger
+        self.horizon = horizon
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.metrics = get_metrics()
+        self._heap: List[Tuple[datetime, int]] = []
+        self._scheduled: Dict[int, datetime] = {}
+
+    def schedule(self, event_id: int, scheduled_start: datetime):
+        """
+        Add or move an event in the timer heap. Moved events leave a stale
+        entry behind that is skipped when popped.
+
+        Args:
+            event_id (int): The ID of the event.
+            scheduled_start (datetime): When the event should start.
+        """
+        if self._scheduled.get(event_id) == scheduled_start:
+            return
+        self._scheduled[event_id] = scheduled_start
+        heapq.heappush(self._heap, (scheduled_start, event_id))
+
+    def next_start(self) -> Optional[datetime]:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """
+        Pop the events due at `now` from the timer heap.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            List[int]: The IDs of the due events.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            scheduled_start, event_id = heapq.heappop(self._heap)
+            if self._scheduled.get(event_id) == scheduled_start:
+                del self._scheduled[event_id]
+                due.append(event_id)
+        return due
+
+    async def refresh(self, now: datetime):
+        events = await self.event_repository.get_pending_events_until(
+            now + self.horizon
+        )
+        for event in events:
+            self.schedule(event["id"], event["scheduled_start"])
+
+    async def fire_due(self, now: datetime) -> int:
+        """
+        Start every due event, in batches of `batch_size`, and record how late
+        each transition fired.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            int: Number of events started.
+        """
+        due = self.pop_due(now)
+        started = 0
+        for i in range(0, len(due), self.batch_size):
+            events = await self.event_repository.start_events(
+                due[i : i + self.batch_size]
+            )
+            for event in events:
+                lateness = event["actual_start"] - event["scheduled_start"]
+                self.metrics.observe(
+                    "event_scheduler.lateness_seconds", lateness.total_seconds()
+                )
+            started += len(events)
+
+        if started:
+            self.metrics.increment("event_scheduler.events_started", started)
+            self.logger.info(f"Event scheduler started {started} events")
+        return started
+
+    async def _lead(self):
+        next_refresh = datetime.min.replace(tzinfo=timezone.utc)
+        while True:
+            now = datetime.now(timezone.utc)
+            if now >= next_refresh:
+                await self.refresh(now)
+                next_refresh = now + timedelta(seconds=self.refresh_interval)
+
+            await self.fire_due(now)
+
+            wake_at = min(filter(None, (self.next_start(), next_refresh)))
+            delay = (wake_at - datetime.now(timezone.utc)).total_seconds()
+            await asyncio.sleep(max(delay, 0))
+
+    async def run(self):
+        """
+        Run the scheduler until cancelled, taking over as leader whenever the
+        advisory lock becomes free.
+        """
+        while True:
+            try:
+                async with self.db_pool.acquire() as lock_connection:
+                    acquired = await lock_connection.fetchval(
+                        "SELECT pg_try_advisory_lock($1)", SCHEDULER_LOCK_KEY
+                    )
+                    if not acquired:
+                        await asyncio.sleep(self.refresh_interval)
+                        continue
+
+                    self.logger.info("Event scheduler is the leader")
+                    self.metrics.increment("event_scheduler.leadership_acquired")
+                    try:
+                        await self._lead()
+                    finally:
+                        await lock_connection.execute(
+                            "SELECT pg_advisory_unlock($1)", SCHEDULER_LOCK_KEY
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error running the event scheduler: {e}")
+                self.metrics.increment("event_scheduler.errors")
+                await asyncio.sleep(self.refresh_interval)
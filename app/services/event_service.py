@@ -1,11 +1,17 @@
 import logging
 
 from datetime import datetime
+from typing import List, Optional
 from repositories.event_repository import EventRepository
 from utils.prepare_data_for_insert import prepare_data_for_insert
 from utils.slugify import to_slug
 
-from schemas import EventType, EventStatus
+from schemas import EventType, EventStatus, SelectionOutcome
+from db.database import StatementTimeoutError
+from utils.custom_exceptions import ValidationError
+from utils.fields import parse_fields, project
+from utils.metrics import get_metrics, count_upserts
+from utils.regex_filter import REGEX_TIMEOUT_MS, regex_conditions
 
 
 class EventService:
@@ -24,10 +30,19 @@ class EventService:
         self.event_repository = event_repository
         self.logger = logger
 
-    async def get_all(self):
+    async def get_all(
+        self, include_archived: bool = False, fields: Optional[str] = None
+    ):
         """
         Retrieve all events from the database.
 
+        Args:
+            include_archived (bool): Also return the archived events. An event
+                                     both live and archived, left by an
+                                     interrupted archival, is returned once.
+            fields (Optional[str]): The comma-separated columns to return,
+                                    None for all.
+
         Returns:
             list: List of all events.
 
@@ -35,11 +50,55 @@ class EventService:
             Exception: If there's an error fetching events from the database.
         """
         try:
-            return await self.event_repository.get_all()
+            columns = parse_fields("events", fields)
+            events = await self.event_repository.get_all(columns)
+            if not include_archived:
+                return events
+
+            live_ids = {event["id"] for event in events}
+            archived = await self.event_repository.get_archived()
+            return events + project(
+                [event for event in archived if event["id"] not in live_ids], columns
+            )
         except Exception as e:
             self.logger.error(f"Error fetching all events: {e}")
             raise
 
+    async def get_validator(self) -> str:
+        """
+        Identify the current state of the events list, for conditional GETs.
+        Archiving deletes the live rows, so it also covers the archived events.
+
+        Returns:
+            str: A token changing whenever an event does.
+        """
+        return await self.event_repository.get_validator()
+
+    @staticmethod
+    def _event_data(event: dict) -> dict:
+        scheduled_start = datetime.fromisoformat(event["scheduled_start"].isoformat())
+        actual_start = datetime.fromisoformat(event["actual_start"].isoformat())
+        type_value = (
+            event["type"].value
+            if isinstance(event["type"], EventType)
+            else event["type"]
+        )
+        status_value = (
+            event["status"].value
+            if isinstance(event["status"], EventStatus)
+            else event["status"]
+        )
+        return {
+            "name": event["name"],
+            "slug": to_slug(event["name"]),
+            "active": event["active"],
+            "type": type_value,
+            "sport_id": event["sport_id"],
+            "status": status_value,
+            "scheduled_start": scheduled_start,
+            "actual_start": actual_start,
+        }
+
     async def create(self, event):
         """
         Create a new event based on provided details.
@@ -54,42 +113,50 @@ class EventService:
             Exception: If there's an error creating a new event.
         """
         try:
-            scheduled_start = datetime.fromisoformat(
-                event["scheduled_start"].isoformat()
-            )
-            actual_start = datetime.fromisoformat(event["actual_start"].isoformat())
-            type_value = (
-                event["type"].value
-                if isinstance(event["type"], EventType)
-                else event["type"]
-            )
-            status_value = (
-                event["status"].value
-                if isinstance(event["status"], EventStatus)
-                else event["status"]
-            )
-            event_data = {
-                "name": event["name"],
-                "slug": to_slug(event["name"]),
-                "active": event["active"],
-                "type": type_value,
-                "sport_id": event["sport_id"],
-                "status": status_value,
-                "scheduled_start": scheduled_start,
-                "actual_start": actual_start,
-            }
-            return await self.event_repository.create(event_data)
+            return await self.event_repository.create(self._event_data(event))
         except Exception as e:
             self.logger.error(f"Error creating event: {e}")
             raise
 
-    async def update(self, event_id: int, event: dict) -> dict:
+    async def upsert_many(self, events: List[dict]) -> List[dict]:
+        """
+        Create or update events keyed by slug. An event whose scheduled start
+        changed is moved, with its selections. Events identical to the stored
+        ones are not written.
+
+        Args:
+            events (List[dict]): The events, as for create.
+
+        Returns:
+            List[dict]: The "status" ("created", "updated" or "unchanged") and
+                        the stored "row" of each event.
+
+        Raises:
+            ValidationError: If two events share a slug or a sport is missing.
+        """
+        event_data = [self._event_data(event) for event in events]
+        slugs = [event["slug"] for event in event_data]
+        if len(set(slugs)) != len(slugs):
+            raise ValidationError("Events with the same slug")
+        try:
+            results = await self.event_repository.upsert_many(event_data)
+        except Exception as e:
+            self.logger.error(f"Error upserting events: {e}")
+            raise
+        count_upserts("events", results)
+        return results
+
+    async def update(
+        self, event_id: int, event: dict, expected_version: Optional[int] = None
+    ) -> dict:
         """
         Update an event based on the given event_id.
 
         Args:
             event_id (int): ID of the event to be updated.
             event_data (dict): Updated event data.
+            expected_version (Optional[int]): The version the client read, from
+                                              its If-Match header.
 
         Returns:
             dict: The updated event's data.
@@ -120,7 +187,9 @@ class EventService:
                 if value is not None
             }
             return_event = prepare_data_for_insert(processed_event)
-            return await self.event_repository.update(event_id, return_event)
+            return await self.event_repository.update(
+                event_id, return_event, expected_version
+            )
         except Exception as e:
             self.logger.error(f"Error updating event {event_id}: {e}")
             raise
@@ -141,31 +210,36 @@ class EventService:
             self.logger.error(f"Error fetching events' selections: {e}")
             raise
 
-    async def filter_events(self, criteria: dict) -> dict:
+    async def filter_events(self, criteria: dict, fields: Optional[str] = None) -> dict:
         try:
+            columns = parse_fields("event_filter", fields)
             query_parts = [
                 "WITH ActiveSelections AS (",
-                "    SELECT e.id, e.name, COUNT(s.id) as active_selections_count",
+                "    SELECT e.id, e.name, e.active_selections_count",
                 "    FROM events e",
-                "    LEFT JOIN selections s ON e.id = s.event_id AND s.active = TRUE",
                 "    WHERE 1=1",
             ]
 
             params = []
+            timeout_ms = None
 
             if "name_regex" in criteria and criteria["name_regex"]:
-                query_parts.append("    AND e.name ~ $" + str(len(params) + 1))
-                params.append(criteria["name_regex"])
+                conditions, regex_params = regex_conditions(
+                    "e.name", criteria["name_regex"], len(params) + 1
+                )
+                query_parts.extend("    AND " + condition for condition in conditions)
+                params.extend(regex_params)
+                timeout_ms = REGEX_TIMEOUT_MS
 
             if "active" in criteria and isinstance(criteria["active"], bool):
                 query_parts.append("    AND e.active = $" + str(len(params) + 1))
                 params.append(criteria["active"])
 
-            query_parts.append("    GROUP BY e.id, e.name")
-
             threshold_value = criteria.get("threshold", 1)
             if threshold_value:
-                query_parts.append("    HAVING COUNT(s.id) >= $" + str(len(params) + 1))
+                query_parts.append(
+                    "    AND e.active_selections_count >= $" + str(len(params) + 1)
+                )
                 params.append(threshold_value)
 
             if criteria.get("start_time") and criteria.get("end_time"):
@@ -197,7 +271,84 @@ class EventService:
 
             query = "\n".join(query_parts)
 
-            return await self.event_repository.filter_events(query, params)
+            return project(
+                await self.event_repository.filter_events(query, params, timeout_ms),
+                columns,
+            )
+        except StatementTimeoutError as e:
+            get_metrics().increment("regex_filter.timed_out")
+            self.logger.error(f"Regex filter on events exceeded its time budget: {e}")
+            raise
         except Exception as e:
             self.logger.error(f"Error searching for events: {e}")
             raise
+
+    async def settle(self, event_id: int, settlement: dict) -> dict:
+        """
+        Settle an event: set the outcome of its selections, then mark it ended
+        and inactive, in one transaction.
+
+        Args:
+            event_id (int): ID of the event to settle.
+            settlement (dict): Either "outcomes", the outcome of each selection
+                               by ID, or "winner_id", all the other selections
+                               of the event losing.
+
+        Returns:
+            dict: The settled "event" and its updated "selections".
+
+        Raises:
+            ValidationError: If the settlement is invalid.
+        """
+        result = await self.settle_many([{**settlement, "event_id": event_id}])
+        return {"event": result["events"][0], "selections": result["selections"]}
+
+    async def settle_many(self, settlements: List[dict]) -> dict:
+        """
+        Settle many events in one transaction, with one set-based update for
+        all their selections.
+
+        Args:
+            settlements (List[dict]): The settlement of each event, with its
+                                      "event_id".
+
+        Returns:
+            dict: The settled "events" and "selections" rows.
+
+        Raises:
+            ValidationError: If a settlement is invalid; nothing is settled then.
+        """
+        outcomes, winners, seen = [], [], set()
+        for settlement in settlements:
+            event_id = settlement["event_id"]
+            if event_id in seen:
+                raise ValidationError(f"Event {event_id} is settled more than once")
+            seen.add(event_id)
+
+            has_winner = settlement.get("winner_id") is not None
+            if has_winner == bool(settlement.get("outcomes")):
+                raise ValidationError(
+                    f"Event {event_id}: give either outcomes or winner_id"
+                )
+            if has_winner:
+                winners.append((event_id, settlement["winner_id"]))
+                continue
+            for selection_id, outcome in settlement["outcomes"].items():
+                try:
+                    outcome = SelectionOutcome(outcome)
+                except ValueError:
+                    raise ValidationError(f"Invalid outcome: {outcome}")
+                if outcome is SelectionOutcome.UNSETTLED:
+                    raise ValidationError(
+                        f"Selection {selection_id} cannot be settled as unsettled"
+                    )
+                outcomes.append((event_id, int(selection_id), outcome.value))
+
+        try:
+            result = await self.event_repository.settle_events(outcomes, winners)
+        except Exception as e:
+            self.logger.error(f"Error settling events: {e}")
+            raise
+        get_metrics().increment("settlement.events", len(result["events"]))
+        get_metrics().increment("settlement.selections", len(result["selections"]))
+        return result
@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from repositories.price_history_repository import PriceHistoryRepository
+from repositories.selection_repository import MARKET_SCOPES, SelectionRepository
+from utils.custom_exceptions import ValidationError
+from utils.metrics import get_metrics
+
+
+class MarketService:
+    """
+    Service class computing market statistics over selection prices, and
+    suspending or resuming markets.
+    """
+
+    # The price drift is measured from the first tick of this window
+    DRIFT_WINDOW = timedelta(days=1)
+
+    def __init__(
+        self,
+        selection_repository: SelectionRepository,
+        logger: logging.Logger,
+        price_history_repository: Optional[PriceHistoryRepository] = None,
+    ):
+        """
+        Initialize the MarketService.
+
+        Args:
+            selection_repository (SelectionRepository): The repository for selection data.
+            logger (logging.Logger): The logger instance for logging events and errors.
+            price_history_repository (Optional[PriceHistoryRepository]): The
+                repository for price history data, None to leave out the drift.
+        """
+        self.selection_repository = selection_repository
+        self.logger = logger
+        self.price_history_repository = price_history_repository
+
+    async def get_event_market_stats(self, event_id: int):
+        """
+        Compute the overround, price range, implied probabilities and price
+        drift over DRIFT_WINDOW of an event's active selections.
+
+        Args:
+            event_id (int): The ID of the event.
+
+        Returns:
+            dict: The event market statistics, or None if the event has no
+                  active priced selections.
+        """
+        try:
+            store = await self.selection_repository.get_active_prices(event_id)
+            opening_prices = None
+            selection_ids = store.selection_ids(event_id)
+            if self.price_history_repository is not None and selection_ids:
+                opening_prices = await self.price_history_repository.get_opening_prices(
+                    selection_ids, datetime.now(timezone.utc) - self.DRIFT_WINDOW
+                )
+            return store.event_stats(event_id, opening_prices)
+        except Exception as e:
+            self.logger.error(f"Error computing market stats for event {event_id}: {e}")
+            raise
+
+    async def get_market_stats(self) -> dict:
+        """
+        Compute the market statistics of every active event, and aggregated
+        per sport.
+
+        Returns:
+            dict: The per-event statistics under "events" and the per-sport
+                  statistics under "sports".
+        """
+        try:
+            store = await self.selection_repository.get_active_prices()
+            return {
+                "events": store.stats_by_event(),
+                "sports": store.stats_by_sport(),
+            }
+        except Exception as e:
+            self.logger.error(f"Error computing market stats: {e}")
+            raise
+
+    async def set_markets_active(self, scope: str, scope_id: int, active: bool):
+        """
+        Suspend or resume all the selections of an event or a sport at once.
+
+        Args:
+            scope (str): "event" or "sport".
+            scope_id (int): The ID of the event or sport.
+            active (bool): True to resume, False to suspend.
+
+        Returns:
+            dict: The scope, ID and new state, with the number of "selections",
+                  "events" and "sports" changed, as sent to the listeners.
+
+        Raises:
+            ValidationError: If the scope is unknown.
+        """
+        if scope not in MARKET_SCOPES:
+            raise ValidationError(f"Unknown market scope: {scope}")
+        try:
+            changed = await self.selection_repository.set_market_active(
+                scope, scope_id, active
+            )
+        except Exception as e:
+            self.logger.error(f"Error setting {scope} {scope_id} markets: {e}")
+            raise
+
+        action = "resumed" if active else "suspended"
+        get_metrics().increment(f"markets.{action}")
+        self.logger.info(
+            f"Markets of {scope} {scope_id} {action}: "
+            f"{len(changed['selections'])} selections"
+        )
+        return {
+            "scope": scope,
+            "id": scope_id,
+            "active": active,
+            **{table: len(ids) for table, ids in changed.items()},
+        }
@@ -0,0 +1,114 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+
+from repositories.price_history_repository import PriceHistoryRepository
+
+
+class PriceHistoryService:
+    """
+    Service class for querying the selection price history.
+    """
+
+    DEFAULT_RANGE = timedelta(days=1)
+
+    def __init__(
+        self, price_history_repository: PriceHistoryRepository, logger: logging.Logger
+    ):
+        """
+        Initialize the PriceHistoryService.
+
+        Args:
+            price_history_repository (PriceHistoryRepository): The repository for price history data.
+            logger (logging.Logger): The logger instance for logging events and errors.
+        """
+        self.price_history_repository = price_history_repository
+        self.logger = logger
+
+    def time_range(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> Tuple[datetime, datetime]:
+        """
+        Resolve a requested range, which defaults to the day before end, end
+        defaulting to now. Naive datetimes are taken as UTC.
+
+        Args:
+            start (Optional[datetime]): Inclusive lower bound of the range.
+            end (Optional[datetime]): Exclusive upper bound of the range.
+
+        Returns:
+            Tuple[datetime, datetime]: The start and end of the range.
+
+        Raises:
+            ValueError: If the range is empty.
+        """
+        start, end = (
+            (
+                value.replace(tzinfo=timezone.utc)
+                if value is not None and value.tzinfo is None
+                else value
+            )
+            for value in (start, end)
+        )
+        end = end or datetime.now(timezone.utc)
+        start = start or end - self.DEFAULT_RANGE
+        if start >= end:
+            raise ValueError("start must be before end")
+        return start, end
+
+    async def stream_history(
+        self,
+        selection_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the price ticks of a selection as NDJSON lines. The range
+        defaults to the last day; resolve it with time_range first, as an
+        empty one fails once the stream has started.
+
+        Args:
+            selection_id (int): The ID of the selection.
+            start (Optional[datetime]): Inclusive lower bound of the range.
+            end (Optional[datetime]): Exclusive upper bound of the range.
+
+        Yields:
+            str: One JSON document per tick, newline terminated.
+        """
+        start, end = self.time_range(start, end)
+        async for tick in self.price_history_repository.stream_history(
+            selection_id, start, end
+        ):
+            yield json.dumps(
+                {"ts": tick["ts"].isoformat(), "price": tick["price"]}
+            ) + "\n"
+
+    async def get_ohlc(
+        self,
+        selection_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        interval: str = "minute",
+    ) -> List[dict]:
+        """
+        Fetch open/high/low/close bars of a selection's price. The range
+        defaults to the last day.
+
+        Args:
+            selection_id (int): The ID of the selection.
+            start (Optional[datetime]): Inclusive lower bound of the range.
+            end (Optional[datetime]): Exclusive upper bound of the range.
+            interval (str): Bar size, one of "minute", "hour" or "day".
+
+        Returns:
+            List[dict]: The bars, oldest first.
+        """
+        try:
+            start, end = self.time_range(start, end)
+            return await self.price_history_repository.get_ohlc(
+                selection_id, start, end, interval
+            )
+        except Exception as e:
+            self.logger.error(f"Error fetching OHLC for selection {selection_id}: {e}")
+            raise
@@ -0,0 +1,74 @@
+import logging
+
+from db.name_index import load_name_index
+from repositories.search_repository import SearchRepository
+from utils.search_sql_query import search_query
+
+
+class SearchService:
+    """
+    Service class for the searches spanning sports, events and selections.
+    """
+
+    def __init__(self, search_repository: SearchRepository, logger: logging.Logger):
+        """
+        Initialize the SearchService.
+
+        Args:
+            search_repository (SearchRepository): The repository running the searches.
+            logger (logging.Logger): The logger instance for logging events and errors.
+        """
+        self.search_repository = search_repository
+        self.logger = logger
+
+    async def search(self, criteria: dict) -> list:
+        """
+        Search one entity type with criteria on itself and on its related
+        sports, events or selections.
+
+        Args:
+            criteria (dict): The criteria per entity under "sport", "event" and
+                             "selection", plus "target", "limit" and "offset".
+
+        Returns:
+            list: The rows of the target entity.
+
+        Raises:
+            ValidationError: If the criteria use a field that is not searchable.
+        """
+        try:
+            target = criteria.get("target")
+            payload = {
+                entity: criteria[entity]
+                for entity in ("sport", "event", "selection")
+                if criteria.get(entity)
+            }
+            query, params = search_query(
+                payload,
+                target.value if target is not None else None,
+                criteria.get("limit", 100),
+                criteria.get("offset", 0),
+            )
+            return await self.search_repository.search(query, params)
+        except Exception as e:
+            self.logger.error(f"Error searching: {e}")
+            raise
+
+    async def autocomplete(self, query: str, limit: int = 10) -> dict:
+        """
+        Suggest sports, events and selections whose name, or one of its words,
+        starts with the query.
+
+        Args:
+            query (str): The text typed so far.
+            limit (int): The maximum number of matches per entity type.
+
+        Returns:
+            dict: The matches under "sports", "events" and "selections".
+        """
+        try:
+            index = await load_name_index(self.search_repository.db_pool)
+            return index.autocomplete(query, limit)
+        except Exception as e:
+            self.logger.error(f"Error autocompleting '{query}': {e}")
+            raise
@@ -1,8 +1,14 @@
+from typing import Optional
+
 from repositories.selection_repository import SelectionRepository
 from repositories.event_repository import EventRepository
 from schemas import SelectionBase, SelectionOutcome, SelectionUpdate
 from utils.prepare_data_for_insert import prepare_data_for_insert
 from logging import Logger
+from db.database import StatementTimeoutError
+from utils.fields import parse_fields, select_list
+from utils.metrics import get_metrics
+from utils.regex_filter import REGEX_TIMEOUT_MS, regex_conditions
 
 
 class SelectionService:
@@ -24,14 +30,23 @@ class SelectionService:
         self.event_repository = event_repository
         self.logger = logger
 
-    async def get_all(self):
+    async def get_all(self, fields: Optional[str] = None):
         """
         Fetch all selections.
 
+        Args:
+            fields (Optional[str]): The comma-separated columns to return,
+                                    None for all.
+
         Returns:
             List[dict]: List of dictionary representations of selections.
+
+        Raises:
+            ValidationError: If a field is not a selection column.
         """
-        return await self.selection_repository.get_all()
+        return await self.selection_repository.get_all(
+            parse_fields("selections", fields)
+        )
 
     async def create(self, selection):
         """
@@ -65,13 +80,20 @@ class SelectionService:
             self.logger.error(f"Error creating selection: {e}")
             raise
 
-    async def update(self, selection_id: int, selection_data: dict) -> dict:
+    async def update(
+        self,
+        selection_id: int,
+        selection_data: dict,
+        expected_version: Optional[int] = None,
+    ) -> dict:
         """
-        Update a selection.
+        Update a selection, with a single conditional write.
 
         Args:
             selection_id (int): The ID of the selection to be updated.
             selection_data (dict): Dictionary representing the updated selection data.
+            expected_version (Optional[int]): The version the client read, from
+                                              its If-Match header.
 
         Returns:
             dict: Dictionary representing the updated selection.
@@ -83,7 +105,9 @@ class SelectionService:
                 else selection_data["outcome"]
             )
             res = prepare_data_for_insert(selection_data)
-            await self.selection_repository.update(selection_id, res)
+            updated = await self.selection_repository.update(
+                selection_id, res, expected_version
+            )
 
             # TO DO this I would do this validation in a queue to check everyone canceling and send a direct message to update the event data
             if selection_data["active"] == False:
@@ -91,7 +115,7 @@ class SelectionService:
 
             self.logger.info(f"Updated selection with ID {selection_id}")
 
-            return await self.selection_repository.update(selection_id, res)
+            return updated
         except Exception as e:
             self.logger.error(f"Error updating selection {selection_id}: {e}")
             raise
@@ -115,13 +139,17 @@ class SelectionService:
             )
             raise
 
-    async def filter_selections(self, criteria: dict) -> dict:
+    async def filter_selections(
+        self, criteria: dict, fields: Optional[str] = None
+    ) -> dict:
         """
         Performs a selections search based on the provided criteria.
 
         Args:
             criteria (dict): A dictionary containing search criteria.
                 - name_regex (str): An optional regular expression to filter sports by name.
+            fields (Optional[str]): The comma-separated columns to return,
+                                    None for all.
 
         Returns:
             dict: A dictionary containing the results of the selections search.
@@ -130,12 +158,18 @@ class SelectionService:
             ValueError: If the 'name_regex' parameter is None or an empty string.
         """
         try:
-            query_parts = ["SELECT * FROM selections WHERE 1=1"]
+            columns = parse_fields("selections", fields)
+            query_parts = [f"SELECT {select_list(columns)} FROM selections WHERE 1=1"]
             params = []
+            timeout_ms = None
 
             if "name_regex" in criteria and criteria["name_regex"]:
-                query_parts.append(" AND name ~ $" + str(len(params) + 1))
-                params.append(criteria["name_regex"])
+                conditions, regex_params = regex_conditions(
+                    "name", criteria["name_regex"], len(params) + 1
+                )
+                query_parts.extend(" AND " + condition for condition in conditions)
+                params.extend(regex_params)
+                timeout_ms = REGEX_TIMEOUT_MS
 
             if "active" in criteria and isinstance(criteria["active"], bool):
                 query_parts.append(" AND active = $" + str(len(params) + 1))
@@ -143,21 +177,46 @@ class SelectionService:
 
             query = " ".join(query_parts)
 
-            return await self.selection_repository.filter_selections(query, params)
+            return await self.selection_repository.filter_selections(
+                query, params, timeout_ms
+            )
+        except StatementTimeoutError as e:
+            get_metrics().increment("regex_filter.timed_out")
+            self.logger.error(
+                f"Regex filter on selections exceeded its time budget: {e}"
+            )
+            raise
         except Exception as e:
             self.logger.error(f"Error filter for selections: {e}")
             raise
 
-    async def get_selections_by_event_id(self, event_id):
+    async def get_validator_by_event_id(self, event_id: int) -> str:
+        """
+        Identify the current state of the selections of an event, for
+        conditional GETs.
+
+        Args:
+            event_id (int): The ID of the event.
+
+        Returns:
+            str: A token changing whenever one of the selections does.
+        """
+        return await self.selection_repository.get_validator_by_event_id(event_id)
+
+    async def get_selections_by_event_id(self, event_id, fields: Optional[str] = None):
         try:
-            return await self.selection_repository.get_selections_by_event_id(event_id)
+            return await self.selection_repository.get_selections_by_event_id(
+                event_id, parse_fields("selections", fields)
+            )
         except Exception as e:
             self.logger.error(f"Error get selections by event ID: {e}")
             raise
 
-    async def get_selections_by_sport_id(self, sport_id):
+    async def get_selections_by_sport_id(self, sport_id, fields: Optional[str] = None):
         try:
-            return await self.selection_repository.get_selections_by_sport_id(sport_id)
+            return await self.selection_repository.get_selections_by_sport_id(
+                sport_id, parse_fields("selections", fields)
+            )
         except Exception as e:
             self.logger.error(f"Error get selections sport ID: {e}")
             raise
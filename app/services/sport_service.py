@@ -1,9 +1,15 @@
 import logging
+from typing import List, Optional
 
 from repositories.sport_repository import SportRepository
 from repositories.event_repository import EventRepository
 from utils.prepare_data_for_insert import prepare_data_for_insert
 from utils.slugify import to_slug
+from db.database import StatementTimeoutError
+from utils.custom_exceptions import ValidationError
+from utils.fields import parse_fields, project
+from utils.metrics import count_upserts, get_metrics
+from utils.regex_filter import REGEX_TIMEOUT_MS, regex_conditions
 
 
 class SportService:
@@ -25,20 +31,36 @@ class SportService:
         self.event_repository = event_repository
         self.logger = logger
 
-    async def get_all(self):
+    async def get_all(self, fields: Optional[str] = None):
         """
         Fetch all sports.
 
+        Args:
+            fields (Optional[str]): The comma-separated columns to return,
+                                    None for all.
+
         Returns:
             List[dict]: List of dictionary representations of sports.
+
+        Raises:
+            ValidationError: If a field is not a sport column.
         """
         try:
             self.logger.info("Fetching all sports...")
-            return await self.sport_repository.get_all()
+            return await self.sport_repository.get_all(parse_fields("sports", fields))
         except Exception as e:
             self.logger.error(f"Error fetching sports: {e}")
             raise
 
+    async def get_validator(self) -> str:
+        """
+        Identify the current state of the sports list, for conditional GETs.
+
+        Returns:
+            str: A token changing whenever a sport does.
+        """
+        return await self.sport_repository.get_validator()
+
     async def create(self, sport):
         """
         Create a new sport.
@@ -60,13 +82,51 @@ class SportService:
             self.logger.error(f"Error creating sport: {e}")
             raise
 
-    async def update(self, sport_id: int, sport: dict) -> dict:
+    async def upsert_many(self, sports: List[dict]) -> List[dict]:
+        """
+        Create or update sports keyed by slug. Sports identical to the stored
+        ones are not written.
+
+        Args:
+            sports (List[dict]): The "name" and "active" of each sport.
+
+        Returns:
+            List[dict]: The "status" ("created", "updated" or "unchanged") and
+                        the stored "row" of each sport.
+
+        Raises:
+            ValidationError: If two sports share a slug.
+        """
+        sport_data = [
+            {
+                "name": sport["name"],
+                "slug": to_slug(sport["name"]),
+                "active": sport["active"],
+            }
+            for sport in sports
+        ]
+        slugs = [sport["slug"] for sport in sport_data]
+        if len(set(slugs)) != len(slugs):
+            raise ValidationError("Sports with the same slug")
+        try:
+            results = await self.sport_repository.upsert_many(sport_data)
+        except Exception as e:
+            self.logger.error(f"Error upserting sports: {e}")
+            raise
+        count_upserts("sports", results)
+        return results
+
+    async def update(
+        self, sport_id: int, sport: dict, expected_version: Optional[int] = None
+    ) -> dict:
         """
         Update a sport.
 
         Args:
             sport_id (int): The ID of the sport to be updated.
             sport_data (dict): Dictionary representing the updated sport data.
+            expected_version (Optional[int]): The version the client read, from
+                                              its If-Match header.
 
         Returns:
             dict: Dictionary representing the updated sport.
@@ -77,7 +137,7 @@ class SportService:
             if sport["active"] == False:
                 await self.check_and_update_sport_status(sport_id)
 
-            return await self.sport_repository.update(sport_id, sport)
+            return await self.sport_repository.update(sport_id, sport, expected_version)
         except Exception as e:
             self.logger.error(f"Error updating sport {sport_id}: {e}")
             raise
@@ -96,7 +156,7 @@ class SportService:
             )
             raise
 
-    async def filter_sports(self, criteria: dict) -> dict:
+    async def filter_sports(self, criteria: dict, fields: Optional[str] = None) -> dict:
         """
         Asynchronously performs a sports search based on the provided criteria. The filter
         can be filtered by sport name using a regular expression and further filtered
@@ -108,6 +168,8 @@ class SportService:
                 - active (bool): Filter sports based on their active status.
                 - threshold (int, optional): The minimum number of events a sport must have to be included in the results.
                                  Default value is 1.
+            fields (Optional[str]): The comma-separated columns to return among
+                                    "id", "name" and "threshold".
 
         Returns:
             dict: A dictionary containing the results of the sports search.
@@ -117,31 +179,37 @@ class SportService:
 
         Note:
             The function builds a dynamic SQL query based on the criteria provided.
+            The threshold reads the trigger-maintained active_events_count column.
         """
         try:
+            columns = parse_fields("sport_filter", fields)
             query_parts = [
                 "WITH ActiveEvents AS (",
-                "    SELECT s.id, s.name, COUNT(e.id) as threshold",
+                "    SELECT s.id, s.name, s.active_events_count as threshold",
                 "    FROM sports s",
-                "    LEFT JOIN events e ON s.id = e.sport_id AND e.active = TRUE",
                 "    WHERE 1=1",
             ]
 
             params = []
+            timeout_ms = None
 
             if "name_regex" in criteria and criteria["name_regex"]:
-                query_parts.append("    AND s.name ~ $" + str(len(params) + 1))
-                params.append(criteria["name_regex"])
+                conditions, regex_params = regex_conditions(
+                    "s.name", criteria["name_regex"], len(params) + 1
+                )
+                query_parts.extend("    AND " + condition for condition in conditions)
+                params.extend(regex_params)
+                timeout_ms = REGEX_TIMEOUT_MS
 
             if "active" in criteria and isinstance(criteria["active"], bool):
                 query_parts.append("    AND s.active = $" + str(len(params) + 1))
                 params.append(criteria["active"])
 
-            query_parts.append("    GROUP BY s.id, s.name")
-
             threshold_value = criteria.get("threshold", 1)
             if threshold_value:
-                query_parts.append("    HAVING COUNT(e.id) > $" + str(len(params) + 1))
+                query_parts.append(
+                    "    AND s.active_events_count > $" + str(len(params) + 1)
+                )
                 params.append(threshold_value)
 
             if criteria.get("start_time_from") and criteria.get("start_time_to"):
@@ -179,7 +247,14 @@ class SportService:
                 )
 
             query = " ".join(query_parts)
-            return await self.sport_repository.filter_sports(query, params)
+            return project(
+                await self.sport_repository.filter_sports(query, params, timeout_ms),
+                columns,
+            )
+        except StatementTimeoutError as e:
+            get_metrics().increment("regex_filter.timed_out")
+            self.logger.error(f"Regex filter on sports exceeded its time budget: {e}")
+            raise
         except Exception as e:
             self.logger.error(f"Error searching for sports: {e}")
             raise
@@ -0,0 +1,118 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from asyncpg.exceptions import SerializationError
+from commands.archive_settled import archive_settled
+from db.archive_store import ArchiveStore
+
+START = datetime(2023, 10, 6, 12, tzinfo=timezone.utc)
+
+
+class Cursor:
+    def __init__(self, rows):
+        self.rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.fixture
+def connection():
+    connection = AsyncMock()
+    connection.transaction = MagicMock()
+    connection.fetch.side_effect = [
+        [{"id": 1, "scheduled_start": START}, {"id": 2, "scheduled_start": START}],
+        [],
+    ]
+    connection.cursor = MagicMock(
+        return_value=Cursor([{"id": 10, "event_id": 1}, {"id": 11, "event_id": 2}])
+    )
+    return connection
+
+
+@pytest.fixture
+def db_pool(connection):
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+    return db_pool
+
+
+@pytest.mark.asyncio
+async def test_archive_settled_writes_then_deletes(db_pool, connection, tmp_path):
+    store = ArchiveStore(str(tmp_path))
+
+    totals = await archive_settled(db_pool, store, batch_size=2)
+
+    assert totals == {"events": 2, "selections": 2}
+    assert [row["id"] for row in store.read("events")] == [1, 2]
+    assert [row["id"] for row in store.read("selections")] == [10, 11]
+    delete_selections, delete_events, *notifications = [
+        call.args for call in connection.execute.await_args_list
+    ]
+    assert delete_events[1:] == ([1, 2], [START])
+    assert [args[2] for args in notifications] == [
+        '{"selections": [10, 11]}',
+        '{"events": [1, 2]}',
+    ]
+    # The second batch starts after the last archived event
+    assert connection.fetch.await_args_list[1].args[1] == 2
+
+
+@pytest.mark.asyncio
+async def test_archive_settled_discards_files_on_failure(db_pool, connection, tmp_path):
+    store = ArchiveStore(str(tmp_path))
+    connection.execute.side_effect = Exception("serialization failure")
+
+    with pytest.raises(Exception):
+        await archive_settled(db_pool, store, batch_size=2)
+
+    assert store.read("events") == []
+    assert store.read("selections") == []
+
+
+@pytest.mark.asyncio
+async def test_archive_settled_retries_on_serialization_failure(
+    db_pool, connection, tmp_path
+):
+    store = ArchiveStore(str(tmp_path))
+    connection.cursor.side_effect = lambda *args, **kwargs: Cursor(
+        [{"id": 10, "event_id": 1}, {"id": 11, "event_id": 2}]
+    )
+    connection.execute.side_effect = [SerializationError("concurrent update")] + [
+        None
+    ] * 4
+    connection.fetch.side_effect = [
+        [{"id": 1, "scheduled_start": START}, {"id": 2, "scheduled_start": START}],
+        [{"id": 1, "scheduled_start": START}, {"id": 2, "scheduled_start": START}],
+        [],
+    ]
+
+    totals = await archive_settled(db_pool, store, batch_size=2)
+
+    assert totals == {"events": 2, "selections": 2}
+    assert [row["id"] for row in store.read("events")] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_archive_settled_skips_a_batch_that_keeps_failing(
+    db_pool, connection, tmp_path
+):
+    store = ArchiveStore(str(tmp_path))
+    connection.execute.side_effect = SerializationError("concurrent update")
+    connection.fetch.side_effect = [
+        [{"id": 1, "scheduled_start": START}, {"id": 2, "scheduled_start": START}]
+    ] * 3 + [[]]
+    connection.fetchval.return_value = 2
+
+    totals = await archive_settled(db_pool, store, batch_size=2)
+
+    assert totals == {"events": 0, "selections": 0}
+    assert store.read("events") == []
+    # The run goes on after the skipped batch
+    assert connection.fetch.await_args_list[-1].args[1] == 2
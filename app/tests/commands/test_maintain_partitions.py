@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from commands.maintain_partitions import maintain_partitions
+
+
+@pytest.fixture
+def connection():
+    connection = AsyncMock()
+    connection.transaction = MagicMock()
+    connection.fetch.return_value = [
+        {"name": "archive.selections_p202201"},
+        {"name": "archive.events_p202201"},
+    ]
+    return connection
+
+
+@pytest.fixture
+def db_pool(connection):
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+    return db_pool
+
+
+@pytest.mark.asyncio
+async def test_maintain_partitions_detaches_expired(db_pool, connection):
+    detached = await maintain_partitions(db_pool, months_ahead=3, retain_months=24)
+
+    assert detached == ["archive.selections_p202201", "archive.events_p202201"]
+    price_history, events = connection.execute.await_args_list
+    assert "create_price_history_partition" in price_history.args[0]
+    assert price_history.args[1] == 3
+    assert connection.execute.await_args.args[1] == 3
+    assert connection.fetch.await_args.args[1] == 24
+
+
+@pytest.mark.asyncio
+async def test_maintain_partitions_keeps_everything_by_default(db_pool, connection):
+    assert await maintain_partitions(db_pool) == []
+    assert connection.execute.await_args.args[1] == 12
+    connection.fetch.assert_not_awaited()
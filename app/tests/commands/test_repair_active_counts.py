@@ -0,0 +1,17 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from commands.repair_active_counts import repair_active_counts
+
+
+@pytest.mark.asyncio
+async def test_repair_active_counts():
+    connection = AsyncMock()
+    connection.fetchrow.return_value = {"sports_fixed": 1, "events_fixed": 3}
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+
+    assert await repair_active_counts(db_pool) == {
+        "sports_fixed": 1,
+        "events_fixed": 3,
+    }
+    connection.fetchrow.assert_called_once_with("SELECT * FROM repair_active_counts()")
@@ -0,0 +1,174 @@
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from commands.replay_feed import HttpTarget, ServiceTarget, parse_operation, replay
+from schemas import SelectionUpdate, SportBase, SportUpdate
+
+START = "2026-05-01T18:00:00+00:00"
+
+
+def _line(**operation) -> str:
+    return json.dumps(operation)
+
+
+def _event(name: str) -> dict:
+    return {
+        "name": name,
+        "active": True,
+        "type": "preplay",
+        "sport_id": 1,
+        "status": "pending",
+        "scheduled_start": START,
+        "actual_start": START,
+    }
+
+
+class RecordingTarget:
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    async def _record(self, call):
+        self.calls.append(call)
+        if call[0] == self.fail_on:
+            raise RuntimeError("boom")
+
+    async def upsert(self, entity, rows):
+        await self._record(("upsert", entity, [row.name for row in rows]))
+
+    async def create(self, entity, row):
+        await self._record(("create", entity, row.name))
+
+    async def update(self, entity, row_id, row):
+        await self._record(("update", entity, row_id, row.price))
+
+
+def test_parse_operation_validates_data():
+    operation = parse_operation(
+        _line(ts=START, entity="price", id=7, data={"price": 1.85})
+    )
+    assert operation["op"] == "update"
+    assert operation["ts"].year == 2026
+    assert isinstance(operation["data"], SelectionUpdate)
+    assert operation["data"].price == 1.85
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "not json",
+        "[]",
+        _line(entity="market", op="create", data={}),
+        _line(entity="sport", op="delete", id=1),
+        _line(entity="sport", op="update", data={"name": "Football"}),
+        _line(entity="price", id=7, data={}),
+        _line(entity="sport", op="create", data={"name": "Football"}),
+    ],
+)
+def test_parse_operation_rejects_invalid(line):
+    with pytest.raises(ValueError):
+        parse_operation(line)
+
+
+@pytest.mark.asyncio
+async def test_replay_batches_creates_between_other_operations():
+    target = RecordingTarget()
+    lines = [
+        _line(entity="sport", op="create", data={"name": "Football", "active": True}),
+        _line(entity="sport", op="create", data={"name": "Tennis", "active": True}),
+        _line(entity="event", op="create", data=_event("Final")),
+        _line(entity="price", id=7, data={"price": 1.5}),
+        _line(entity="price", id=7, data={"price": 1.6}),
+        _line(entity="price", id=7, data={"price": 1.7}),
+        "",
+        "not json",
+        _line(entity="event", op="create", data=_event("Semi")),
+    ]
+
+    report = await replay(lines, target, concurrency=4, batch_size=10)
+
+    assert target.calls == [
+        ("upsert", "sport", ["Football", "Tennis"]),
+        ("upsert", "event", ["Final"]),
+        ("update", "price", 7, 1.5),
+        ("update", "price", 7, 1.6),
+        ("update", "price", 7, 1.7),
+        ("upsert", "event", ["Semi"]),
+    ]
+    assert report["operations"] == 7
+    assert report["invalid"] == 1
+    assert report["errors"] == 0
+    assert report["latency"]["sport.upsert"]["calls"] == 1
+    assert report["latency"]["sport.upsert"]["operations"] == 2
+    assert report["latency"]["price.update"]["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_splits_batches_and_counts_errors():
+    target = RecordingTarget(fail_on="upsert")
+    lines = [
+        _line(entity="sport", op="create", data={"name": name, "active": True})
+        for name in ("A", "B", "C")
+    ]
+
+    report = await replay(lines, target, concurrency=2, batch_size=2)
+
+    assert [call[2] for call in target.calls] == [["A", "B"], ["C"]]
+    assert report["errors"] == 3
+    assert report["latency"]["sport.upsert"]["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_paces_by_timestamp():
+    target = RecordingTarget()
+    lines = [
+        _line(ts=START, entity="price", id=1, data={"price": 1.5}),
+        _line(
+            ts="2026-05-01T18:00:10+00:00", entity="price", id=1, data={"price": 1.6}
+        ),
+    ]
+    with patch("commands.replay_feed.asyncio.sleep", new=AsyncMock()) as sleep:
+        await replay(lines, target, concurrency=1, speed=2)
+
+    [delay] = [call.args[0] for call in sleep.await_args_list]
+    assert 4.5 < delay <= 5
+
+
+@pytest.mark.asyncio
+async def test_http_target_posts_bulk_upserts():
+    client = AsyncMock()
+    client.post.return_value = client.put.return_value = Mock()
+    target = HttpTarget(client)
+
+    await target.upsert("sport", [SportBase(name="Football", active=True)])
+    await target.update("price", 7, SelectionUpdate(price=1.85))
+
+    client.post.assert_awaited_once_with(
+        "/api/v1/sports/upsert/bulk",
+        json={"sports": [{"name": "Football", "active": True}]},
+    )
+    client.put.assert_awaited_once_with("/api/v1/selections/7", json={"price": 1.85})
+
+
+@pytest.mark.asyncio
+async def test_service_target_builds_each_query_afresh():
+    connection = AsyncMock()
+    connection.transaction = MagicMock()
+    connection.fetchrow.return_value = {"id": 1, "name": "Football"}
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+    target = ServiceTarget(db_pool, Mock())
+
+    await target.update("sport", 1, SportUpdate(name="Football", active=True))
+    await target.update("sport", 2, SportUpdate(name="Tennis", active=True))
+    await target.create("sport", SportBase(name="Golf", active=True))
+    await target.create("sport", SportBase(name="Rugby", active=True))
+
+    first, second, golf, rugby = [
+        call.args[0] for call in connection.fetchrow.await_args_list
+    ]
+    assert first.endswith("WHERE id = '1' RETURNING *")
+    assert second.endswith("WHERE id = '2' RETURNING *")
+    assert "Golf" in golf and "Football" not in golf
+    assert "Rugby" in rugby and "Golf" not in rugby
@@ -0,0 +1,37 @@
+import json
+
+from db.archive_feed import apply_archive_payload, archive_payloads
+from db.change_feed import subscribe_to_changes, unsubscribe_from_changes
+
+
+def test_payloads_stay_below_the_limit():
+    payloads = archive_payloads(list(range(1000)), list(range(10_000, 13_000)), 1000)
+
+    assert all(len(payload) <= 1000 for payload in payloads)
+    decoded = [json.loads(payload) for payload in payloads]
+    assert [row_id for p in decoded for row_id in p.get("selections", [])] == list(
+        range(10_000, 13_000)
+    )
+    assert [row_id for p in decoded for row_id in p.get("events", [])] == list(
+        range(1000)
+    )
+    # Selections are published before their events
+    assert "selections" in decoded[0] and "events" in decoded[-1]
+
+
+def test_payload_is_published_as_deletions():
+    received = []
+
+    def callback(*change):
+        received.append(change)
+
+    subscribe_to_changes(callback)
+    try:
+        apply_archive_payload('{"selections": [10, 11]}')
+    finally:
+        unsubscribe_from_changes(callback)
+
+    assert received == [
+        ("selections", {"id": 10}, None, True),
+        ("selections", {"id": 11}, None, True),
+    ]
@@ -0,0 +1,56 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+from db.archive_store import ArchiveStore
+
+
+def test_batch_is_readable_once_closed(tmp_path):
+    store = ArchiveStore(str(tmp_path))
+    batch = store.open_batch()
+    batch.write(
+        "events",
+        {"id": 1, "scheduled_start": datetime(2023, 10, 6, 12, tzinfo=timezone.utc)},
+    )
+    batch.write("selections", {"id": 10, "event_id": 1, "price": 1.5})
+    batch.write("selections", {"id": 11, "event_id": 1, "price": 2.5})
+
+    assert store.read("events") == []
+    paths = batch.close()
+
+    assert batch.counts == {"events": 1, "selections": 2}
+    assert len(paths) == 2
+    assert store.read("events") == [
+        {"id": 1, "scheduled_start": "2023-10-06T12:00:00+00:00"}
+    ]
+    assert [row["id"] for row in store.read("selections")] == [10, 11]
+    with gzip.open(paths[1], "rt") as archive:
+        assert json.loads(archive.readline())["id"] == 10
+
+
+def test_discarded_batch_leaves_no_files(tmp_path):
+    store = ArchiveStore(str(tmp_path))
+    batch = store.open_batch()
+    batch.write("events", {"id": 1})
+    batch.close()
+    batch.discard()
+
+    unfinished = store.open_batch()
+    unfinished.write("events", {"id": 2})
+    unfinished.discard()
+
+    assert store.read("events") == []
+    assert list((tmp_path / "events").iterdir()) == []
+
+
+def test_cache_is_bounded(tmp_path):
+    store = ArchiveStore(str(tmp_path), cache_rows=3)
+    for first_id in (1, 3, 5):
+        batch = store.open_batch()
+        batch.write("events", {"id": first_id})
+        batch.write("events", {"id": first_id + 1})
+        batch.close()
+
+    assert [row["id"] for row in store.iter_rows("events")] == [1, 2, 3, 4, 5, 6]
+    assert store._cached_rows == 2
+    assert list(store._cache) == store.files("events")[2:]
@@ -0,0 +1,133 @@
+import pytest
+from db.catalog import Catalog, CatalogTable
+
+
+@pytest.fixture
+def catalog():
+    catalog = Catalog()
+    catalog.load_rows(
+        sports=[{"id": 1, "name": "Football", "active": True}],
+        events=[
+            {"id": 10, "name": "Match A", "sport_id": 1, "active": True},
+            {"id": 11, "name": "Match B", "sport_id": 1, "active": False},
+        ],
+        selections=[
+            {"id": 100, "name": "A Win", "event_id": 10, "price": 1.5, "active": True},
+            {"id": 101, "name": "B Win", "event_id": 10, "price": 2.5, "active": False},
+            {"id": 102, "name": "Draw", "event_id": 11, "price": 3.0, "active": True},
+        ],
+    )
+    return catalog
+
+
+def test_get_all(catalog):
+    assert [sport["name"] for sport in catalog.get_all("sports")] == ["Football"]
+    assert len(catalog.get_all("selections")) == 3
+
+
+def test_get_selections_by_event_id(catalog):
+    selections = catalog.get_selections_by_event_id(10)
+    assert [selection["id"] for selection in selections] == [100, 101]
+    assert catalog.get_selections_by_event_id(99) == []
+
+
+def test_get_selections_by_sport_id(catalog):
+    selections = catalog.get_selections_by_sport_id(1)
+    assert [selection["id"] for selection in selections] == [100, 101, 102]
+
+
+def test_active_counts(catalog):
+    assert catalog.get_active_selections_count(10) == 1
+    assert catalog.get_active_events_count(1) == 1
+
+
+def test_apply_change_updates_indexes(catalog):
+    catalog.apply_change("selections", {"id": 101, "active": True}, {"active": True})
+    assert catalog.get_active_selections_count(10) == 2
+
+    catalog.apply_change("selections", {"id": 100, "event_id": 11})
+    assert [s["id"] for s in catalog.get_selections_by_event_id(11)] == [100, 102]
+    assert catalog.get_selections_by_event_id(11)[0]["name"] == "A Win"
+
+    catalog.apply_change("selections", {"id": 102}, deleted=True)
+    assert [s["id"] for s in catalog.get_selections_by_event_id(11)] == [100]
+
+
+def test_rows_are_copies(catalog):
+    catalog.get_all("sports")[0]["name"] = "Changed"
+    assert catalog.get_all("sports")[0]["name"] == "Football"
+
+
+def test_catalog_table_new_columns():
+    table = CatalogTable("sports")
+    table.upsert({"id": 1, "name": "Football"})
+    table.upsert({"id": 2, "name": "Tennis", "active": True})
+    assert table.get(1) == {"id": 1, "name": "Football", "active": None}
+
+
+def test_apply_change_syncs_active_counts():
+    catalog = Catalog()
+    catalog.load_rows(
+        sports=[{"id": 1, "name": "Football", "active_events_count": 1}],
+        events=[
+            {"id": 10, "sport_id": 1, "active": True, "active_selections_count": 1},
+            {"id": 11, "sport_id": 1, "active": False, "active_selections_count": 0},
+        ],
+        selections=[{"id": 100, "event_id": 10, "active": True}],
+    )
+
+    catalog.apply_change("selections", {"id": 101, "event_id": 10, "active": True})
+    assert catalog.tables["events"].get(10)["active_selections_count"] == 2
+
+    catalog.apply_change("selections", {"id": 100, "event_id": 11})
+    assert catalog.tables["events"].get(10)["active_selections_count"] == 1
+    assert catalog.tables["events"].get(11)["active_selections_count"] == 1
+
+    catalog.apply_change("events", {"id": 11, "active": True})
+    assert catalog.tables["sports"].get(1)["active_events_count"] == 2
+
+    catalog.apply_change("events", {"id": 10}, deleted=True)
+    assert catalog.tables["sports"].get(1)["active_events_count"] == 1
+
+
+def test_generation_follows_changes(catalog):
+    catalog.load_rows(
+        sports=[{"id": 1, "name": "Football", "active": True}],
+        events=[
+            {"id": 10, "sport_id": 1, "active": True, "active_selections_count": 0},
+            {"id": 11, "sport_id": 1, "active": True, "active_selections_count": 0},
+        ],
+        selections=[{"id": 101, "event_id": 10, "active": False}],
+    )
+    sports = catalog.generation("sports")
+    events = catalog.generation("events")
+    event_10 = catalog.generation("selections", 10)
+    event_11 = catalog.generation("selections", 11)
+
+    catalog.apply_change("selections", {"id": 101, "active": True}, {"active": True})
+
+    assert catalog.generation("selections", 10) != event_10
+    assert catalog.generation("selections", 11) == event_11
+    # The active count of event 10 changed
+    assert catalog.generation("events") != events
+    assert catalog.generation("sports") == sports
+
+
+def test_generation_is_unique_per_load(catalog):
+    before = catalog.generation("sports")
+    catalog.load_rows([], [], [])
+    assert catalog.generation("sports") != before
+
+
+def test_generation_is_derived_from_content():
+    first, second = Catalog(), Catalog()
+    for catalog in (first, second):
+        catalog.load_rows([{"id": 1, "active": True}], [], [], snapshot_id="g1")
+        catalog.apply_change("sports", {"id": 1, "active": False})
+    assert first.generation("sports") == second.generation("sports")
+
+    second.apply_change("sports", {"id": 1, "active": True})
+    assert first.generation("sports") != second.generation("sports")
+
+    second.load_rows([{"id": 1, "active": True}], [], [], snapshot_id="g2")
+    assert second.generation("sports") != first.generation("sports")
@@ -0,0 +1,38 @@
+from db.change_feed import ChangeFeed
+
+
+def test_publish_to_subscribers():
+    feed = ChangeFeed()
+    received = []
+    feed.subscribe(lambda *change: received.append(change))
+
+    feed.publish("sports", {"id": 1}, {"name": "Football"})
+
+    assert received == [("sports", {"id": 1}, {"name": "Football"}, False)]
+
+
+def test_failing_subscriber_does_not_stop_others():
+    feed = ChangeFeed()
+    received = []
+
+    def failing(*change):
+        raise ValueError("boom")
+
+    feed.subscribe(failing)
+    feed.subscribe(lambda *change: received.append(change))
+
+    feed.publish("events", {"id": 1}, deleted=True)
+
+    assert received == [("events", {"id": 1}, None, True)]
+
+
+def test_unsubscribe():
+    feed = ChangeFeed()
+    received = []
+    callback = lambda *change: received.append(change)
+    feed.subscribe(callback)
+    feed.unsubscribe(callback)
+
+    feed.publish("sports", {"id": 1})
+
+    assert received == []
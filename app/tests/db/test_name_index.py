@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from db.catalog import Catalog
+from db.change_feed import unsubscribe_from_changes
+from db.name_index import NameIndex, load_name_index, name_keys
+
+
+@pytest.fixture
+def index():
+    index = NameIndex()
+    index.load_rows(
+        {
+            "sports": [{"id": 1, "name": "Football"}, {"id": 2, "name": "Futsal"}],
+            "events": [
+                {"id": 10, "name": "Manchester United v Liverpool"},
+                {"id": 11, "name": "Real Madrid v Manchester City"},
+                {"id": 12, "name": "Man Utd Legends"},
+            ],
+            "selections": [{"id": 100, "name": "Man. City"}],
+        }
+    )
+    return index
+
+
+def test_name_keys():
+    assert name_keys("Real Madrid CF") == ("real-madrid-cf", ["madrid-cf", "cf"])
+    assert name_keys("  ") == ("", [])
+
+
+def test_prefix_matches_come_first(index):
+    matches = index.search("events", "Man")
+    assert [match["id"] for match in matches] == [12, 10, 11]
+
+
+def test_query_is_normalised_like_slugs(index):
+    assert index.search("selections", "man  CITY")[0]["name"] == "Man. City"
+    assert index.search("events", "manchester u") == [
+        {"id": 10, "name": "Manchester United v Liverpool"}
+    ]
+    assert index.search("events", "?!") == []
+
+
+def test_limit(index):
+    assert len(index.search("events", "man", limit=2)) == 2
+    assert [m["id"] for m in index.search("sports", "f", limit=1)] == [1]
+
+
+def test_autocomplete(index):
+    results = index.autocomplete("city")
+    assert [m["id"] for m in results["events"]] == [11]
+    assert [m["id"] for m in results["selections"]] == [100]
+    assert results["sports"] == []
+
+
+def test_apply_change(index):
+    index.apply_change("sports", {"id": 1, "name": "Soccer", "active": True})
+    assert index.search("sports", "foot") == []
+    assert index.search("sports", "soc") == [{"id": 1, "name": "Soccer"}]
+
+    index.apply_change("sports", {"id": 3, "name": "Squash"})
+    assert [m["id"] for m in index.search("sports", "s")] == [1, 3]
+
+    index.apply_change("sports", {"id": 1}, deleted=True)
+    assert [m["id"] for m in index.search("sports", "s")] == [3]
+    index.apply_change("unknown", {"id": 1, "name": "x"})
+
+
+@pytest.mark.asyncio
+async def test_index_is_rebuilt_when_the_catalog_reloads():
+    catalog = Catalog()
+    catalog.load_rows([{"id": 1, "name": "Football"}], [], [])
+    index = NameIndex()
+    with patch("db.name_index.get_catalog", return_value=catalog), patch(
+        "db.name_index._name_index", index
+    ):
+        try:
+            await load_name_index(None)
+            assert index.search("sports", "ten") == []
+
+            catalog.load_rows([{"id": 2, "name": "Tennis"}], [], [])
+            await load_name_index(None)
+        finally:
+            unsubscribe_from_changes(index.apply_change)
+
+    assert index.search("sports", "ten") == [{"id": 2, "name": "Tennis"}]
+
+
+@pytest.mark.asyncio
+async def test_index_without_catalog_is_rebuilt_once_old():
+    connection = AsyncMock()
+    connection.fetch.return_value = [{"id": 1, "name": "Football"}]
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+    index = NameIndex()
+    with patch("db.name_index.get_catalog", return_value=None), patch(
+        "db.name_index._name_index", index
+    ), patch("db.name_index.NAME_INDEX_MAX_AGE", 60):
+        try:
+            await load_name_index(db_pool)
+            await load_name_index(db_pool)
+            assert connection.fetch.await_count == 3
+
+            index.loaded_at -= 61
+            await load_name_index(db_pool)
+        finally:
+            unsubscribe_from_changes(index.apply_change)
+
+    assert connection.fetch.await_count == 6
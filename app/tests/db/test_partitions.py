@@ -0,0 +1,38 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from db import partitions
+from db.partitions import ensure_time_partition, partition_month
+
+
+@pytest.fixture(autouse=True)
+def reset_ensured_months():
+    partitions._ensured_months.clear()
+    yield
+    partitions._ensured_months.clear()
+
+
+def test_partition_month_is_utc():
+    ahead = timezone(timedelta(hours=2))
+    assert partition_month(datetime(2023, 11, 1, 1, 0, tzinfo=ahead)) == (2023, 10)
+    assert partition_month(datetime(2023, 11, 1, 1, 0)) == (2023, 11)
+    assert partition_month("2023-12-31T23:30:00-01:00") == (2024, 1)
+
+
+@pytest.mark.asyncio
+async def test_ensure_time_partition_calls_once_per_month():
+    connection = AsyncMock()
+
+    await ensure_time_partition(connection, datetime(2023, 10, 6, 12, 0))
+    await ensure_time_partition(connection, datetime(2023, 10, 20, 8, 0))
+    await ensure_time_partition(connection, "2023-11-02T10:00:00")
+    await ensure_time_partition(connection, None)
+
+    assert connection.execute.await_count == 2
+    connection.execute.assert_any_await(
+        "SELECT ensure_time_partition($1)", datetime(2023, 10, 6, 12, 0)
+    )
+    connection.execute.assert_any_await(
+        "SELECT ensure_time_partition($1)", datetime(2023, 11, 2, 10, 0)
+    )
@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from db.price_store import LivePriceStore, PriceStore
+
+ROWS = [
+    {"id": 3, "event_id": 20, "sport_id": 2, "price": 1.25},
+    {"id": 1, "event_id": 10, "sport_id": 1, "price": 2.0},
+    {"id": 2, "event_id": 10, "sport_id": 1, "price": 1.8},
+    {"id": 4, "event_id": 20, "sport_id": 2, "price": 4.0},
+    {"id": 5, "event_id": 30, "sport_id": 1, "price": 0.0},
+]
+
+
+@pytest.fixture
+def store():
+    return PriceStore.from_rows(ROWS)
+
+
+@pytest.fixture
+def live_store():
+    live_store = LivePriceStore()
+    live_store.load_rows(ROWS)
+    return live_store
+
+
+def test_rows_sorted_by_event_and_unpriced_dropped(store):
+    assert list(store.event_ids) == [10, 10, 20, 20]
+    assert list(store.ids) == [1, 2, 3, 4]
+    assert len(store) == 4
+
+
+def test_stats_by_event(store):
+    stats = {row["event_id"]: row for row in store.stats_by_event()}
+
+    assert stats[10]["selections_count"] == 2
+    assert stats[10]["overround"] == pytest.approx(1 / 2.0 + 1 / 1.8 - 1)
+    assert stats[10]["min_price"] == 1.8
+    assert stats[10]["max_price"] == 2.0
+    assert stats[20]["mean_price"] == pytest.approx(2.625)
+    assert stats[20]["overround"] == pytest.approx(0.05)
+
+
+def test_stats_by_sport(store):
+    stats = {row["sport_id"]: row for row in store.stats_by_sport()}
+
+    assert stats[1]["events_count"] == 1
+    assert stats[2]["selections_count"] == 2
+    assert stats[2]["mean_overround"] == pytest.approx(0.05)
+
+
+def test_event_stats(store):
+    stats = store.event_stats(20)
+
+    assert [s["id"] for s in stats["selections"]] == [3, 4]
+    assert stats["selections"][0]["implied_probability"] == pytest.approx(0.8)
+    assert sum(s["fair_probability"] for s in stats["selections"]) == pytest.approx(1)
+    assert store.event_stats(30) is None
+
+
+def test_event_stats_price_drift(store):
+    assert store.selection_ids(20) == [3, 4]
+
+    stats = store.event_stats(20, {3: 1.0})
+
+    assert stats["selections"][0]["opening_price"] == 1.0
+    assert stats["selections"][0]["price_drift"] == pytest.approx(0.25)
+    assert stats["selections"][1]["opening_price"] is None
+    assert stats["selections"][1]["price_drift"] is None
+
+
+def test_empty_store():
+    store = PriceStore.from_rows([])
+    assert store.stats_by_event() == []
+    assert store.stats_by_sport() == []
+    assert store.event_stats(1) is None
+
+
+def test_live_store_updates_prices_in_place(live_store):
+    store = live_store.store
+    live_store.apply_change(
+        "selections", {"id": 2, "event_id": 10, "price": 2.5}, {"price": 2.5}
+    )
+
+    assert not live_store.stale
+    assert live_store.store is store
+    assert live_store.store.event_stats(10)["min_price"] == 2.0
+    assert live_store.store.event_stats(10)["max_price"] == 2.5
+
+
+@pytest.mark.parametrize(
+    "table, row, changes, deleted",
+    [
+        ("selections", {"id": 2, "active": False}, {"active": False}, False),
+        ("selections", {"id": 2, "event_id": 20, "price": 2.0}, None, False),
+        ("selections", {"id": 2}, None, True),
+        ("selections", {"id": 9, "active": True, "price": 2.0}, None, False),
+        ("events", {"id": 10, "active": False}, {"active": False}, False),
+    ],
+)
+def test_live_store_stale_on_listing_changes(live_store, table, row, changes, deleted):
+    live_store.apply_change(table, row, changes, deleted)
+    assert live_store.stale
+
+
+def test_live_store_ignores_unlisted_changes(live_store):
+    live_store.apply_change("selections", {"id": 9, "active": False}, None)
+    live_store.apply_change("events", {"id": 10}, {"status": "started"})
+    assert not live_store.stale
+
+
+@pytest.mark.asyncio
+async def test_live_store_reloads_once_stale(live_store):
+    connection = AsyncMock()
+    connection.fetch.return_value = ROWS[:2]
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+
+    assert len(await live_store.get(db_pool)) == 4
+    live_store.stale = True
+    assert len(await live_store.get(db_pool)) == 2
+    await live_store.get(db_pool)
+
+    connection.fetch.assert_awaited_once()
+    assert not live_store.stale
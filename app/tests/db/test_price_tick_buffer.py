@@ -0,0 +1,63 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock
+from db.price_tick_buffer import PriceTickBuffer, ensure_partitions_periodically
+
+
+def test_on_change_records_price_updates_only():
+    buffer = PriceTickBuffer()
+
+    buffer.on_change("selections", {"id": 1, "price": 2.5}, {"price": 2.5}, False)
+    buffer.on_change("selections", {"id": 1, "price": 2.5}, {"active": False}, False)
+    buffer.on_change("events", {"id": 1, "price": 2.5}, {"price": 2.5}, False)
+    buffer.on_change("selections", {"id": 2, "price": 1.5}, {"price": 1.5}, True)
+
+    assert len(buffer) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_batch():
+    buffer = PriceTickBuffer()
+    repository = AsyncMock()
+    buffer.record(1, 2.0)
+    buffer.record(2, 3.0)
+
+    await buffer.flush(repository)
+
+    ticks = repository.insert_ticks.call_args.args[0]
+    assert [(tick[0], tick[2]) for tick in ticks] == [(1, 2.0), (2, 3.0)]
+    assert len(buffer) == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_ticks_on_failure():
+    buffer = PriceTickBuffer()
+    repository = AsyncMock()
+    repository.insert_ticks.side_effect = Exception("Database down")
+    buffer.record(1, 2.0)
+
+    await buffer.flush(repository)
+    buffer.record(2, 3.0)
+
+    assert [tick[0] for tick in buffer._ticks] == [1, 2]
+
+
+def test_buffer_is_bounded():
+    buffer = PriceTickBuffer(max_buffered=2)
+    for selection_id in range(3):
+        buffer.record(selection_id, 1.5)
+    assert [tick[0] for tick in buffer._ticks] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_partitions_ensured_periodically_despite_failures():
+    repository = AsyncMock()
+    repository.ensure_partitions.side_effect = [Exception("Database down"), None, None]
+
+    task = asyncio.create_task(ensure_partitions_periodically(repository, 0))
+    while repository.ensure_partitions.await_count < 3:
+        await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert repository.ensure_partitions.await_count == 3
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from db.catalog import Catalog
+from db.change_feed import subscribe_to_changes, unsubscribe_from_changes
+from db.row_feed import apply_changed_rows
+
+
+@pytest.fixture
+def received():
+    changes = []
+
+    def callback(*change):
+        changes.append(change)
+
+    subscribe_to_changes(callback)
+    yield changes
+    unsubscribe_from_changes(callback)
+
+
+def pool_returning(rows):
+    connection = AsyncMock()
+    connection.fetch.return_value = rows
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+    return db_pool, connection
+
+
+@pytest.mark.asyncio
+async def test_changed_rows_are_published(received):
+    db_pool, connection = pool_returning([{"id": 1, "name": "Football"}])
+    payload = json.dumps({"table": "sports", "ids": [1, 2]})
+
+    with patch("db.row_feed.get_catalog", return_value=None):
+        await apply_changed_rows(db_pool, payload)
+
+    assert connection.fetch.await_args.args[1] == [1, 2]
+    assert received == [
+        ("sports", {"id": 1, "name": "Football"}, None, False),
+        ("sports", {"id": 2}, None, True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rows_the_catalog_holds_are_skipped(received):
+    catalog = Catalog()
+    catalog.load_rows(
+        [{"id": 1, "name": "Football"}, {"id": 3, "name": "Tennis"}], [], []
+    )
+    db_pool, _ = pool_returning(
+        [{"id": 1, "name": "Football"}, {"id": 3, "name": "Padel"}]
+    )
+    payload = json.dumps({"table": "sports", "ids": [1, 3, 4]})
+
+    with patch("db.row_feed.get_catalog", return_value=catalog):
+        await apply_changed_rows(db_pool, payload)
+
+    # 1 is unchanged and 4 was never in the catalog
+    assert received == [("sports", {"id": 3, "name": "Padel"}, None, False)]
@@ -5,6 +5,7 @@ import asyncpg
 import pytest
 from repositories.event_repository import EventRepository
 from schemas import EventType, EventStatus
+from utils.custom_exceptions import ValidationError
 
 
 @pytest.fixture
@@ -201,3 +202,79 @@ async def test_update_event(event_repository_update, mocker):
         "scheduled_start": datetime(2023, 10, 7, 12, 0, 0),
         "actual_start": datetime(2023, 10, 7, 13, 0, 0),
     }
+
+
+@pytest.fixture
+def settle_connection(mocker, db_pool_mock):
+    connection = mocker.AsyncMock()
+    connection.transaction = mocker.MagicMock()
+    db_pool_mock.acquire.return_value.__aenter__.return_value = connection
+    return connection
+
+
+@pytest.mark.asyncio
+async def test_settle_events(db_pool_mock, logger_mock, settle_connection):
+    settle_connection.fetch.side_effect = [
+        [
+            {"id": 10, "event_id": 1, "outcome": "win"},
+            {"id": 11, "event_id": 1, "outcome": "lose"},
+            {"id": 20, "event_id": 2, "outcome": "void"},
+        ],
+        [{"id": 1, "status": "ended"}, {"id": 2, "status": "ended"}],
+    ]
+    repository = EventRepository(db_pool_mock, logger_mock)
+
+    result = await repository.settle_events([(2, 20, "void")], [(1, 10)])
+
+    assert len(result["selections"]) == 3
+    assert [event["id"] for event in result["events"]] == [1, 2]
+    settle_args = settle_connection.fetch.await_args_list[0].args
+    assert settle_args[1:] == ([2], [20], ["void"], [1], [10])
+    assert settle_connection.fetch.await_args_list[1].args[1] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_settle_events_rejects_foreign_selection(
+    db_pool_mock, logger_mock, settle_connection
+):
+    settle_connection.fetch.side_effect = [[], [{"id": 1, "status": "ended"}]]
+    repository = EventRepository(db_pool_mock, logger_mock)
+
+    with pytest.raises(ValidationError):
+        await repository.settle_events([(1, 99, "win")], [])
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_moves_rescheduled_events(
+    db_pool_mock, logger_mock, settle_connection
+):
+    start = datetime(2026, 6, 1, 18, 0)
+    event = {
+        "name": "Final Match",
+        "slug": "final-match",
+        "active": True,
+        "type": "preplay",
+        "sport_id": 1,
+        "status": "pending",
+        "scheduled_start": start,
+        "actual_start": None,
+    }
+    settle_connection.fetch.side_effect = [
+        [{"id": 3, "scheduled_start": start}],
+        [{**event, "id": 3, "version": 2, "upsert_status": "unchanged"}],
+    ]
+    repository = EventRepository(db_pool_mock, logger_mock)
+
+    [result] = await repository.upsert_many([event])
+
+    assert result["status"] == "updated"
+    assert settle_connection.fetch.await_args_list[0].args[1:] == (
+        ["final-match"],
+        [start],
+    )
+    events_move, selections_move = [
+        call.args for call in settle_connection.execute.await_args_list[-2:]
+    ]
+    assert events_move[0].startswith("UPDATE events")
+    assert selections_move[0].startswith("UPDATE selections")
+    assert selections_move[1:] == ([3], [start])
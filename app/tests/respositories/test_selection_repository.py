@@ -1,7 +1,10 @@
 import logging
 import asyncpg
 import pytest
-from repositories.selection_repository import SelectionRepository
+from repositories.selection_repository import (
+    SelectionRepository,
+    market_status_query,
+)
 from schemas import SelectionBase, SelectionOutcome
 
 
@@ -167,3 +170,67 @@ async def test_update_selection(selection_repository_update, mocker):
         "active": False,
         "outcome": SelectionOutcome.LOSE,
     }
+
+
+def test_market_status_query_suspend_cascades_when_no_event_left():
+    query = market_status_query("event", False)
+    assert "WHERE id = $1" in query
+    assert "sp.active_events_count <= " in query
+    assert "pg_notify(" in query
+    assert "outcome = 'unsettled'" not in query
+
+
+def test_market_status_query_resume_reopens_only_unsettled():
+    query = market_status_query("sport", True)
+    assert "WHERE sport_id = $1 AND status IN ('pending', 'started')" in query
+    assert "s.outcome = 'unsettled'" in query
+    assert "sp.id = $1" in query
+
+
+@pytest.mark.asyncio
+async def test_set_market_active_publishes_changes(db_pool_mock, logger_mock, mocker):
+    connection = mocker.AsyncMock()
+    connection.fetchrow.return_value = {
+        "selections": [[1, 4], [2, 7]],
+        "events": [[10, 3]],
+        "sports": [],
+    }
+    db_pool_mock.acquire.return_value.__aenter__.return_value = connection
+    publish = mocker.patch("repositories.selection_repository.publish_change")
+    repository = SelectionRepository(db_pool_mock, logger_mock)
+
+    changed = await repository.set_market_active("event", 10, False)
+
+    assert changed == {"selections": [1, 2], "events": [10], "sports": []}
+    assert connection.fetchrow.await_args.args[1] == 10
+    publish.assert_any_call(
+        "events", {"id": 10, "active": False, "version": 3}, {"active": False}
+    )
+    assert publish.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_update_publishes_an_unchanged_price_as_no_change(
+    db_pool_mock, logger_mock, mocker
+):
+    connection = mocker.AsyncMock()
+    connection.transaction = mocker.MagicMock()
+    connection.fetchval.side_effect = [2.5, 2.5]
+    connection.fetchrow.side_effect = [
+        {"id": 1, "name": "Home", "price": 2.5},
+        {"id": 1, "name": "Home", "price": 3.0},
+    ]
+    db_pool_mock.acquire.return_value.__aenter__.return_value = connection
+    publish = mocker.patch("repositories.selection_repository.publish_change")
+
+    await SelectionRepository(db_pool_mock, logger_mock).update(
+        1, {"name": "Home", "price": 2.5}
+    )
+    await SelectionRepository(db_pool_mock, logger_mock).update(
+        1, {"name": "Home", "price": 3.0}
+    )
+
+    assert [call.args[2] for call in publish.call_args_list] == [
+        {"name": "Home"},
+        {"name": "Home", "price": 3.0},
+    ]
@@ -6,6 +6,7 @@ from datetime import datetime
 
 from repositories.sport_repository import SportRepository
 from schemas import SportBase
+from utils.custom_exceptions import UpdateError
 
 
 @pytest.fixture
@@ -110,3 +111,15 @@ async def test_update_sport(sport_repository_update, mocker):
         "slug": "updated-sport",
         "active": False,
     }
+
+
+@pytest.mark.asyncio
+async def test_update_missing_sport(db_pool_mock, logger_mock, mocker):
+    connection = mocker.AsyncMock()
+    connection.transaction = mocker.MagicMock()
+    connection.fetchrow.return_value = None
+    db_pool_mock.acquire.return_value.__aenter__.return_value = connection
+    repository = SportRepository(db_pool_mock, logger_mock)
+
+    with pytest.raises(UpdateError, match="Sport with ID 7 not found."):
+        await repository.update(7, {"name": "Gone"})
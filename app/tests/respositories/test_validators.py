@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from repositories.validators import (
+    TABLE_GENERATION_QUERY,
+    catalog_validator,
+    fetch_validator,
+)
+
+
+@pytest.mark.asyncio
+async def test_fetch_validator():
+    connection = AsyncMock()
+    connection.fetchval.return_value = 14
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+
+    validator = await fetch_validator(db_pool, "sports")
+
+    assert validator == "db:14"
+    connection.fetchval.assert_awaited_once_with(TABLE_GENERATION_QUERY, "sports")
+
+
+@pytest.mark.asyncio
+async def test_fetch_validator_of_parent():
+    connection = AsyncMock()
+    connection.fetchval.return_value = 0
+    db_pool = MagicMock()
+    db_pool.acquire.return_value.__aenter__.return_value = connection
+
+    validator = await fetch_validator(db_pool, "selections", 5)
+
+    assert validator == "db:0"
+    query, event_id = connection.fetchval.await_args.args
+    assert "FROM event_selection_generations WHERE event_id = $1" in query
+    assert event_id == 5
+
+
+def test_catalog_validator():
+    with patch("repositories.validators.get_catalog", return_value=None):
+        assert catalog_validator("sports") is None
+
+    catalog = MagicMock()
+    catalog.generation.return_value = "abc-2"
+    with patch("repositories.validators.get_catalog", return_value=catalog):
+        assert catalog_validator("selections", 10) == "catalog:abc-2"
+    catalog.generation.assert_called_once_with("selections", 10)
@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import AsyncMock
+from asyncpg.exceptions import LockNotAvailableError
+from repositories.versioning import check_version
+from utils.custom_exceptions import VersionConflictError
+
+
+@pytest.mark.asyncio
+async def test_check_version_skipped_without_expected_version():
+    connection = AsyncMock()
+    assert await check_version(connection, "events", 1, None) is True
+    connection.fetchval.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_check_version_matches():
+    connection = AsyncMock()
+    connection.fetchval.return_value = 3
+    assert await check_version(connection, "events", 1, 3) is True
+    assert "FOR NO KEY UPDATE NOWAIT" in connection.fetchval.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_check_version_missing_row():
+    connection = AsyncMock()
+    connection.fetchval.return_value = None
+    assert await check_version(connection, "events", 1, 3) is False
+
+
+@pytest.mark.asyncio
+async def test_check_version_conflict():
+    connection = AsyncMock()
+    connection.fetchval.return_value = 4
+    with pytest.raises(VersionConflictError) as conflict:
+        await check_version(connection, "selections", 1, 3)
+    assert conflict.value.current_version == 4
+
+
+@pytest.mark.asyncio
+async def test_check_version_fails_fast_when_locked():
+    connection = AsyncMock()
+    connection.fetchval.side_effect = LockNotAvailableError("locked")
+    with pytest.raises(VersionConflictError) as conflict:
+        await check_version(connection, "selections", 1, 3)
+    assert conflict.value.current_version is None
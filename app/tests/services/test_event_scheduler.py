@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from services.event_scheduler import EventScheduler
+
+NOW = datetime(2023, 10, 8, 13, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = EventScheduler(Mock(), Mock(spec=logging.Logger), batch_size=2)
+    scheduler.event_repository = Mock(
+        get_pending_events_until=AsyncMock(), start_events=AsyncMock()
+    )
+    return scheduler
+
+
+def test_pop_due_in_start_order(scheduler):
+    scheduler.schedule(1, NOW + timedelta(minutes=1))
+    scheduler.schedule(2, NOW - timedelta(minutes=1))
+    scheduler.schedule(3, NOW)
+
+    assert scheduler.pop_due(NOW) == [2, 3]
+    assert scheduler.next_start() == NOW + timedelta(minutes=1)
+
+
+def test_rescheduled_event_fires_once(scheduler):
+    scheduler.schedule(1, NOW - timedelta(minutes=5))
+    scheduler.schedule(1, NOW + timedelta(minutes=5))
+
+    assert scheduler.pop_due(NOW) == []
+    assert scheduler.pop_due(NOW + timedelta(minutes=5)) == [1]
+
+
+@pytest.mark.asyncio
+async def test_refresh_loads_upcoming_events(scheduler):
+    scheduler.event_repository.get_pending_events_until.return_value = [
+        {"id": 1, "scheduled_start": NOW}
+    ]
+
+    await scheduler.refresh(NOW)
+
+    scheduler.event_repository.get_pending_events_until.assert_called_once_with(
+        NOW + scheduler.horizon
+    )
+    assert scheduler.next_start() == NOW
+
+
+@pytest.mark.asyncio
+async def test_fire_due_starts_events_in_batches(scheduler):
+    for event_id in range(3):
+        scheduler.schedule(event_id, NOW)
+
+    async def start_events(event_ids):
+        return [
+            {
+                "id": i,
+                "scheduled_start": NOW,
+                "actual_start": NOW + timedelta(seconds=2),
+            }
+            for i in event_ids
+        ]
+
+    scheduler.event_repository.start_events.side_effect = start_events
+
+    assert await scheduler.fire_due(NOW) == 3
+    assert [
+        c.args[0] for c in scheduler.event_repository.start_events.call_args_list
+    ] == [
+        [0, 1],
+        [2],
+    ]
+    assert scheduler.metrics.summaries["event_scheduler.lateness_seconds"].last == 2
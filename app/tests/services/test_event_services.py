@@ -1,9 +1,10 @@
 import pytest
 import datetime
 from unittest.mock import Mock, AsyncMock, patch
-from schemas import EventType, EventStatus
+from schemas import EventType, EventStatus, SelectionOutcome
 from services.event_service import EventService
 from repositories.event_repository import EventRepository
+from utils.custom_exceptions import ValidationError
 import logging
 
 
@@ -12,10 +13,13 @@ def mock_event_repository():
     return Mock(
         spec=EventRepository,
         get_all=AsyncMock(),
+        get_archived=AsyncMock(),
         create=AsyncMock(),
         update=AsyncMock(),
         get_events_selections=AsyncMock(),
         filter_events=AsyncMock(),
+        settle_events=AsyncMock(),
+        upsert_many=AsyncMock(),
     )
 
 
@@ -35,6 +39,33 @@ async def test_get_all(event_service, mock_event_repository):
     result = await event_service.get_all()
     assert result == [{"id": 1}]
     mock_event_repository.get_all.assert_called_once()
+    mock_event_repository.get_archived.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_all_include_archived(event_service, mock_event_repository):
+    mock_event_repository.get_all.return_value = [{"id": 1}, {"id": 2}]
+    mock_event_repository.get_archived.return_value = [{"id": 2}, {"id": 3}]
+    result = await event_service.get_all(include_archived=True)
+    assert result == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+@pytest.mark.asyncio
+async def test_get_all_projects_fields(event_service, mock_event_repository):
+    mock_event_repository.get_all.return_value = [{"id": 1, "name": "A"}]
+    mock_event_repository.get_archived.return_value = [
+        {"id": 2, "name": "B", "slug": "b", "status": "ended"}
+    ]
+    result = await event_service.get_all(include_archived=True, fields="name")
+    mock_event_repository.get_all.assert_called_once_with(("id", "name"))
+    assert result == [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+
+
+@pytest.mark.asyncio
+async def test_get_all_rejects_unknown_fields(event_service, mock_event_repository):
+    with pytest.raises(ValidationError):
+        await event_service.get_all(fields="name,price")
+    mock_event_repository.get_all.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -81,3 +112,91 @@ async def test_filter_events(event_service, mock_event_repository):
     result = await event_service.filter_events(criteria)
     assert result == [{"id": 1, "name": "TestEvent"}]
     mock_event_repository.filter_events.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_settle_with_winner(event_service, mock_event_repository):
+    mock_event_repository.settle_events.return_value = {
+        "events": [{"id": 1, "status": "ended"}],
+        "selections": [{"id": 10, "outcome": "win"}, {"id": 11, "outcome": "lose"}],
+    }
+    result = await event_service.settle(1, {"winner_id": 10, "outcomes": None})
+    assert result["event"] == {"id": 1, "status": "ended"}
+    assert len(result["selections"]) == 2
+    mock_event_repository.settle_events.assert_called_once_with([], [(1, 10)])
+
+
+@pytest.mark.asyncio
+async def test_settle_many_with_outcomes(event_service, mock_event_repository):
+    mock_event_repository.settle_events.return_value = {"events": [], "selections": []}
+    await event_service.settle_many(
+        [
+            {"event_id": 1, "outcomes": {10: SelectionOutcome.WIN, "11": "void"}},
+            {"event_id": 2, "winner_id": 20},
+        ]
+    )
+    mock_event_repository.settle_events.assert_called_once_with(
+        [(1, 10, "win"), (1, 11, "void")], [(2, 20)]
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "settlements",
+    [
+        [{"event_id": 1}],
+        [{"event_id": 1, "winner_id": 10, "outcomes": {11: "lose"}}],
+        [{"event_id": 1, "outcomes": {10: "unsettled"}}],
+        [{"event_id": 1, "outcomes": {10: "draw"}}],
+        [{"event_id": 1, "winner_id": 10}, {"event_id": 1, "winner_id": 11}],
+    ],
+)
+async def test_settle_many_rejects_invalid(
+    event_service, mock_event_repository, settlements
+):
+    with pytest.raises(ValidationError):
+        await event_service.settle_many(settlements)
+    mock_event_repository.settle_events.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upsert_many(event_service, mock_event_repository):
+    start = datetime.datetime(2026, 5, 1, 18, 0, tzinfo=datetime.timezone.utc)
+    event = {
+        "name": "Final Match",
+        "active": True,
+        "type": EventType.PREPLAY,
+        "sport_id": 1,
+        "status": EventStatus.PENDING,
+        "scheduled_start": start,
+        "actual_start": start,
+    }
+    mock_event_repository.upsert_many.return_value = [
+        {"status": "unchanged", "row": {"id": 3}}
+    ]
+    results = await event_service.upsert_many([event])
+    assert results == [{"status": "unchanged", "row": {"id": 3}}]
+    [rows] = mock_event_repository.upsert_many.call_args.args
+    assert rows[0]["slug"] == "final-match"
+    assert rows[0]["type"] == EventType.PREPLAY.value
+    assert rows[0]["status"] == EventStatus.PENDING.value
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_rejects_duplicate_keys(event_service, mock_event_repository):
+    start = datetime.datetime(2026, 5, 1, 18, 0, tzinfo=datetime.timezone.utc)
+    event = {
+        "name": "Final Match",
+        "active": True,
+        "type": "preplay",
+        "sport_id": 1,
+        "status": "pending",
+        "scheduled_start": start,
+        "actual_start": start,
+    }
+    later = {**event, "scheduled_start": start + datetime.timedelta(days=1)}
+    with pytest.raises(ValidationError):
+        await event_service.upsert_many([event, {**event, "name": "final match"}])
+    with pytest.raises(ValidationError):
+        await event_service.upsert_many([event, later])
+    mock_event_repository.upsert_many.assert_not_called()
@@ -0,0 +1,102 @@
+import logging
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from db.price_store import PriceStore
+from services.market_service import MarketService
+from repositories.price_history_repository import PriceHistoryRepository
+from repositories.selection_repository import SelectionRepository
+from utils.custom_exceptions import ValidationError
+
+
+@pytest.fixture
+def mock_selection_repository():
+    return Mock(
+        spec=SelectionRepository,
+        get_active_prices=AsyncMock(),
+        set_market_active=AsyncMock(),
+    )
+
+
+@pytest.fixture
+def market_service(mock_selection_repository):
+    return MarketService(mock_selection_repository, Mock(spec=logging.Logger))
+
+
+@pytest.mark.asyncio
+async def test_get_event_market_stats(market_service, mock_selection_repository):
+    mock_selection_repository.get_active_prices.return_value = PriceStore.from_rows(
+        [
+            {"id": 1, "event_id": 10, "sport_id": 1, "price": 2.0},
+            {"id": 2, "event_id": 10, "sport_id": 1, "price": 2.0},
+        ]
+    )
+    stats = await market_service.get_event_market_stats(10)
+    mock_selection_repository.get_active_prices.assert_called_once_with(10)
+    assert stats["overround"] == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_get_event_market_stats_price_drift(mock_selection_repository):
+    mock_selection_repository.get_active_prices.return_value = PriceStore.from_rows(
+        [
+            {"id": 1, "event_id": 10, "sport_id": 1, "price": 2.0},
+            {"id": 2, "event_id": 10, "sport_id": 1, "price": 2.0},
+        ]
+    )
+    price_history_repository = Mock(
+        spec=PriceHistoryRepository,
+        get_opening_prices=AsyncMock(return_value={1: 2.5}),
+    )
+    service = MarketService(
+        mock_selection_repository, Mock(spec=logging.Logger), price_history_repository
+    )
+
+    stats = await service.get_event_market_stats(10)
+
+    selection_ids, _ = price_history_repository.get_opening_prices.call_args.args
+    assert selection_ids == [1, 2]
+    assert [s["price_drift"] for s in stats["selections"]] == [-0.5, None]
+
+
+@pytest.mark.asyncio
+async def test_get_market_stats(market_service, mock_selection_repository):
+    mock_selection_repository.get_active_prices.return_value = PriceStore.from_rows(
+        [
+            {"id": 1, "event_id": 10, "sport_id": 1, "price": 2.0},
+            {"id": 2, "event_id": 11, "sport_id": 1, "price": 4.0},
+        ]
+    )
+    stats = await market_service.get_market_stats()
+    assert [event["event_id"] for event in stats["events"]] == [10, 11]
+    assert stats["sports"][0]["events_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_suspend_event_markets(market_service, mock_selection_repository):
+    mock_selection_repository.set_market_active.return_value = {
+        "selections": [1, 2, 3],
+        "events": [10],
+        "sports": [],
+    }
+    result = await market_service.set_markets_active("event", 10, False)
+    mock_selection_repository.set_market_active.assert_called_once_with(
+        "event", 10, False
+    )
+    assert result == {
+        "scope": "event",
+        "id": 10,
+        "active": False,
+        "selections": 3,
+        "events": 1,
+        "sports": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_set_markets_active_rejects_unknown_scope(
+    market_service, mock_selection_repository
+):
+    with pytest.raises(ValidationError):
+        await market_service.set_markets_active("selection", 1, True)
+    mock_selection_repository.set_market_active.assert_not_called()
@@ -0,0 +1,60 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from services.price_history_service import PriceHistoryService
+from repositories.price_history_repository import PriceHistoryRepository
+
+
+@pytest.fixture
+def mock_price_history_repository():
+    return Mock(spec=PriceHistoryRepository, get_ohlc=AsyncMock())
+
+
+@pytest.fixture
+def price_history_service(mock_price_history_repository):
+    return PriceHistoryService(mock_price_history_repository, Mock(spec=logging.Logger))
+
+
+@pytest.mark.asyncio
+async def test_stream_history(price_history_service, mock_price_history_repository):
+    ts = datetime(2023, 10, 8, 13, 0, tzinfo=timezone.utc)
+
+    async def ticks(*args):
+        yield {"ts": ts, "price": 1.5}
+
+    mock_price_history_repository.stream_history = ticks
+    lines = [line async for line in price_history_service.stream_history(1)]
+    assert lines == ['{"ts": "2023-10-08T13:00:00+00:00", "price": 1.5}\n']
+
+
+@pytest.mark.asyncio
+async def test_get_ohlc_defaults_to_last_day(
+    price_history_service, mock_price_history_repository
+):
+    await price_history_service.get_ohlc(1)
+    selection_id, start, end, interval = (
+        mock_price_history_repository.get_ohlc.call_args.args
+    )
+    assert (end - start).days == 1
+    assert interval == "minute"
+
+
+@pytest.mark.asyncio
+async def test_get_ohlc_rejects_empty_range(price_history_service):
+    ts = datetime(2023, 10, 8, tzinfo=timezone.utc)
+    with pytest.raises(ValueError):
+        await price_history_service.get_ohlc(1, start=ts, end=ts)
+
+
+def test_time_range_rejects_future_start(price_history_service):
+    start = datetime.now(timezone.utc) + timedelta(hours=1)
+    with pytest.raises(ValueError, match="start must be before end"):
+        price_history_service.time_range(start, None)
+
+
+def test_time_range_takes_naive_datetimes_as_utc(price_history_service):
+    start, end = price_history_service.time_range(None, datetime(2023, 10, 8))
+    assert end == datetime(2023, 10, 8, tzinfo=timezone.utc)
+    assert start == datetime(2023, 10, 7, tzinfo=timezone.utc)
@@ -0,0 +1,47 @@
+import logging
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from db.name_index import NameIndex
+from repositories.search_repository import SearchRepository
+from schemas import SearchCriteria
+from services.search_service import SearchService
+
+
+@pytest.fixture
+def mock_search_repository():
+    return Mock(spec=SearchRepository, db_pool=Mock(), search=AsyncMock())
+
+
+@pytest.fixture
+def search_service(mock_search_repository):
+    return SearchService(mock_search_repository, Mock(spec=logging.Logger))
+
+
+@pytest.mark.asyncio
+async def test_search(search_service, mock_search_repository):
+    mock_search_repository.search.return_value = [{"id": 1}]
+    criteria = SearchCriteria(
+        sport={"name": "Football"}, event={"status": "started"}, target="event"
+    )
+
+    assert await search_service.search(criteria.dict()) == [{"id": 1}]
+
+    query, params = mock_search_repository.search.call_args.args
+    assert query.startswith("SELECT ev.* FROM events ev")
+    assert params == ["Football", "started", 100, 0]
+
+
+@pytest.mark.asyncio
+async def test_autocomplete(search_service):
+    index = NameIndex()
+    index.load_rows({"sports": [{"id": 1, "name": "Football"}]})
+
+    with patch("services.search_service.load_name_index", return_value=index):
+        results = await search_service.autocomplete("foo", 5)
+
+    assert results == {
+        "sports": [{"id": 1, "name": "Football"}],
+        "events": [],
+        "selections": [],
+    }
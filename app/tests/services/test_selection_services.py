@@ -1,7 +1,7 @@
 import logging
 
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from services.selection_service import SelectionService
 from repositories.selection_repository import SelectionRepository
 from repositories.event_repository import EventRepository
@@ -30,3 +30,40 @@ def selection_service(
     return SelectionService(
         mocked_selection_repository, mocked_event_repository, mocked_logger
     )
+
+
+@pytest.mark.asyncio
+async def test_update_writes_once_with_expected_version(
+    selection_service, mocked_selection_repository
+):
+    mocked_selection_repository.update.return_value = {"id": 1, "version": 4}
+    updated = await selection_service.update(
+        1,
+        {"name": "Home", "price": 2.1, "active": True, "outcome": SelectionOutcome.WIN},
+        expected_version=3,
+    )
+    assert updated == {"id": 1, "version": 4}
+    mocked_selection_repository.update.assert_awaited_once()
+    assert mocked_selection_repository.update.await_args.args[2] == 3
+
+
+@pytest.mark.asyncio
+async def test_filter_selections_selects_fields(
+    selection_service, mocked_selection_repository
+):
+    mocked_selection_repository.filter_selections = AsyncMock(return_value=[])
+    await selection_service.filter_selections({"active": True}, "name,price")
+    query, params, _ = mocked_selection_repository.filter_selections.call_args.args
+    assert query.startswith("SELECT id, name, price FROM selections WHERE 1=1")
+    assert params == [True]
+
+
+@pytest.mark.asyncio
+async def test_get_selections_by_event_id_passes_fields(
+    selection_service, mocked_selection_repository
+):
+    mocked_selection_repository.get_selections_by_event_id = AsyncMock(return_value=[])
+    await selection_service.get_selections_by_event_id(7, "price")
+    mocked_selection_repository.get_selections_by_event_id.assert_awaited_once_with(
+        7, ("id", "price")
+    )
@@ -6,6 +6,10 @@ from unittest.mock import AsyncMock, Mock
 from services.sport_service import SportService
 from repositories.sport_repository import SportRepository
 from repositories.event_repository import EventRepository
+from db.database import StatementTimeoutError
+from utils.custom_exceptions import ValidationError
+from utils.metrics import get_metrics
+from utils.regex_filter import REGEX_TIMEOUT_MS
 
 
 @pytest.fixture
@@ -20,6 +24,7 @@ def mock_sport_repository():
         get_all=AsyncMock(),
         create=AsyncMock(),
         update=AsyncMock(),
+        upsert_many=AsyncMock(),
     )
 
 
@@ -68,3 +73,68 @@ async def test_update_inactive_sport(
     updated_sport = await sport_service.update(sport_id, sport_data)
     mock_event_repository.get_active_events_count.assert_called_once_with(sport_id)
     assert updated_sport["name"] == "Football Updated"
+
+
+@pytest.mark.asyncio
+async def test_filter_sports_regex_budget(sport_service, mock_sport_repository):
+    mock_sport_repository.filter_sports = AsyncMock(return_value=[])
+
+    await sport_service.filter_sports({"name_regex": "^Foot", "threshold": 0})
+
+    query, params, timeout_ms = mock_sport_repository.filter_sports.call_args.args
+    assert "s.name LIKE $1" in query and "s.name ~ $2" in query
+    assert params == ["Foot%", "^Foot"]
+    assert timeout_ms == REGEX_TIMEOUT_MS
+
+
+@pytest.mark.asyncio
+async def test_filter_sports_timeout_is_counted(sport_service, mock_sport_repository):
+    mock_sport_repository.filter_sports = AsyncMock(
+        side_effect=StatementTimeoutError("canceled")
+    )
+    metrics = get_metrics()
+    before = metrics.counters["regex_filter.timed_out"]
+
+    with pytest.raises(StatementTimeoutError):
+        await sport_service.filter_sports({"name_regex": "ball"})
+    assert metrics.counters["regex_filter.timed_out"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_upsert_many(sport_service, mock_sport_repository):
+    mock_sport_repository.upsert_many.return_value = [
+        {"status": "created", "row": {"id": 1, "slug": "football"}},
+        {"status": "unchanged", "row": {"id": 2, "slug": "tennis"}},
+    ]
+    before = dict(get_metrics().counters)
+    await sport_service.upsert_many(
+        [{"name": "Football", "active": True}, {"name": "Tennis", "active": False}]
+    )
+    mock_sport_repository.upsert_many.assert_called_once_with(
+        [
+            {"name": "Football", "slug": "football", "active": True},
+            {"name": "Tennis", "slug": "tennis", "active": False},
+        ]
+    )
+    counters = get_metrics().counters
+    assert (
+        counters["upsert.sports.created"] == before.get("upsert.sports.created", 0) + 1
+    )
+    assert (
+        counters["upsert.sports.unchanged"]
+        == before.get("upsert.sports.unchanged", 0) + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_rejects_duplicate_slugs(
+    sport_service, mock_sport_repository
+):
+    with pytest.raises(ValidationError):
+        await sport_service.upsert_many(
+            [
+                {"name": "Football", "active": True},
+                {"name": "football", "active": False},
+            ]
+        )
+    mock_sport_repository.upsert_many.assert_not_called()
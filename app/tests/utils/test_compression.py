@@ -0,0 +1,101 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from utils.compression import (
+    CODECS,
+    CompressedCache,
+    CompressionMiddleware,
+    negotiate_encoding,
+)
+
+ROWS = [{"id": i, "name": f"Selection {i}", "price": 1.5} for i in range(200)]
+
+
+@pytest.fixture
+def middleware_app():
+    app = FastAPI()
+
+    @app.get("/rows")
+    async def rows():
+        return ROWS
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for row in ROWS[:50]:
+                yield f'{{"id": {row["id"]}}}\n'
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return CompressionMiddleware(app, minimum_size=500)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip;q=0.5, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+        ("*", "zstd" if "zstd" in CODECS else "br" if "br" in CODECS else "gzip"),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_compresses_large_json(middleware_app):
+    client = TestClient(middleware_app)
+    response = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(str(ROWS))
+    assert response.json() == ROWS
+
+
+def test_skips_small_bodies_and_uncompressing_clients(middleware_app):
+    client = TestClient(middleware_app)
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/rows", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == ROWS
+
+
+def test_streams_unchanged(middleware_app):
+    client = TestClient(middleware_app)
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert len(response.text.splitlines()) == 50
+
+
+def test_caches_compressed_bodies(middleware_app):
+    client = TestClient(middleware_app)
+    first = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+
+    assert len(middleware_app.cache) == 1
+    assert second.headers["content-encoding"] == "gzip"
+    assert first.json() == second.json() == ROWS
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CompressedCache(max_bytes=10)
+    cache.put(("gzip", b"a"), b"12345")
+    cache.put(("gzip", b"b"), b"12345")
+    cache.get(("gzip", b"a"))
+    cache.put(("gzip", b"c"), b"12345")
+
+    assert cache.get(("gzip", b"b")) is None
+    assert cache.get(("gzip", b"a")) == b"12345"
+    assert cache.size == 10
@@ -0,0 +1,34 @@
+import pytest
+from utils.custom_exceptions import VersionConflictError
+from utils.etags import etag_matches, parse_if_match, version_etag, weak_etag
+
+
+def test_version_etag_round_trips():
+    assert version_etag(3) == '"3"'
+    assert parse_if_match(version_etag(3)) == 3
+    assert parse_if_match('W/"7"') == 7
+
+
+def test_parse_if_match_wildcard_and_missing():
+    assert parse_if_match(None) is None
+    assert parse_if_match("*") is None
+
+
+def test_parse_if_match_foreign_tag_never_matches():
+    with pytest.raises(VersionConflictError):
+        parse_if_match('"abc"')
+
+
+def test_weak_etag_is_stable_and_distinct():
+    assert weak_etag("/sports/", "db:3-7-12") == weak_etag("/sports/", "db:3-7-12")
+    assert weak_etag("/sports/", "db:3-7-12") != weak_etag("/sports/", "db:3-7-13")
+    assert weak_etag("/sports/", "").startswith('W/"')
+
+
+def test_etag_matches_weakly():
+    tag = weak_etag("/events/", "db:1-1-1")
+    assert etag_matches(tag, tag)
+    assert etag_matches(f'"other", {tag[2:]}', tag)
+    assert etag_matches("*", tag)
+    assert not etag_matches('W/"other"', tag)
+    assert not etag_matches(None, tag)
@@ -0,0 +1,34 @@
+import pytest
+from utils.custom_exceptions import ValidationError
+from utils.fields import parse_fields, project, select_list
+
+
+def test_parse_fields_puts_id_first_without_duplicates():
+    assert parse_fields("selections", "name, price,name,,id") == (
+        "id",
+        "name",
+        "price",
+    )
+
+
+def test_parse_fields_defaults_to_every_column():
+    assert parse_fields("sports", None) is None
+    assert parse_fields("sports", " ") is None
+
+
+@pytest.mark.parametrize("fields", ["name,password", "price", "id; DROP TABLE sports"])
+def test_parse_fields_rejects_unknown_columns(fields):
+    with pytest.raises(ValidationError):
+        parse_fields("sports", fields)
+
+
+def test_select_list():
+    assert select_list(None) == "*"
+    assert select_list(None, "s") == "s.*"
+    assert select_list(("id", "price"), "s") == "s.id, s.price"
+
+
+def test_project():
+    rows = [{"id": 1, "name": "Football", "active": True}]
+    assert project(rows, None) is rows
+    assert project(rows, ("id", "name")) == [{"id": 1, "name": "Football"}]
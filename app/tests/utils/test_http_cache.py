@@ -0,0 +1,86 @@
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from utils import http_cache
+from utils.http_cache import conditional_get
+
+
+@pytest.fixture
+def state():
+    return {"validator": "db:1-1-1", "reads": 0}
+
+
+@pytest.fixture
+def client(state):
+    app = FastAPI()
+
+    @app.get("/sports/")
+    async def sports(request: Request, response: Response):
+        not_modified = conditional_get(request, response, state["validator"], 60)
+        if not_modified is not None:
+            return not_modified
+        state["reads"] += 1
+        return [{"id": 1}]
+
+    return TestClient(app)
+
+
+def test_sends_caching_headers(client):
+    response = client.get("/sports/")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["last-modified"].endswith("GMT")
+
+
+def test_if_none_match_skips_the_read(client, state):
+    etag = client.get("/sports/").headers["etag"]
+
+    response = client.get("/sports/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert state["reads"] == 1
+
+
+def test_changed_validator_sends_the_body(client, state):
+    etag = client.get("/sports/").headers["etag"]
+    state["validator"] = "db:1-1-2"
+
+    response = client.get("/sports/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert state["reads"] == 2
+
+
+def test_if_modified_since(client):
+    last_modified = client.get("/sports/").headers["last-modified"]
+
+    cached = client.get("/sports/", headers={"If-Modified-Since": last_modified})
+    old = client.get(
+        "/sports/", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    )
+
+    assert cached.status_code == 304
+    assert old.status_code == 200
+
+
+def test_if_none_match_takes_precedence(client):
+    last_modified = client.get("/sports/").headers["last-modified"]
+
+    response = client.get(
+        "/sports/",
+        headers={"If-None-Match": 'W/"stale"', "If-Modified-Since": last_modified},
+    )
+
+    assert response.status_code == 200
+
+
+def test_first_seen_is_bounded(monkeypatch):
+    monkeypatch.setattr(http_cache, "FIRST_SEEN_SIZE", 2)
+    monkeypatch.setattr(http_cache, "_first_seen", http_cache.OrderedDict())
+    for tag in ("a", "b", "c"):
+        http_cache._last_modified(tag)
+    assert list(http_cache._first_seen) == ["b", "c"]
@@ -0,0 +1,35 @@
+import pytest
+from utils.lazy_app import LazyASGIApp
+
+
+def build_app():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_lazy_app_builds_on_first_call():
+    lazy_app = LazyASGIApp(f"{__name__}:build_app")
+    assert not lazy_app.loaded
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await lazy_app({"type": "http"}, None, send)
+
+    assert lazy_app.loaded
+    assert messages[0]["status"] == 200
+    assert messages[1]["body"] == b"ok"
+
+
+@pytest.mark.asyncio
+async def test_lazy_app_builds_once():
+    lazy_app = LazyASGIApp(f"{__name__}:build_app")
+    first = await lazy_app.load()
+    second = await lazy_app.load()
+    assert first is second
@@ -0,0 +1,22 @@
+from utils.metrics import Metrics
+
+
+def test_counters():
+    metrics = Metrics()
+    metrics.increment("requests")
+    metrics.increment("requests", 2)
+    assert metrics.snapshot()["counters"] == {"requests": 3}
+
+
+def test_summaries():
+    metrics = Metrics()
+    for value in (0.2, 2, 600):
+        metrics.observe("lateness", value)
+
+    summary = metrics.snapshot()["summaries"]["lateness"]
+    assert summary["count"] == 3
+    assert summary["min"] == 0.2
+    assert summary["max"] == 600
+    assert summary["buckets"]["le_0.5"] == 1
+    assert summary["buckets"]["le_5"] == 2
+    assert summary["buckets"]["le_inf"] == 3
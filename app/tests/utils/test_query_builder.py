@@ -14,6 +14,12 @@ def test_build_query(query_builder):
     assert query == "SELECT * FROM test_table"
 
 
+def test_build_query_with_columns(query_builder):
+    query_builder.add_condition("id", "1")
+    query = query_builder.build_query(("id", "name"))
+    assert query == "SELECT id, name FROM test_table WHERE id = '1'"
+
+
 # Test to verify the construction of an INSERT query
 def test_build_insert_query(query_builder):
     insert_data = {"name": "John", "age": "30"}
@@ -36,6 +42,16 @@ def test_build_update_query(query_builder):
     )
 
 
+def test_build_update_query_increments_version():
+    query_builder = QueryBuilder("test_table", version_column="version")
+    query_builder.add_condition("id", "1")
+    query_builder.add_update_data({"name": "NewName"})
+    assert query_builder.build_update_query() == (
+        "UPDATE test_table SET name = 'NewName', version = version + 1 "
+        "WHERE id = '1' RETURNING *"
+    )
+
+
 # Test to verify that a ValueError is raised when trying to build an UPDATE query without conditions
 def test_build_update_query_without_conditions(query_builder):
     update_data = {"name": "NewName", "age": "25"}
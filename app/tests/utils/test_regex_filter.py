@@ -0,0 +1,96 @@
+import pytest
+
+from utils.custom_exceptions import ValidationError
+from utils.metrics import get_metrics
+from utils.regex_filter import analyze_pattern, normalize_pattern, regex_conditions
+
+
+def test_normalize_pattern():
+    assert normalize_pattern(" .*Final.* ") == "Final"
+    assert normalize_pattern(".*?Cup") == "Cup"
+    assert normalize_pattern("v\\.*") == "v\\.*"
+
+
+def test_literal_prefix_and_trigrams():
+    analysis = analyze_pattern("^Real Madrid.*")
+    assert analysis.pattern == "^Real Madrid"
+    assert analysis.literal_prefix == "Real Madrid"
+    assert "rea" in analysis.trigrams and "rid" in analysis.trigrams
+    assert analysis.selective
+
+
+def test_prefix_stops_at_first_metacharacter():
+    assert analyze_pattern("^Man (City|United)").literal_prefix == "Man "
+    assert analyze_pattern("^Ma?n").literal_prefix == "M"
+    assert analyze_pattern("^a|^b").literal_prefix == ""
+
+
+def test_unselective_and_case_insensitive_patterns():
+    assert not analyze_pattern("[0-9]+").selective
+    analysis = analyze_pattern("(?i)^final")
+    assert analysis.literal_prefix == "" and analysis.trigrams == ()
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["(a+)+$", "(.*a){2,}", "(a|b*)*", "(x)\\1", "a{300}", "(", "a" * 201],
+)
+def test_rejected_patterns(pattern):
+    with pytest.raises(ValidationError):
+        analyze_pattern(pattern)
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "\\bCup",
+        "\\mCup\\M",
+        "Cup\\y",
+        "\\x41",
+        "[[:alpha:]]+",
+        "[\\D]",
+        "a{,3}",
+        "a{b",
+        "(?P<team>Real)",
+        "(?s)a.b",
+        "(?i:cup)",
+        "a++",
+        "[abc",
+    ],
+)
+def test_patterns_read_differently_by_postgres_are_rejected(pattern):
+    with pytest.raises(ValidationError):
+        analyze_pattern(pattern)
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["\\d+ Cup", "^Man\\.", "[^\\d]x", "[]a]", "(?:a|b)c", "a(?!b)", "a{2,3}?"],
+)
+def test_patterns_shared_with_postgres_are_accepted(pattern):
+    assert analyze_pattern(pattern).pattern == pattern
+
+
+def test_analysis_is_cached():
+    analyze_pattern.cache_clear()
+    analyze_pattern("^Cup")
+    analyze_pattern("^Cup")
+    assert analyze_pattern.cache_info().hits == 1
+
+
+def test_regex_conditions():
+    conditions, params = regex_conditions("s.name", "^50%_off", 3)
+    assert conditions == ["s.name LIKE $3", "s.name ~ $4"]
+    assert params == ["50\\%\\_off%", "^50%_off"]
+
+    conditions, params = regex_conditions("name", "Cup", 1)
+    assert conditions == ["name ~ $1"]
+    assert params == ["Cup"]
+
+
+def test_rejected_pattern_is_counted():
+    metrics = get_metrics()
+    before = metrics.counters["regex_filter.rejected"]
+    with pytest.raises(ValidationError):
+        regex_conditions("name", "(a*)*", 1)
+    assert metrics.counters["regex_filter.rejected"] == before + 1
@@ -0,0 +1,85 @@
+import pytest
+
+from schemas import EventStatus, EventSearch, SelectionSearch, SportSearch
+from utils.custom_exceptions import ValidationError
+from utils.search_sql_query import (
+    FIELDS,
+    compile_search,
+    criteria_shape,
+    search_query,
+)
+
+
+def test_target_defaults_to_deepest_entity():
+    query, params = search_query(
+        {
+            "selection": {"price_min": 1.5, "price_max": 3.0},
+            "event": {"status": EventStatus.STARTED},
+            "sport": {"name": "Football"},
+        }
+    )
+    assert query.splitlines() == [
+        "SELECT se.* FROM selections se",
+        "JOIN events ev ON ev.id = se.event_id AND se.event_start = ev.scheduled_start",
+        "JOIN sports sp ON sp.id = ev.sport_id",
+        "WHERE sp.name = $1 AND ev.status = $2 AND se.price <= $3 AND se.price >= $4",
+        "ORDER BY se.id",
+        "LIMIT $5 OFFSET $6",
+    ]
+    assert params == ["Football", "started", 3.0, 1.5, 100, 0]
+
+
+def test_descendants_are_filtered_with_exists():
+    query, params = search_query(
+        {"sport": {"active": True}, "selection": {"outcome": "win"}}, target="sport"
+    )
+    assert "JOIN" not in query
+    assert (
+        "WHERE sp.active = $1 AND EXISTS (SELECT 1 FROM events ev "
+        "WHERE ev.sport_id = sp.id AND EXISTS (SELECT 1 FROM selections se "
+        "WHERE se.event_id = ev.id AND se.event_start = ev.scheduled_start "
+        "AND se.outcome = $2))"
+    ) in query
+    assert params == [True, "win", 100, 0]
+
+
+def test_selective_filters_come_first():
+    query, _ = search_query(
+        {"event": {"active": True, "name_prefix": "Man", "slug": "man-utd-v-city"}}
+    )
+    assert "WHERE ev.slug = $1 AND ev.name LIKE $2 AND ev.active = $3" in query
+
+
+def test_values_are_parameters():
+    query, params = search_query({"sport": {"name_prefix": "50%' OR 1=1 --"}})
+    assert "OR 1=1" not in query
+    assert params[0] == "50\\%' OR 1=1 --%"
+
+
+def test_plan_is_cached_by_shape():
+    compile_search.cache_clear()
+    search_query({"sport": {"name": "Football"}}, limit=10)
+    search_query({"sport": {"name": "Tennis", "active": None}}, limit=20)
+    assert compile_search.cache_info().hits == 1
+    assert criteria_shape({"event": {}}) == ("event", ())
+
+
+@pytest.mark.parametrize(
+    "payload, target",
+    [
+        ({"market": {"name": "x"}}, None),
+        ({"sport": {"price_min": 1}}, None),
+        ({"sport": {"name": "x"}}, "market"),
+    ],
+)
+def test_rejects_unknown_entities_and_fields(payload, target):
+    with pytest.raises(ValidationError):
+        search_query(payload, target)
+
+
+@pytest.mark.parametrize(
+    "entity, schema",
+    [("sport", SportSearch), ("event", EventSearch), ("selection", SelectionSearch)],
+)
+def test_schemas_only_use_whitelisted_fields(entity, schema):
+    assert set(schema.model_fields) == set(FIELDS[entity])
@@ -0,0 +1,39 @@
+from utils.upsert_sql import upsert_query
+
+COLUMNS = (("name", "varchar"), ("slug", "varchar"), ("active", "bool"))
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def test_upsert_query_binds_one_array_per_column():
+    sql = _normalize(upsert_query("sports", COLUMNS, ("slug",)))
+    assert (
+        "unnest($1::varchar[], $2::varchar[], $3::bool[]) AS i(name, slug, active)"
+        in sql
+    )
+    assert "ON CONFLICT (slug) DO UPDATE" in sql
+
+
+def test_upsert_query_skips_unchanged_rows():
+    sql = _normalize(upsert_query("sports", COLUMNS, ("slug",)))
+    assert (
+        "SET name = EXCLUDED.name, active = EXCLUDED.active, version = t.version + 1"
+        in sql
+    )
+    assert (
+        "WHERE (t.name, t.active) IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.active)"
+        in sql
+    )
+    assert (
+        "SELECT t.*, 'unchanged' FROM sports t JOIN input i ON t.slug = i.slug" in sql
+    )
+
+
+def test_upsert_query_matches_composite_keys():
+    columns = COLUMNS + (("scheduled_start", "timestamptz"),)
+    sql = _normalize(upsert_query("events", columns, ("slug", "scheduled_start")))
+    assert "ON CONFLICT (slug, scheduled_start)" in sql
+    assert "t.slug = i.slug AND t.scheduled_start = i.scheduled_start" in sql
+    assert "scheduled_start = EXCLUDED.scheduled_start" not in sql
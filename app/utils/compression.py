@@ -0,0 +1,218 @@
+import asyncio
+import gzip
+import hashlib
+from collections import OrderedDict
+from importlib import import_module
+from importlib.util import find_spec
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import get_metrics
+
+
+def _brotli(body: bytes) -> bytes:
+    return import_module("brotli").compress(body, quality=5)
+
+
+def _zstd(body: bytes) -> bytes:
+    return import_module("zstandard").ZstdCompressor(level=3).compress(body)
+
+
+# Fast levels, as most bodies are compressed on the request path. The
+# optional codecs are offered when installed and imported on first use, so
+# importing this module stays cheap.
+CODECS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if find_spec("brotli") is not None:
+    CODECS["br"] = _brotli
+if find_spec("zstandard") is not None:
+    CODECS["zstd"] = _zstd
+
+# Server preference when the client weighs several codecs equally
+PREFERENCE = ("zstd", "br", "gzip")
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the codec to use from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): The header, e.g. "gzip, br;q=0.9".
+
+    Returns:
+        Optional[str]: The available codec with the highest weight, None if
+                       the client accepts none of them.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if name:
+            weights[name] = weight
+    best, best_weight = None, 0.0
+    for codec in PREFERENCE:
+        if codec not in CODECS:
+            continue
+        weight = weights.get(codec, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = codec, weight
+    return best
+
+
+class CompressedCache:
+    """
+    LRU cache of compressed bodies, keyed by codec and body digest, so the
+    same hot payload is compressed once.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the CompressedCache.
+
+        Args:
+            max_bytes (int): The total size of the cached compressed bodies.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple[str, bytes], value: bytes):
+        if len(value) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing response bodies with the best codec the
+    client accepts (zstd, br or gzip).
+
+    Bodies below minimum_size, non-text content, already encoded responses and
+    streamed responses are sent unchanged. Compression runs in a worker thread.
+    The compressed bodies of successful GET responses are cached by content
+    digest.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, cache_bytes: int = 32 << 20):
+        """
+        Initialize the CompressionMiddleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            minimum_size (int): The smallest body compressed, in bytes.
+            cache_bytes (int): The size of the compressed body cache, 0 to
+                               disable it.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedCache(cache_bytes) if cache_bytes > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        codec = negotiate_encoding(accept_encoding)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = scope.get("method") == "GET"
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            headers = start["headers"]
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or not self._compressible(headers)
+            ):
+                # Streamed or unsuitable: forward everything as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            compressed = await self._compress(
+                codec, body, cacheable and start["status"] == 200
+            )
+            start["headers"] = [
+                (name, value)
+                for name, value in headers
+                if name not in (b"content-length", b"vary")
+            ] + [
+                (b"content-encoding", codec.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", self._vary(headers)),
+            ]
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
+
+    @staticmethod
+    def _compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+        content_type = b""
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        content_type = content_type.decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _vary(headers: List[Tuple[bytes, bytes]]) -> bytes:
+        values = [value for name, value in headers if name == b"vary"]
+        if any(b"accept-encoding" in value.lower() for value in values):
+            return b", ".join(values)
+        return b", ".join(values + [b"Accept-Encoding"])
+
+    async def _compress(self, codec: str, body: bytes, cacheable: bool) -> bytes:
+        metrics = get_metrics()
+        key = None
+        if cacheable and self.cache is not None:
+            key = (codec, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = self.cache.get(key)
+            if compressed is not None:
+                metrics.increment("compression.cache_hits")
+                return compressed
+        compressed = await asyncio.to_thread(CODECS[codec], body)
+        metrics.increment(f"compression.{codec}")
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
@@ -20,3 +20,12 @@ class ValidationError(Exception):
     """Raised when there is an error if data not valid"""
 
     pass
+
+
+class VersionConflictError(Exception):
+    """Raised when a row changed, or is being changed, since the version the
+    caller read"""
+
+    def __init__(self, message, current_version=None):
+        self.current_version = current_version
+        super().__init__(message)
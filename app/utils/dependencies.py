@@ -13,6 +13,14 @@ from services.sport_service import SportService
 from repositories.selection_repository import SelectionRepository
 from services.selection_service import SelectionService
 
+from services.market_service import MarketService
+
+from repositories.price_history_repository import PriceHistoryRepository
+from services.price_history_service import PriceHistoryService
+
+from repositories.search_repository import SearchRepository
+from services.search_service import SearchService
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -109,3 +117,47 @@ def get_selection_service(
         event_repository=event_repository,
         logger=logger,
     )
+
+
+# Markets
+def get_market_service(
+    selection_repository: SelectionRepository = Depends(get_selection_repository),
+    logger: logging.Logger = Depends(get_logger),
+) -> MarketService:
+    """
+    Dependency factory function to get an instance of MarketService.
+
+    Returns:
+        MarketService: An instance of MarketService.
+    """
+    return MarketService(
+        selection_repository=selection_repository,
+        logger=logger,
+        price_history_repository=PriceHistoryRepository(get_db_pool(), logger),
+    )
+
+
+# Price history
+def get_price_history_service(
+    logger: logging.Logger = Depends(get_logger),
+) -> PriceHistoryService:
+    """
+    Dependency factory function to get an instance of PriceHistoryService.
+
+    Returns:
+        PriceHistoryService: An instance of PriceHistoryService.
+    """
+    return PriceHistoryService(PriceHistoryRepository(get_db_pool(), logger), logger)
+
+
+# Search
+def get_search_service(
+    logger: logging.Logger = Depends(get_logger),
+) -> SearchService:
+    """
+    Dependency factory function to get an instance of SearchService.
+
+    Returns:
+        SearchService: An instance of SearchService.
+    """
+    return SearchService(SearchRepository(get_db_pool(), logger), logger)
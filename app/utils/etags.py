@@ -0,0 +1,83 @@
+import hashlib
+from typing import Optional
+
+from utils.custom_exceptions import VersionConflictError
+
+
+def version_etag(version: int) -> str:
+    """
+    Build the entity tag of a row from its version column.
+
+    Args:
+        version (int): The row version.
+
+    Returns:
+        str: The quoted entity tag, e.g. '"3"'.
+    """
+    return f'"{version}"'
+
+
+def weak_etag(*parts) -> str:
+    """
+    Build a weak entity tag from the parts identifying a representation.
+
+    Args:
+        *parts: Values, e.g. a path and the validator of its rows.
+
+    Returns:
+        str: The weak entity tag, e.g. 'W/"1f3a..."'.
+    """
+    key = "\x1f".join(str(part) for part in parts).encode()
+    return f'W/"{hashlib.blake2b(key, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag, with the weak
+    comparison used for conditional GETs.
+
+    Args:
+        if_none_match (Optional[str]): The header value, a list of tags or "*".
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: Whether one of the listed tags matches.
+    """
+    if if_none_match is None:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == opaque:
+            return True
+    return False
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """
+    Read the version a client expects from its If-Match header.
+
+    Args:
+        if_match (Optional[str]): The header value, e.g. '"3"' or 'W/"3"'.
+
+    Returns:
+        Optional[int]: The expected version, None when the header is missing
+                       or "*".
+
+    Raises:
+        VersionConflictError: If the tag is not one this API issues, so it
+                              cannot match any version.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise VersionConflictError(f"If-Match {if_match} matches no version")
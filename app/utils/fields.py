@@ -0,0 +1,112 @@
+from typing import Iterable, List, Optional, Tuple
+
+from utils.custom_exceptions import ValidationError
+
+# Columns a client may request with "fields=", per result shape
+ALLOWED_FIELDS = {
+    "sports": (
+        "id",
+        "name",
+        "slug",
+        "active",
+        "active_events_count",
+        "version",
+        "created_at",
+        "updated_at",
+    ),
+    "events": (
+        "id",
+        "name",
+        "slug",
+        "active",
+        "type",
+        "sport_id",
+        "status",
+        "scheduled_start",
+        "actual_start",
+        "active_selections_count",
+        "version",
+        "created_at",
+        "updated_at",
+    ),
+    "selections": (
+        "id",
+        "name",
+        "event_id",
+        "event_start",
+        "price",
+        "active",
+        "outcome",
+        "version",
+        "created_at",
+        "updated_at",
+    ),
+    # The filter endpoints of sports and events return summaries
+    "sport_filter": ("id", "name", "threshold"),
+    "event_filter": ("id", "name", "active_selections_count"),
+}
+
+
+def parse_fields(shape: str, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Validate a "fields=" parameter against the allow-list of a result shape.
+
+    Args:
+        shape (str): A key of ALLOWED_FIELDS.
+        fields (Optional[str]): Comma-separated column names, e.g. "name,price".
+
+    Returns:
+        Optional[Tuple[str, ...]]: The columns, "id" first and without
+                                   duplicates, None for every column.
+
+    Raises:
+        ValidationError: If a column is not in the allow-list.
+    """
+    if fields is None or not fields.strip():
+        return None
+    allowed = ALLOWED_FIELDS[shape]
+    columns = ["id"]
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in allowed:
+            raise ValidationError(
+                f"Unknown field {field!r}, expected some of: {', '.join(allowed)}"
+            )
+        if field not in columns:
+            columns.append(field)
+    return tuple(columns)
+
+
+def select_list(columns: Optional[Iterable[str]], alias: Optional[str] = None) -> str:
+    """
+    Build the column list of a SELECT from parsed fields.
+
+    Args:
+        columns (Optional[Iterable[str]]): Columns from parse_fields.
+        alias (Optional[str]): The table alias to qualify them with.
+
+    Returns:
+        str: e.g. "s.id, s.price", or "*" (resp. "s.*") for every column.
+    """
+    prefix = f"{alias}." if alias else ""
+    if columns is None:
+        return f"{prefix}*"
+    return ", ".join(f"{prefix}{column}" for column in columns)
+
+
+def project(rows: List[dict], columns: Optional[Iterable[str]]) -> List[dict]:
+    """
+    Keep the given columns of rows read in full, e.g. from the catalog.
+
+    Args:
+        rows (List[dict]): The rows.
+        columns (Optional[Iterable[str]]): Columns from parse_fields.
+
+    Returns:
+        List[dict]: The projected rows, the rows themselves for None.
+    """
+    if columns is None:
+        return rows
+    return [{column: row.get(column) for column in columns} for row in rows]
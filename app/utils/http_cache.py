@@ -0,0 +1,88 @@
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from utils.etags import etag_matches, weak_etag
+from utils.metrics import get_metrics
+
+# Cache-Control max-age of the cached read routes, in seconds
+CACHE_MAX_AGE = {
+    "sports": int(os.getenv("CACHE_MAX_AGE_SPORTS", "60")),
+    "events": int(os.getenv("CACHE_MAX_AGE_EVENTS", "10")),
+    "selections": int(os.getenv("CACHE_MAX_AGE_SELECTIONS", "2")),
+}
+
+# Entity tag -> when this process first served it, the tables having no
+# modification time
+_first_seen: "OrderedDict[str, int]" = OrderedDict()
+FIRST_SEEN_SIZE = 4096
+
+
+def _last_modified(etag: str) -> int:
+    seen = _first_seen.get(etag)
+    if seen is None:
+        seen = int(time.time())
+        _first_seen[etag] = seen
+        if len(_first_seen) > FIRST_SEEN_SIZE:
+            _first_seen.popitem(last=False)
+    else:
+        _first_seen.move_to_end(etag)
+    return seen
+
+
+def _modified_since(if_modified_since: Optional[str], last_modified: int) -> bool:
+    if if_modified_since is None:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return True
+    return last_modified > since
+
+
+def conditional_get(
+    request: Request, response: Response, validator: str, max_age: int
+) -> Optional[Response]:
+    """
+    Answer a conditional GET from the validator of the rows it reads, before
+    they are read.
+
+    The validator must change whenever the rows do. Reading it before the rows
+    is safe: a change in between makes the body newer than its tag, which only
+    costs the client one more full response.
+
+    Args:
+        request (Request): The request, with its If-None-Match or
+                           If-Modified-Since header.
+        response (Response): The response, given the caching headers.
+        validator (str): Identifies the current state of the rows.
+        max_age (int): The Cache-Control max-age, in seconds.
+
+    Returns:
+        Optional[Response]: A 304 response if the client's copy is current,
+                            None if the route must send the body.
+    """
+    etag = weak_etag(request.url.path, request.url.query, validator)
+    last_modified = _last_modified(etag)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+    # If-None-Match takes precedence, If-Modified-Since is only a fallback
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        not_modified = not _modified_since(
+            request.headers.get("if-modified-since"), last_modified
+        )
+    if not_modified:
+        get_metrics().increment("http_cache.not_modified")
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
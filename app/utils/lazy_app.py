@@ -0,0 +1,45 @@
+import asyncio
+import importlib
+
+
+class LazyASGIApp:
+    def __init__(self, factory_path: str):
+        """
+        Initialize the LazyASGIApp.
+
+        Args:
+            factory_path (str): Import path of the application factory, in the
+                                "module:function" form.
+        """
+        self.factory_path = factory_path
+        self._app = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._app is not None
+
+    def _build(self):
+        module_name, _, factory_name = self.factory_path.partition(":")
+        factory = getattr(importlib.import_module(module_name), factory_name)
+        return factory()
+
+    async def load(self):
+        """
+        Import and build the wrapped application once.
+
+        The import runs in a worker thread so the event loop keeps serving
+        other requests (e.g. health probes) while the modules load.
+
+        Returns:
+            The wrapped ASGI application.
+        """
+        if self._app is None:
+            async with self._lock:
+                if self._app is None:
+                    self._app = await asyncio.to_thread(self._build)
+        return self._app
+
+    async def __call__(self, scope, receive, send):
+        app = await self.load()
+        await app(scope, receive, send)
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Dict, Tuple
+
+
+class Summary:
+    """
+    Running count/sum/min/max of observed values with cumulative histogram
+    buckets.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "last", "bucket_counts")
+
+    BUCKETS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.5, 1, 5, 30, 60, 300)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last = value
+        for i, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+
+    def snapshot(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.BUCKETS + (float("inf"),), self.bucket_counts):
+            cumulative += count
+            buckets[f"le_{bound}"] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "last": self.last,
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """
+    In-process registry of counters and summaries.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.summaries: Dict[str, Summary] = defaultdict(Summary)
+
+    def increment(self, name: str, value: int = 1):
+        self.counters[name] += value
+
+    def observe(self, name: str, value: float):
+        self.summaries[name].observe(value)
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "summaries": {
+                name: summary.snapshot() for name, summary in self.summaries.items()
+            },
+        }
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def count_upserts(table: str, results: list):
+    """
+    Count upserted rows by outcome, as upsert.<table>.<status>.
+
+    Args:
+        table (str): The table upserted into.
+        results (list): The results of the upsert, each with a "status".
+    """
+    metrics = get_metrics()
+    for result in results:
+        metrics.increment(f"upsert.{table}.{result['status']}")
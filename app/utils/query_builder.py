@@ -1,17 +1,20 @@
 import re
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence
 
 
 class QueryBuilder:
-    def __init__(self, table_name: str):
+    def __init__(self, table_name: str, version_column: Optional[str] = None):
         """
         Initialize the QueryBuilder.
 
         Args:
             table_name (str): The name of the database table.
+            version_column (Optional[str]): A row version column, incremented
+                                            by every UPDATE query.
         """
         self.table_name = table_name
+        self.version_column = version_column
         self.conditions: List[str] = []
         self.insert_data: List[dict] = []
         self.update_data: Optional[Dict[str, str]] = None
@@ -45,18 +48,23 @@ class QueryBuilder:
         """
         self.update_data = data
 
-    def build_query(self) -> str:
+    def build_query(self, columns: Optional[Sequence[str]] = None) -> str:
         """
         Build a SELECT query based on conditions.
 
+        Args:
+            columns (Optional[Sequence[str]]): The columns to select, from an
+                                               allow-list; None for all.
+
         Returns:
             str: The SELECT query.
         """
+        select = ", ".join(columns) if columns else "*"
         if not self.conditions:
-            return f"SELECT * FROM {self.table_name}"
+            return f"SELECT {select} FROM {self.table_name}"
         else:
             conditions_str = " AND ".join(self.conditions)
-            return f"SELECT * FROM {self.table_name} WHERE {conditions_str}"
+            return f"SELECT {select} FROM {self.table_name} WHERE {conditions_str}"
 
     def build_insert_query(self) -> Optional[str]:
         """
@@ -95,9 +103,10 @@ class QueryBuilder:
                 "Update query requires at least one condition to specify which records to update"
             )
 
-        set_clause = ", ".join(
-            [f"{key} = '{value}'" for key, value in self.update_data.items()]
-        )
+        assignments = [f"{key} = '{value}'" for key, value in self.update_data.items()]
+        if self.version_column:
+            assignments.append(f"{self.version_column} = {self.version_column} + 1")
+        set_clause = ", ".join(assignments)
         conditions_str = " AND ".join(self.conditions)
         query = f"UPDATE {self.table_name} SET {set_clause} WHERE {conditions_str} RETURNING *"
         return query
@@ -0,0 +1,271 @@
+import os
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+from utils.custom_exceptions import ValidationError
+from utils.metrics import get_metrics
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+MAX_PATTERN_LENGTH = 200
+
+# Postgres rejects repetition bounds above 255 (DUPMAX)
+MAX_REPEAT_BOUND = 255
+
+REGEX_TIMEOUT_MS = int(os.getenv("REGEX_FILTER_TIMEOUT_MS", "500"))
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+_BACKREFERENCES = {sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS}
+
+
+# Class escapes meaning the same in Python and Postgres ARE; inside brackets
+# ARE only accepts the positive ones
+CLASS_ESCAPES = frozenset("dswDSW")
+BRACKET_CLASS_ESCAPES = frozenset("dsw")
+
+# The groups both dialects read the same way, and the only inline flag
+SHARED_GROUPS = ("(?:", "(?=", "(?!")
+CASE_INSENSITIVE = "(?i)"
+
+_BOUND = re.compile(r"\{\d+(,\d*)?\}")
+
+
+class PatternAnalysis(NamedTuple):
+    pattern: str
+    literal_prefix: str
+    trigrams: Tuple[str, ...]
+
+    @property
+    def selective(self) -> bool:
+        """
+        Whether an index (btree prefix or trigram) can narrow the scan.
+        """
+        return bool(self.literal_prefix or self.trigrams)
+
+
+def normalize_pattern(pattern: str) -> str:
+    """
+    Drop the leading and trailing ".*", which are implied by an unanchored
+    search and only make the matcher backtrack.
+
+    Args:
+        pattern (str): The user supplied regular expression.
+
+    Returns:
+        str: The equivalent pattern without the redundant wildcards.
+    """
+    pattern = pattern.strip()
+    while pattern.startswith(".*"):
+        pattern = pattern[2:].lstrip("?")
+    while pattern.endswith(".*") and not pattern.endswith("\\.*"):
+        pattern = pattern[:-2]
+    return pattern
+
+
+def _check_dialect(pattern: str):
+    """
+    Reject the syntax Python and Postgres ARE read differently, e.g. "\\b"
+    (a word boundary in Python, a backspace in ARE), the ARE-only "\\m",
+    "\\M" and "\\y", POSIX bracket classes, "{,n}" bounds, named groups and
+    possessive quantifiers. Escaped punctuation, class escapes, (?:...),
+    lookaheads and a leading (?i) are kept.
+    """
+    i, end = 0, len(pattern)
+    in_brackets = False
+    while i < end:
+        char = pattern[i]
+        if char == "\\":
+            if i + 1 == end:
+                raise ValidationError("name_regex cannot end with a backslash")
+            escaped = pattern[i + 1]
+            allowed = BRACKET_CLASS_ESCAPES if in_brackets else CLASS_ESCAPES
+            if escaped.isalnum() and escaped not in allowed:
+                raise ValidationError(
+                    f"The escape \\{escaped} is not allowed in name_regex"
+                )
+            i += 2
+        elif in_brackets:
+            if char == "[":
+                raise ValidationError("'[' must be escaped inside brackets")
+            in_brackets = char != "]"
+            i += 1
+        elif char == "[":
+            in_brackets = True
+            i += 1
+            # A leading "]" is a literal in both dialects
+            if pattern.startswith("^", i):
+                i += 1
+            if pattern.startswith("]", i):
+                i += 1
+        elif pattern.startswith("(?", i):
+            if pattern.startswith(SHARED_GROUPS, i):
+                i += 3
+            elif i == 0 and pattern.startswith(CASE_INSENSITIVE):
+                i += len(CASE_INSENSITIVE)
+            else:
+                raise ValidationError(
+                    "Only (?:, (?=, (?! and a leading (?i) are allowed in name_regex"
+                )
+        elif char == "{":
+            bound = _BOUND.match(pattern, i)
+            if bound is None:
+                raise ValidationError(
+                    "Braces must form a {m}, {m,} or {m,n} bound or be escaped"
+                )
+            i = bound.end()
+            if pattern.startswith("+", i):
+                raise ValidationError("Possessive quantifiers are not allowed")
+        else:
+            if char in "*+?" and pattern.startswith("+", i + 1):
+                raise ValidationError("Possessive quantifiers are not allowed")
+            i += 1
+    if in_brackets:
+        raise ValidationError("Invalid name_regex: unterminated brackets")
+
+
+def _subpatterns(av):
+    if isinstance(av, sre_parse.SubPattern):
+        yield av
+    elif isinstance(av, (list, tuple)):
+        for item in av:
+            yield from _subpatterns(item)
+
+
+def _check(subpattern, inside_repeat: bool = False):
+    for op, av in subpattern:
+        if op in _BACKREFERENCES:
+            raise ValidationError("Backreferences are not allowed in name_regex")
+        if op in _REPEATS:
+            low, high, body = av
+            if high != sre_constants.MAXREPEAT and high > MAX_REPEAT_BOUND:
+                raise ValidationError(
+                    f"Repetition bounds above {MAX_REPEAT_BOUND} are not allowed"
+                )
+            unbounded = high == sre_constants.MAXREPEAT or high > 1
+            if unbounded and inside_repeat:
+                raise ValidationError(
+                    "Nested quantifiers such as (a+)+ are not allowed in name_regex"
+                )
+            _check(body, inside_repeat or unbounded)
+            continue
+        for child in _subpatterns(av):
+            _check(child, inside_repeat)
+
+
+def _literal_runs(parsed) -> List[str]:
+    runs, current = [], []
+    for op, av in parsed:
+        if op == sre_constants.LITERAL:
+            current.append(chr(av))
+            continue
+        runs.append("".join(current))
+        current = []
+    runs.append("".join(current))
+    return [run for run in runs if run]
+
+
+def _literal_prefix(parsed) -> str:
+    items = list(parsed)
+    if not items or items[0] != (sre_constants.AT, sre_constants.AT_BEGINNING):
+        return ""
+    prefix = []
+    for op, av in items[1:]:
+        if op != sre_constants.LITERAL:
+            break
+        prefix.append(chr(av))
+    return "".join(prefix)
+
+
+@lru_cache(maxsize=1024)
+def analyze_pattern(pattern: str) -> PatternAnalysis:
+    """
+    Validate and normalise a name regex and extract what an index can use.
+
+    The pattern runs as a Postgres ARE but is analysed with Python's regex
+    parser, so only the syntax both read the same way is accepted. Patterns
+    that can backtrack exponentially (nested unbounded quantifiers,
+    backreferences) are rejected.
+
+    Args:
+        pattern (str): The user supplied regular expression.
+
+    Returns:
+        PatternAnalysis: The normalised pattern, the literal prefix it is
+                         anchored to and the trigrams any match must contain.
+
+    Raises:
+        ValidationError: If the pattern is too long, invalid or unsafe.
+    """
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValidationError(
+            f"name_regex must be at most {MAX_PATTERN_LENGTH} characters"
+        )
+    normalized = normalize_pattern(pattern)
+    _check_dialect(normalized)
+    try:
+        parsed = sre_parse.parse(normalized)
+    except Exception as e:
+        raise ValidationError(f"Invalid name_regex: {e}")
+    _check(parsed)
+
+    if parsed.state.flags & sre_constants.SRE_FLAG_IGNORECASE:
+        return PatternAnalysis(normalized, "", ())
+
+    trigrams = sorted(
+        {
+            run[i : i + 3].lower()
+            for run in _literal_runs(parsed)
+            for i in range(len(run) - 2)
+        }
+    )
+    return PatternAnalysis(normalized, _literal_prefix(parsed), tuple(trigrams))
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def regex_conditions(
+    column: str, pattern: str, next_param: int
+) -> Tuple[List[str], list]:
+    """
+    Build the WHERE conditions for a name regex filter.
+
+    A literal prefix adds a LIKE condition the planner can serve from the
+    text_pattern_ops index before the regex runs on the remaining rows.
+
+    Args:
+        column (str): The column to match, e.g. "s.name".
+        pattern (str): The user supplied regular expression.
+        next_param (int): The number of the next query placeholder.
+
+    Returns:
+        Tuple[List[str], list]: The conditions and their parameters.
+
+    Raises:
+        ValidationError: If the pattern is rejected by analyze_pattern.
+    """
+    metrics = get_metrics()
+    try:
+        analysis = analyze_pattern(pattern)
+    except ValidationError:
+        metrics.increment("regex_filter.rejected")
+        raise
+    if not analysis.selective:
+        metrics.increment("regex_filter.unindexed")
+
+    conditions, params = [], []
+    if analysis.literal_prefix:
+        conditions.append(f"{column} LIKE ${next_param}")
+        params.append(escape_like(analysis.literal_prefix) + "%")
+    conditions.append(f"{column} ~ ${next_param + len(params)}")
+    params.append(analysis.pattern)
+    return conditions, params
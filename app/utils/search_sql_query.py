@@ -1,54 +1,239 @@
-def search_query(payload):
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from utils.custom_exceptions import ValidationError
+from utils.regex_filter import escape_like
+
+
+class Relation(NamedTuple):
+    table: str
+    alias: str
+    parent: Optional[str]
+    foreign_key: Optional[str]
+    # (child column, parent column) copying the parent's partition key, joined
+    # too so that the child's partitions are pruned
+    partition_key: Optional[Tuple[str, str]] = None
+
+
+class Field(NamedTuple):
+    column: str
+    operator: str
+    # Lower ranks are more selective and are emitted first
+    rank: int
+
+
+# Relation graph, from the root of the hierarchy down
+RELATIONS: Dict[str, Relation] = {
+    "sport": Relation("sports", "sp", None, None),
+    "event": Relation("events", "ev", "sport", "sport_id"),
+    "selection": Relation(
+        "selections", "se", "event", "event_id", ("event_start", "scheduled_start")
+    ),
+}
+HIERARCHY: Tuple[str, ...] = ("sport", "event", "selection")
+
+# Whitelist of the searchable fields of each entity
+FIELDS: Dict[str, Dict[str, Field]] = {
+    "sport": {
+        "slug": Field("slug", "=", 0),
+        "name": Field("name", "=", 1),
+        "name_prefix": Field("name", "LIKE", 4),
+        "active": Field("active", "=", 5),
+    },
+    "event": {
+        "slug": Field("slug", "=", 0),
+        "name": Field("name", "=", 1),
+        "status": Field("status", "=", 2),
+        "scheduled_start_from": Field("scheduled_start", ">=", 3),
+        "scheduled_start_to": Field("scheduled_start", "<=", 3),
+        "name_prefix": Field("name", "LIKE", 4),
+        "type": Field("type", "=", 5),
+        "active": Field("active", "=", 5),
+    },
+    "selection": {
+        "name": Field("name", "=", 1),
+        "outcome": Field("outcome", "=", 2),
+        "price_min": Field("price", ">=", 3),
+        "price_max": Field("price", "<=", 3),
+        "name_prefix": Field("name", "LIKE", 4),
+        "active": Field("active", "=", 5),
+    },
+}
+
+# (target, ((entity, (field, ...)), ...)) with fields in emission order
+Shape = Tuple[str, Tuple[Tuple[str, Tuple[str, ...]], ...]]
+
+
+class SearchPlan(NamedTuple):
+    sql: str
+    # (entity, field) bound to $1, $2... followed by the limit and offset
+    param_order: Tuple[Tuple[str, str], ...]
+
+
+def criteria_shape(payload: dict, target: Optional[str] = None) -> Shape:
+    """
+    Reduce the criteria to the entities and fields they use, which is all the
+    SQL depends on.
+
+    Args:
+        payload (dict): Criteria per entity, e.g. {"sport": {"name": "Football"}}.
+        target (Optional[str]): The entity returned, by default the deepest
+                                one with criteria.
+
+    Returns:
+        Shape: The target and the fields used per entity, in a canonical order.
+
+    Raises:
+        ValidationError: If an entity or a field is not searchable.
+    """
+    used = []
+    for entity in payload:
+        if entity not in RELATIONS:
+            raise ValidationError(f"Unknown search entity: {entity}")
+    for entity in HIERARCHY:
+        values = payload.get(entity) or {}
+        unknown = set(values) - set(FIELDS[entity])
+        if unknown:
+            raise ValidationError(
+                f"Unknown {entity} search fields: {', '.join(sorted(unknown))}"
+            )
+        fields = sorted(
+            (name for name, value in values.items() if value is not None),
+            key=lambda name: (FIELDS[entity][name].rank, name),
+        )
+        if fields:
+            used.append((entity, tuple(fields)))
+
+    if target is None:
+        target = used[-1][0] if used else "event"
+    elif target not in RELATIONS:
+        raise ValidationError(f"Unknown search target: {target}")
+    return target, tuple(used)
+
+
+def _partition_conditions(relation: Relation, parent_alias: str) -> List[str]:
+    if not relation.partition_key:
+        return []
+    column, parent_column = relation.partition_key
+    return [f"{relation.alias}.{column} = {parent_alias}.{parent_column}"]
+
+
+def _predicates(entity: str, fields: Tuple[str, ...], param_order: list) -> List[str]:
+    alias = RELATIONS[entity].alias
+    predicates = []
+    for name in fields:
+        field = FIELDS[entity][name]
+        param_order.append((entity, name))
+        predicates.append(
+            f"{alias}.{field.column} {field.operator} ${len(param_order)}"
+        )
+    return predicates
+
+
+@lru_cache(maxsize=256)
+def compile_search(shape: Shape) -> SearchPlan:
     """
-    Build an SQL query based on the given payload.
+    Compile a criteria shape into a parameterized query.
+
+    The target table is the base of the query. Its ancestors are joined on
+    their primary key (many-to-one, so no duplicated rows) and its descendants
+    are filtered with correlated EXISTS, so each predicate stays on the table
+    owning the column and can use its indexes. Predicates are emitted from the
+    most to the least selective.
 
     Args:
-    - payload (dict): A dictionary containing keys as table names (in singular form, e.g., "sport")
-                      and values as dictionaries with column names as keys and desired values.
+        shape (Shape): The shape returned by criteria_shape.
 
     Returns:
-    - str: An SQL query generated from the payload.
+        SearchPlan: The SQL template and the order of its parameters.
+    """
+    target, used = shape
+    fields_by_entity = dict(used)
+    depth = HIERARCHY.index(target)
+    base = RELATIONS[target]
+    param_order: list = []
+
+    entities_with_criteria = [HIERARCHY.index(entity) for entity in fields_by_entity]
+    top = min([depth] + entities_with_criteria)
+    bottom = max([depth] + entities_with_criteria)
+
+    joins = []
+    for level in range(depth, top, -1):
+        child = RELATIONS[HIERARCHY[level]]
+        parent = RELATIONS[child.parent]
+        on = [f"{parent.alias}.id = {child.alias}.{child.foreign_key}"]
+        on.extend(_partition_conditions(child, parent.alias))
+        joins.append(f"JOIN {parent.table} {parent.alias} ON {' AND '.join(on)}")
+
+    # Flat predicates of the target and its joined ancestors, by selectivity
+    flat = sorted(
+        (FIELDS[HIERARCHY[level]][name].rank, level, name)
+        for level in range(top, depth + 1)
+        for name in fields_by_entity.get(HIERARCHY[level], ())
+    )
+    where = []
+    for _, level, name in flat:
+        where.extend(_predicates(HIERARCHY[level], (name,), param_order))
+
+    def exists(level: int, parent_alias: str) -> str:
+        entity = HIERARCHY[level]
+        relation = RELATIONS[entity]
+        conditions = [f"{relation.alias}.{relation.foreign_key} = {parent_alias}.id"]
+        conditions.extend(_partition_conditions(relation, parent_alias))
+        conditions.extend(
+            _predicates(entity, fields_by_entity.get(entity, ()), param_order)
+        )
+        if level < bottom:
+            conditions.append(exists(level + 1, relation.alias))
+        return (
+            f"EXISTS (SELECT 1 FROM {relation.table} {relation.alias} "
+            f"WHERE {' AND '.join(conditions)})"
+        )
+
+    if bottom > depth:
+        where.append(exists(depth + 1, base.alias))
+
+    parts = [f"SELECT {base.alias}.* FROM {base.table} {base.alias}"] + joins
+    if where:
+        parts.append("WHERE " + " AND ".join(where))
+    parts.append(f"ORDER BY {base.alias}.id")
+    parts.append(f"LIMIT ${len(param_order) + 1} OFFSET ${len(param_order) + 2}")
+    return SearchPlan("\n".join(parts), tuple(param_order))
+
+
+def _param(entity: str, name: str, value):
+    if isinstance(value, Enum):
+        value = value.value
+    if FIELDS[entity][name].operator == "LIKE":
+        value = escape_like(value) + "%"
+    return value
+
+
+def search_query(
+    payload: dict, target: Optional[str] = None, limit: int = 100, offset: int = 0
+) -> Tuple[str, list]:
     """
+    Build a parameterized cross-entity search query.
 
-    # Function to convert payload name to table name
-    def to_table_name(key):
-        return key.capitalize() + "s"
-
-    # Define potential relations between tables
-    relations = {"Sports": [], "Events": ["Sports"], "Selections": ["Events"]}
-
-    tables_in_payload = [to_table_name(k) for k in payload.keys()]
-
-    # Determine all necessary tables for the query based on the relations
-    required_tables = set(tables_in_payload)
-    for table in tables_in_payload:
-        required_tables.update(relations[table])
-
-    # Base of the query
-    base_table = list(required_tables)[0]  # Start with one of the tables
-    query = f"SELECT * FROM {base_table}"
-
-    # Add other tables with JOINs
-    for table in required_tables:
-        if table != base_table:
-            if "Events" in [base_table, table]:
-                foreign_key = "sport_id"
-            else:
-                foreign_key = "event_id"
-            query += f" JOIN {table} ON {table}.{foreign_key} = {base_table}.id"
-
-    # Build WHERE clauses
-    where_clauses = []
-    for key, value in payload.items():
-        if value is not None:
-            table_name = to_table_name(key)
-            for column, column_value in value.items():
-                if isinstance(column_value, str):
-                    where_clauses.append(f"{table_name}.{column} = '{column_value}'")
-                else:
-                    where_clauses.append(f"{table_name}.{column} = {column_value}")
-
-    if where_clauses:
-        query += " WHERE " + " AND ".join(where_clauses)
-
-    return query
+    Args:
+        payload (dict): Criteria per entity, keyed by the singular entity name
+                        ("sport", "event", "selection"), e.g.
+                        {"sport": {"name": "Football"}, "event": {"status": "started"},
+                         "selection": {"price_min": 1.5, "price_max": 3}}.
+        target (Optional[str]): The entity returned, by default the deepest
+                                one with criteria.
+        limit (int): The maximum number of rows.
+        offset (int): The number of rows to skip.
+
+    Returns:
+        Tuple[str, list]: The SQL query and its parameters.
+
+    Raises:
+        ValidationError: If an entity or a field is not searchable.
+    """
+    plan = compile_search(criteria_shape(payload, target))
+    params = [
+        _param(entity, name, payload[entity][name]) for entity, name in plan.param_order
+    ]
+    return plan.sql, params + [limit, offset]
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Tuple
+
+UPSERT_STATUSES = ("created", "updated", "unchanged")
+
+
+@lru_cache(maxsize=None)
+def upsert_query(
+    table: str, columns: Tuple[Tuple[str, str], ...], conflict: Tuple[str, ...]
+) -> str:
+    """
+    Build a bulk upsert keyed by a unique constraint, taking one array
+    parameter per column.
+
+    A row whose values are all unchanged is not written at all, so re-sending
+    the same data leaves no dead tuples and keeps its version. Every input row
+    is returned with an "upsert_status" of "created", "updated" or "unchanged".
+
+    Args:
+        table (str): The table, which must have a "version" column.
+        columns (Tuple[Tuple[str, str], ...]): (column, Postgres type) pairs,
+                                               bound to $1, $2... as arrays.
+        conflict (Tuple[str, ...]): The columns of the unique constraint.
+
+    Returns:
+        str: The SQL query.
+    """
+    names = [name for name, _ in columns]
+    updated = [name for name in names if name not in conflict]
+    arrays = ", ".join(f"${i}::{kind}[]" for i, (_, kind) in enumerate(columns, 1))
+    key_match = " AND ".join(f"t.{name} = i.{name}" for name in conflict)
+    return f"""
+        WITH input AS (
+            SELECT * FROM unnest({arrays}) AS i({", ".join(names)})
+        ), upserted AS (
+            INSERT INTO {table} AS t ({", ".join(names)})
+            SELECT {", ".join(names)} FROM input
+            ON CONFLICT ({", ".join(conflict)}) DO UPDATE
+            SET {", ".join(f"{name} = EXCLUDED.{name}" for name in updated)},
+                version = t.version + 1
+            WHERE ({", ".join(f"t.{name}" for name in updated)})
+                IS DISTINCT FROM ({", ".join(f"EXCLUDED.{name}" for name in updated)})
+            RETURNING t.*,
+                CASE WHEN t.xmax = 0 THEN 'created' ELSE 'updated' END
+                    AS upsert_status
+        )
+        SELECT * FROM upserted
+        UNION ALL
+        SELECT t.*, 'unchanged' FROM {table} t JOIN input i ON {key_match}
+        WHERE NOT EXISTS (
+            SELECT 1 FROM upserted u
+            WHERE {" AND ".join(f"u.{name} = t.{name}" for name in conflict)}
+        )
+    """
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Startup benchmark.
+
+Prints the `python -X importtime` breakdown of `import main` and measures, over
+several cold starts of uvicorn, the time until the first 200 on the liveness
+probe (serving HTTP) and on the readiness probe (database pool warm).
+
+Usage:
+    ./bin/benchmark-startup.py [--runs 5] [--port 8001] [--top 15]
+
+Run it with LAZY_STARTUP=1 to benchmark the lazy startup mode.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def env_flag(name: str) -> bool:
+    # Same parsing as main.env_flag, so LAZY_STARTUP=0 or false is eager
+    return os.getenv(name, "false").lower() in ("1", "true", "yes")
+
+
+def import_time_breakdown(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+
+    rows.sort(reverse=True)
+    print(f"== Import time of `main`, top {top} by cumulative time")
+    print(f"{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    for cumulative_us, self_us, module in rows[:top]:
+        print(f"{cumulative_us / 1000:>16.1f} {self_us / 1000:>10.1f}  {module}")
+
+
+def wait_for_200(url: str, deadline: float):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def time_to_first_200(port: int, timeout: float):
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=APP_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        live = wait_for_200(f"http://127.0.0.1:{port}/health/live", deadline)
+        ready = wait_for_200(f"http://127.0.0.1:{port}/health/ready", deadline)
+    finally:
+        server.terminate()
+        server.wait()
+
+    def to_ms(t):
+        return None if t is None else (t - started) * 1000
+
+    return to_ms(live), to_ms(ready)
+
+
+def summarize(name: str, samples: list):
+    measured = [s for s in samples if s is not None]
+    if not measured:
+        print(f"{name:>8}: no 200 before the timeout")
+        return
+    print(
+        f"{name:>8}: median {statistics.median(measured):.0f} ms, "
+        f"min {min(measured):.0f} ms, max {max(measured):.0f} ms "
+        f"({len(measured)}/{len(samples)} runs)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    mode = "lazy" if env_flag("LAZY_STARTUP") else "eager"
+    print(f"Startup mode: {mode}\n")
+
+    import_time_breakdown(args.top)
+
+    lives, readies = [], []
+    for _ in range(args.runs):
+        live, ready = time_to_first_200(args.port, args.timeout)
+        lives.append(live)
+        readies.append(ready)
+
+    print(f"\n== Time to first 200 over {args.runs} cold starts")
+    summarize("live", lives)
+    summarize("ready", readies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Batch internal-node counts over many small trees.
+
+Calling find_internal_nodes_num once per tree is dominated by the Python call
+overhead when the trees are small. Here the trees are packed into one flat
+parent array plus offsets (tree i is flat[offsets[i]:offsets[i + 1]]) and all
+the counts come out of a single vectorised pass.
+"""
+
+from itertools import chain
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+
+def _recording_lengths(trees: Iterable, lengths: List[int]):
+    for tree in trees:
+        lengths.append(len(tree))
+        yield tree
+
+
+def pack_trees(trees: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack an iterable of parent lists into a flat array and offsets, in one pass
+    over the input without building intermediate arrays per tree.
+    Args:
+    - trees: Parent lists (or arrays), -1 for the roots, with local indices.
+    Returns:
+    - Tuple[np.ndarray, np.ndarray]: The flat int64 parents and the k + 1 offsets.
+    """
+    lengths: List[int] = []
+    flat = np.fromiter(
+        chain.from_iterable(_recording_lengths(trees, lengths)), dtype=np.int64
+    )
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return flat, offsets
+
+
+def find_internal_nodes_num_batch(flat, offsets) -> np.ndarray:
+    """
+    Count the internal nodes of every packed tree at once.
+    Parents are local to their tree, so each one must be -1 or lower than the
+    size of its own tree.
+    Args:
+    - flat: The parents of all the trees, one after the other.
+    - offsets: The k + 1 boundaries of the trees in flat, starting at 0.
+    Returns:
+    - np.ndarray: The number of internal nodes of each of the k trees.
+    """
+    parents = np.asarray(flat)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if parents.ndim != 1 or offsets.ndim != 1 or len(offsets) == 0:
+        raise ValueError("flat and offsets must be one-dimensional")
+    if parents.size and not np.issubdtype(parents.dtype, np.integer):
+        raise TypeError("The trees must contain integers")
+    if offsets[0] != 0 or offsets[-1] != len(parents):
+        raise ValueError("offsets must start at 0 and end at len(flat)")
+    sizes = np.diff(offsets)
+    if (sizes < 0).any():
+        raise ValueError("offsets must be non-decreasing")
+
+    tree_of_node = np.repeat(np.arange(len(sizes)), sizes)
+    if parents.size and (parents.min() < -1 or (parents >= sizes[tree_of_node]).any()):
+        raise ValueError("Every parent must be -1 or an index of its own tree")
+
+    # Shift local parents to flat positions; roots land on the spare last slot
+    is_child = parents >= 0
+    global_parents = np.where(is_child, parents + offsets[tree_of_node], len(parents))
+    seen = np.zeros(len(parents) + 1, dtype=np.bool_)
+    seen[global_parents] = True
+
+    # A prefix sum instead of np.add.reduceat, which mishandles empty trees
+    marked = np.zeros(len(parents) + 1, dtype=np.int64)
+    np.cumsum(seen[:-1], out=marked[1:])
+    return marked[offsets[1:]] - marked[offsets[:-1]]
+
+
+def count_internal_nodes_batch(trees: Iterable) -> np.ndarray:
+    """
+    Pack the trees and count their internal nodes in one vectorised pass.
+    Args:
+    - trees: Parent lists (or arrays), -1 for the roots, with local indices.
+    Returns:
+    - np.ndarray: The number of internal nodes of each tree.
+    """
+    return find_internal_nodes_num_batch(*pack_trees(trees))
@@ -0,0 +1,129 @@
+"""
+Benchmark of the internal-node counters.
+
+Compares the pure-Python find_internal_nodes_num with the NumPy vectorised
+version and the multi-process version on random trees from 10^3 to 10^8 nodes,
+then the batch API against a loop over the scalar function on many small trees.
+
+Usage:
+    python benchmark_find_internal_nodes.py [--max-exponent 8] [--python-max-exponent 7]
+        [--batch-trees 100000] [--batch-tree-size 16]
+"""
+
+import argparse
+import functools
+import time
+
+import numpy as np
+
+from batch_internal_nodes import (
+    count_internal_nodes_batch,
+    find_internal_nodes_num_batch,
+    pack_trees,
+)
+from find_internal_nodes import (
+    find_internal_nodes_num,
+    find_internal_nodes_num_vectorized,
+)
+from parallel_internal_nodes import find_internal_nodes_num_parallel
+
+
+def random_tree(n: int, seed: int = 0) -> np.ndarray:
+    """
+    Random recursive tree: node i picks its parent uniformly among nodes 0..i-1.
+    """
+    rng = np.random.default_rng(seed)
+    tree = (rng.random(n) * np.arange(n)).astype(np.int64)
+    tree[0] = -1
+    return tree
+
+
+def best_time(function, argument, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, n: int, seconds: float):
+    print(
+        f"{label:>12} {n:>12,} {seconds * 1000:>12.2f} ms {n / seconds:>16,.0f} nodes/s"
+    )
+
+
+def benchmark_batch(count: int, size: int, repeat: int):
+    trees = [random_tree(size, seed).tolist() for seed in range(count)]
+
+    def scalar_loop(trees):
+        return [find_internal_nodes_num(tree) for tree in trees]
+
+    def packed_batch(packed):
+        return find_internal_nodes_num_batch(*packed)
+
+    # "packed" skips pack_trees, as for a harness that keeps its trees flat
+    print(f"\n{count:,} trees of {size} nodes")
+    for label, function, argument in (
+        ("python loop", scalar_loop, trees),
+        ("batch", count_internal_nodes_batch, trees),
+        ("packed", packed_batch, pack_trees(trees)),
+    ):
+        seconds = best_time(function, argument, repeat)
+        print(
+            f"{label:>12} {seconds * 1000:>12.2f} ms {count / seconds:>16,.0f} trees/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the internal-node counters")
+    parser.add_argument("--min-exponent", type=int, default=3)
+    parser.add_argument("--max-exponent", type=int, default=8)
+    parser.add_argument(
+        "--python-max-exponent",
+        type=int,
+        default=7,
+        help="largest tree given to the pure-Python version (memory hungry)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="*",
+        default=[],
+        help="process counts for the parallel version, e.g. --workers 1 2 4",
+    )
+    parser.add_argument(
+        "--batch-trees",
+        type=int,
+        default=100_000,
+        help="number of small trees for the batch comparison, 0 to skip it",
+    )
+    parser.add_argument("--batch-tree-size", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{'version':>12} {'nodes':>12} {'best time':>15} {'throughput':>16}")
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        n = 10**exponent
+        tree = random_tree(n)
+        repeat = args.repeat if exponent < 8 else 1
+
+        report("numpy", n, best_time(find_internal_nodes_num_vectorized, tree, repeat))
+
+        for workers in args.workers:
+            parallel = functools.partial(
+                find_internal_nodes_num_parallel, workers=workers
+            )
+            report(f"parallel x{workers}", n, best_time(parallel, tree, repeat))
+
+        if exponent <= args.python_max_exponent:
+            as_list = tree.tolist()
+            report("python", n, best_time(find_internal_nodes_num, as_list, repeat))
+            del as_list
+
+    if args.batch_trees:
+        benchmark_batch(args.batch_trees, args.batch_tree_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 from typing import List
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure-Python version needs nothing
+    np = None
+
 
 def find_internal_nodes_num(tree: List[int]) -> int:
     """
@@ -28,3 +33,48 @@ def find_internal_nodes_num(tree: List[int]) -> int:
 
     # Return the number of unique parent nodes (internal nodes) in the tree
     return len(count)
+
+
+def find_internal_nodes_num_vectorized(tree) -> int:
+    """
+    Vectorised version of find_internal_nodes_num using NumPy.
+    The tree can be a NumPy integer array, any object exposing the buffer protocol
+    (array.array, memoryview, np.memmap...) or a plain list.
+    Each parent is marked in a one-byte-per-node map, in O(n) without Python loops.
+    Args:
+    - tree: The parent of each node, -1 for the root.
+    Returns:
+    - int: The number of internal nodes (unique parents) in the tree.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for the vectorised version")
+
+    parents = np.asarray(tree)
+    if parents.size == 0:
+        return 0
+    if not np.issubdtype(parents.dtype, np.integer):
+        raise TypeError("The tree must contain integers")
+    if parents.min() < -1:
+        raise ValueError("Parent indices must be -1 or a node index")
+
+    # One extra slot at the end: indexing with -1 marks it, so the roots need
+    # no filtering copy of the input, and it is left out of the count
+    size = max(len(parents), int(parents.max()) + 1)
+    seen = np.zeros(size + 1, dtype=np.bool_)
+    seen[parents] = True
+
+    return int(np.count_nonzero(seen[:-1]))
+
+
+def count_internal_nodes(tree) -> int:
+    """
+    Count the internal nodes with the vectorised version when NumPy is available,
+    falling back to the pure-Python find_internal_nodes_num otherwise.
+    Args:
+    - tree: The parent of each node, -1 for the root.
+    Returns:
+    - int: The number of internal nodes (unique parents) in the tree.
+    """
+    if np is None:
+        return find_internal_nodes_num(list(tree))
+    return find_internal_nodes_num_vectorized(tree)
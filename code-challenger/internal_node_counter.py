@@ -0,0 +1,149 @@
+"""
+Incremental internal-node counter.
+
+Keeps the child count of every node in an array, so adding a node, moving it
+to another parent or removing a leaf updates the internal-node count in O(1)
+instead of re-running find_internal_nodes_num over the whole tree.
+"""
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy only speeds up from_parents
+    np = None
+
+ROOT = -1
+REMOVED = -2
+
+
+class InternalNodeCounter:
+    __slots__ = ("_parents", "_child_counts", "_internal", "_size")
+
+    def __init__(self):
+        self._parents = array("q")
+        self._child_counts = array("q")
+        self._internal = 0
+        self._size = 0
+
+    @classmethod
+    def from_parents(cls, tree) -> "InternalNodeCounter":
+        """
+        Build the counter from an existing parent list in one pass
+        (a single np.bincount when NumPy is available).
+        Args:
+        - tree: The parent of each node, -1 for the root.
+        Returns:
+        - InternalNodeCounter: The counter holding the tree.
+        """
+        counter = cls()
+        if np is None:
+            for parent in tree:
+                counter._parents.append(parent)
+                counter._child_counts.append(0)
+                counter._size += 1
+            for parent in counter._parents:
+                counter._check_parent(parent)
+                if parent != ROOT:
+                    counter._increment(parent)
+            return counter
+
+        parents = np.asarray(tree, dtype=np.int64)
+        n = len(parents)
+        if n and (parents.min() < ROOT or parents.max() >= n):
+            raise ValueError("Every parent must be -1 or the index of an existing node")
+        child_counts = np.bincount(parents[parents >= 0], minlength=n).astype(np.int64)
+
+        counter._parents.frombytes(parents.tobytes())
+        counter._child_counts.frombytes(child_counts.tobytes())
+        counter._internal = int(np.count_nonzero(child_counts))
+        counter._size = n
+        return counter
+
+    @property
+    def internal_count(self) -> int:
+        return self._internal
+
+    def __len__(self) -> int:
+        return self._size
+
+    def parent_of(self, node: int) -> int:
+        self._check_node(node)
+        return self._parents[node]
+
+    def children_count(self, node: int) -> int:
+        self._check_node(node)
+        return self._child_counts[node]
+
+    def _check_node(self, node: int):
+        if not 0 <= node < len(self._parents) or self._parents[node] == REMOVED:
+            raise KeyError(f"Node {node} does not exist")
+
+    def _check_parent(self, parent: int):
+        if parent != ROOT:
+            self._check_node(parent)
+
+    def _increment(self, parent: int):
+        if self._child_counts[parent] == 0:
+            self._internal += 1
+        self._child_counts[parent] += 1
+
+    def _decrement(self, parent: int):
+        self._child_counts[parent] -= 1
+        if self._child_counts[parent] == 0:
+            self._internal -= 1
+
+    def add_node(self, parent: int = ROOT) -> int:
+        """
+        Add a leaf under the given parent.
+        Args:
+        - parent (int): The parent node, -1 for a new root.
+        Returns:
+        - int: The index of the new node.
+        """
+        self._check_parent(parent)
+        self._parents.append(parent)
+        self._child_counts.append(0)
+        self._size += 1
+        if parent != ROOT:
+            self._increment(parent)
+        return len(self._parents) - 1
+
+    def reparent(self, node: int, new_parent: int):
+        """
+        Move a node, with its subtree, under another parent.
+        Checking that new_parent is not a descendant of node would cost O(depth),
+        so keeping the tree acyclic is up to the caller.
+        Args:
+        - node (int): The node to move.
+        - new_parent (int): Its new parent, -1 to make it a root.
+        """
+        self._check_node(node)
+        self._check_parent(new_parent)
+        if new_parent == node:
+            raise ValueError("A node cannot be its own parent")
+
+        old_parent = self._parents[node]
+        if old_parent == new_parent:
+            return
+        if old_parent != ROOT:
+            self._decrement(old_parent)
+        if new_parent != ROOT:
+            self._increment(new_parent)
+        self._parents[node] = new_parent
+
+    def remove_leaf(self, node: int):
+        """
+        Remove a node without children. Its index is not reused.
+        Args:
+        - node (int): The leaf to remove.
+        """
+        self._check_node(node)
+        if self._child_counts[node]:
+            raise ValueError(f"Node {node} is not a leaf")
+
+        parent = self._parents[node]
+        if parent != ROOT:
+            self._decrement(parent)
+        self._parents[node] = REMOVED
+        self._size -= 1
@@ -0,0 +1,109 @@
+"""
+Multi-process internal-node count.
+
+The parent array is copied once into shared memory and split into one
+contiguous range per worker. Each worker marks the parents of its range in its
+own row of a shared bitmap matrix, so no worker ever writes to another's bytes;
+the rows are then OR-merged and popcounted by the parent process.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from parent_bitmap import mark_parents, popcount
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _mark_range(
+    input_name: str,
+    dtype: str,
+    n: int,
+    output_name: str,
+    row: int,
+    start: int,
+    stop: int,
+    chunk_size: int,
+):
+    parents_memory = shared_memory.SharedMemory(name=input_name)
+    bits_memory = shared_memory.SharedMemory(name=output_name)
+    try:
+        parents = np.ndarray(n, dtype=dtype, buffer=parents_memory.buf)
+        nbytes = (n + 7) // 8
+        bits = np.ndarray(
+            nbytes, dtype=np.uint8, buffer=bits_memory.buf, offset=row * nbytes
+        )
+        for chunk_start in range(start, stop, chunk_size):
+            mark_parents(
+                bits, parents[chunk_start : min(chunk_start + chunk_size, stop)]
+            )
+        # The views must be released before the shared memory can be closed
+        del parents, bits
+    finally:
+        parents_memory.close()
+        bits_memory.close()
+
+
+def find_internal_nodes_num_parallel(
+    tree,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Count the internal nodes of a parent array with a pool of processes.
+    Args:
+    - tree: The parent of each node, -1 for the root (array, buffer or list).
+    - workers (int): The number of processes, defaults to the CPU count.
+    - chunk_size (int): The number of nodes a worker marks at a time.
+    Returns:
+    - int: The number of internal nodes (unique parents) in the tree.
+    """
+    parents = np.asarray(tree)
+    n = len(parents)
+    if n == 0:
+        return 0
+    if not np.issubdtype(parents.dtype, np.integer):
+        raise TypeError("The tree must contain integers")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, n))
+    nbytes = (n + 7) // 8
+    bounds = np.linspace(0, n, workers + 1).astype(np.int64)
+
+    parents_memory = shared_memory.SharedMemory(create=True, size=parents.nbytes)
+    bits_memory = shared_memory.SharedMemory(create=True, size=workers * nbytes)
+    try:
+        shared_parents = np.ndarray(n, dtype=parents.dtype, buffer=parents_memory.buf)
+        shared_parents[:] = parents
+        rows = np.ndarray((workers, nbytes), dtype=np.uint8, buffer=bits_memory.buf)
+        rows[:] = 0
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _mark_range,
+                    parents_memory.name,
+                    parents.dtype.str,
+                    n,
+                    bits_memory.name,
+                    row,
+                    int(bounds[row]),
+                    int(bounds[row + 1]),
+                    chunk_size,
+                )
+                for row in range(workers)
+            ]
+            for future in futures:
+                future.result()
+
+        count = popcount(np.bitwise_or.reduce(rows, axis=0))
+        del shared_parents, rows
+        return count
+    finally:
+        parents_memory.close()
+        parents_memory.unlink()
+        bits_memory.close()
+        bits_memory.unlink()
@@ -0,0 +1,64 @@
+"""
+Bit-array of seen parents, one bit per node.
+
+Shared by the streaming and the multi-process internal-node counters: parents
+are marked chunk by chunk and the internal-node count is the number of set bits.
+"""
+
+import numpy as np
+
+# Number of set bits of every byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def new_bitmap(n: int) -> np.ndarray:
+    """
+    Create an empty bitmap able to hold n nodes, in n/8 bytes.
+    Args:
+    - n (int): The number of nodes.
+    Returns:
+    - np.ndarray: The zeroed uint8 bitmap.
+    """
+    return np.zeros((n + 7) // 8, dtype=np.uint8)
+
+
+def grow_bitmap(bits: np.ndarray, n: int) -> np.ndarray:
+    """
+    Return a bitmap holding at least n nodes, keeping the already set bits.
+    """
+    needed = (n + 7) // 8
+    if needed <= len(bits):
+        return bits
+    grown = np.zeros(max(needed, 2 * len(bits)), dtype=np.uint8)
+    grown[: len(bits)] = bits
+    return grown
+
+
+def mark_parents(bits: np.ndarray, parents) -> None:
+    """
+    Set the bit of every parent of a chunk. Roots (-1) are ignored.
+    np.bitwise_or.at applies the OR once per element, so parents sharing a byte
+    never overwrite each other's bit, without sorting the chunk first.
+    Args:
+    - bits (np.ndarray): The bitmap to update in place.
+    - parents: A chunk of the parent array.
+    """
+    parents = np.asarray(parents)
+    parents = parents[parents >= 0]
+    if parents.size == 0:
+        return
+    if int(parents.max()) >= len(bits) * 8:
+        raise ValueError("Parent index out of the bitmap range")
+
+    masks = np.left_shift(1, parents & 7).astype(np.uint8)
+    np.bitwise_or.at(bits, parents >> 3, masks)
+
+
+def popcount(bits: np.ndarray, chunk_size: int = 1 << 24) -> int:
+    """
+    Count the set bits of the bitmap, chunk by chunk to bound the temporaries.
+    """
+    total = 0
+    for start in range(0, len(bits), chunk_size):
+        total += int(_POPCOUNT[bits[start : start + chunk_size]].sum(dtype=np.int64))
+    return total
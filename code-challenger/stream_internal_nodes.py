@@ -0,0 +1,113 @@
+"""
+Internal-node count for trees too large to hold as Python lists.
+
+The parent array is read from a binary file through a memory map, or streamed
+from a text file, in fixed-size chunks. Each chunk marks its parents in a bit
+array, so memory stays bounded by n/8 bytes plus one chunk.
+"""
+
+import os
+from typing import Iterator, TextIO, Union
+
+import numpy as np
+
+from parent_bitmap import grow_bitmap, mark_parents, new_bitmap, popcount
+
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+
+def find_internal_nodes_num_from_binary(
+    path: Union[str, os.PathLike],
+    dtype: str = "int32",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Count the internal nodes of a parent array stored as raw native-endian integers.
+    Args:
+    - path: The binary file, e.g. written with np.ndarray.tofile.
+    - dtype (str): The integer type of the file, "int32" or "int64".
+    - chunk_size (int): The number of nodes processed at a time.
+    Returns:
+    - int: The number of internal nodes (unique parents) in the tree.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype("int32"), np.dtype("int64")):
+        raise ValueError("dtype must be int32 or int64")
+
+    if os.path.getsize(path) == 0:
+        return 0
+    parents = np.memmap(path, dtype=dtype, mode="r")
+    n = len(parents)
+    bits = new_bitmap(n)
+
+    for start in range(0, n, chunk_size):
+        mark_parents(bits, parents[start : start + chunk_size])
+
+    return popcount(bits)
+
+
+def _read_text_chunks(stream: TextIO, chunk_chars: int) -> Iterator[np.ndarray]:
+    pending = ""
+    while True:
+        text = stream.read(chunk_chars)
+        if not text:
+            break
+        text = (pending + text).replace(",", " ")
+        tokens = text.split()
+
+        # The last number may continue in the next chunk
+        pending = "" if text[-1].isspace() or not tokens else tokens.pop()
+
+        if tokens:
+            yield np.array(tokens, dtype=np.int64)
+
+    if pending:
+        yield np.array([pending], dtype=np.int64)
+
+
+def find_internal_nodes_num_from_text(
+    source: Union[str, os.PathLike, TextIO],
+    chunk_chars: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Count the internal nodes of a parent array stored as text, integers separated
+    by whitespace or commas, streamed in fixed-size chunks.
+    The number of nodes is not known upfront, so the bitmap grows with the largest
+    parent seen.
+    Args:
+    - source: A path or an open text stream.
+    - chunk_chars (int): The number of characters read at a time.
+    Returns:
+    - int: The number of internal nodes (unique parents) in the tree.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as stream:
+            return find_internal_nodes_num_from_text(stream, chunk_chars)
+
+    bits = new_bitmap(0)
+    for parents in _read_text_chunks(source, chunk_chars):
+        if parents.size and parents.max() >= 0:
+            bits = grow_bitmap(bits, int(parents.max()) + 1)
+        mark_parents(bits, parents)
+
+    return popcount(bits)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Count the internal nodes of a parent array stored in a file"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["int32", "int64", "text"], default="int32")
+    args = parser.parse_args()
+
+    if args.format == "text":
+        print(find_internal_nodes_num_from_text(args.path))
+    else:
+        print(find_internal_nodes_num_from_binary(args.path, dtype=args.format))
+
+
+if __name__ == "__main__":
+    main()
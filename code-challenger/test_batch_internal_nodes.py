@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_internal_nodes import (
+    count_internal_nodes_batch,
+    find_internal_nodes_num_batch,
+    pack_trees,
+)
+from find_internal_nodes import find_internal_nodes_num
+
+TREES = [
+    [4, 4, 1, 5, -1, 4, 5],
+    [-1, -1, -1, -1],
+    [],
+    [-1, 0, 1, 2, 3],
+    [2, 2, -1, 2, 2],
+    [-1],
+    [-1, 0, 0, 2, 2, 3, 3],
+]
+
+
+class TestClass:
+    def test_pack_trees(self):
+        flat, offsets = pack_trees(iter([[-1, 0], [], [-1]]))
+        assert flat.tolist() == [-1, 0, -1]
+        assert offsets.tolist() == [0, 2, 2, 3]
+
+    def test_matches_scalar(self):
+        expected = [find_internal_nodes_num(tree) for tree in TREES]
+        assert count_internal_nodes_batch(TREES).tolist() == expected
+
+    def test_random_trees(self):
+        rng = np.random.default_rng(3)
+        trees = []
+        for _ in range(500):
+            n = int(rng.integers(0, 20))
+            tree = (rng.random(n) * np.arange(n)).astype(np.int64)
+            if n:
+                tree[0] = -1
+            trees.append(tree.tolist())
+
+        expected = [find_internal_nodes_num(tree) for tree in trees]
+        assert count_internal_nodes_batch(trees).tolist() == expected
+
+    def test_no_trees(self):
+        assert count_internal_nodes_batch([]).tolist() == []
+
+    def test_parent_outside_its_tree(self):
+        with pytest.raises(ValueError):
+            count_internal_nodes_batch([[-1, 0], [2, -1]])
+
+    def test_invalid_offsets(self):
+        with pytest.raises(ValueError):
+            find_internal_nodes_num_batch([-1, 0, -1], [0, 2])
+        with pytest.raises(ValueError):
+            find_internal_nodes_num_batch([-1, 0, -1], [0, 3, 2, 3])
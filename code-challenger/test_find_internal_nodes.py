@@ -1,5 +1,12 @@
+import array
+
 import pytest
-from find_internal_nodes import find_internal_nodes_num
+from find_internal_nodes import (
+    count_internal_nodes,
+    find_internal_nodes_num,
+    find_internal_nodes_num_vectorized,
+    np,
+)
 
 
 class TestClass:
@@ -42,3 +49,52 @@ class TestClass:
         # A tree with multiple branches
         my_tree = [-1, 0, 0, 2, 2, 3, 3]
         assert find_internal_nodes_num(my_tree) == 3
+
+
+TREES = [
+    [4, 4, 1, 5, -1, 4, 5],
+    [-1, -1, -1, -1],
+    [-1, 0, 1, 2, 3],
+    [2, 2, -1, 2, 2],
+    [],
+    [-1, 0, 0, 2, 2, 3, 3],
+]
+
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+class TestVectorized:
+    @pytest.mark.parametrize("my_tree", TREES)
+    def test_matches_pure_python(self, my_tree):
+        assert find_internal_nodes_num_vectorized(my_tree) == find_internal_nodes_num(
+            my_tree
+        )
+
+    def test_numpy_array(self):
+        my_tree = np.array([4, 4, 1, 5, -1, 4, 5], dtype=np.int32)
+        assert find_internal_nodes_num_vectorized(my_tree) == 3
+
+    def test_buffer_protocol(self):
+        my_tree = array.array("i", [-1, 0, 0, 2, 2, 3, 3])
+        assert find_internal_nodes_num_vectorized(my_tree) == 3
+        assert find_internal_nodes_num_vectorized(memoryview(my_tree)) == 3
+
+    def test_random_tree(self):
+        rng = np.random.default_rng(0)
+        n = 10_000
+        my_tree = (rng.random(n) * np.arange(n)).astype(np.int64)
+        my_tree[0] = -1
+        assert find_internal_nodes_num_vectorized(my_tree) == find_internal_nodes_num(
+            my_tree.tolist()
+        )
+
+    def test_invalid_parent(self):
+        with pytest.raises(ValueError):
+            find_internal_nodes_num_vectorized([-2, 0])
+
+    def test_non_integer_tree(self):
+        with pytest.raises(TypeError):
+            find_internal_nodes_num_vectorized([0.5, -1])
+
+
+def test_count_internal_nodes():
+    assert count_internal_nodes([4, 4, 1, 5, -1, 4, 5]) == 3
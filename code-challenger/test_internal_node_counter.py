@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from find_internal_nodes import find_internal_nodes_num
+from internal_node_counter import REMOVED, InternalNodeCounter
+
+
+class TestClass:
+    def test_from_parents(self):
+        counter = InternalNodeCounter.from_parents([4, 4, 1, 5, -1, 4, 5])
+        assert counter.internal_count == 3
+        assert len(counter) == 7
+        assert counter.children_count(4) == 3
+
+    def test_from_empty_parents(self):
+        counter = InternalNodeCounter.from_parents([])
+        assert counter.internal_count == 0
+        assert len(counter) == 0
+
+    def test_add_node(self):
+        counter = InternalNodeCounter()
+        root = counter.add_node()
+        assert counter.internal_count == 0
+        child = counter.add_node(root)
+        counter.add_node(root)
+        assert counter.internal_count == 1
+        counter.add_node(child)
+        assert counter.internal_count == 2
+
+    def test_reparent(self):
+        counter = InternalNodeCounter.from_parents([-1, 0, 1])
+        counter.reparent(2, 0)
+        assert counter.internal_count == 1
+        assert counter.parent_of(2) == 0
+        counter.reparent(2, -1)
+        assert counter.children_count(0) == 1
+
+    def test_remove_leaf(self):
+        counter = InternalNodeCounter.from_parents([-1, 0, 1])
+        with pytest.raises(ValueError):
+            counter.remove_leaf(1)
+        counter.remove_leaf(2)
+        assert counter.internal_count == 1
+        assert len(counter) == 2
+        with pytest.raises(KeyError):
+            counter.parent_of(2)
+        with pytest.raises(KeyError):
+            counter.add_node(2)
+
+    def test_invalid_parent(self):
+        with pytest.raises(ValueError):
+            InternalNodeCounter.from_parents([-1, 7])
+        with pytest.raises(ValueError):
+            InternalNodeCounter.from_parents([0]).reparent(0, 0)
+
+    def test_random_operations_match_full_count(self):
+        rng = random.Random(4)
+        counter = InternalNodeCounter.from_parents([-1, 0, 0, 1])
+        parents = [-1, 0, 0, 1]
+
+        for _ in range(2000):
+            live = [node for node, parent in enumerate(parents) if parent != REMOVED]
+            operation = rng.random()
+            if operation < 0.5 or len(live) < 3:
+                parents.append(rng.choice(live))
+                counter.add_node(parents[-1])
+            elif operation < 0.75:
+                # Moving a node under a smaller index keeps the tree acyclic
+                node = rng.choice([n for n in live if n > live[0]])
+                new_parent = rng.choice([n for n in live if n < node])
+                counter.reparent(node, new_parent)
+                parents[node] = new_parent
+            else:
+                leaves = [n for n in live if n not in parents]
+                node = rng.choice(leaves)
+                counter.remove_leaf(node)
+                parents[node] = REMOVED
+
+            live_parents = [p for p in parents if p != REMOVED]
+            assert counter.internal_count == find_internal_nodes_num(live_parents)
@@ -0,0 +1,41 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from find_internal_nodes import find_internal_nodes_num
+from parallel_internal_nodes import find_internal_nodes_num_parallel
+
+
+class TestClass:
+    @pytest.mark.parametrize(
+        "my_tree",
+        [
+            [4, 4, 1, 5, -1, 4, 5],
+            [-1, -1, -1, -1],
+            [-1, 0, 1, 2, 3],
+            [2, 2, -1, 2, 2],
+            [-1, 0, 0, 2, 2, 3, 3],
+        ],
+    )
+    def test_small_trees(self, my_tree):
+        assert find_internal_nodes_num_parallel(
+            my_tree, workers=2
+        ) == find_internal_nodes_num(my_tree)
+
+    @pytest.mark.parametrize("workers", [1, 3, 4])
+    def test_random_tree(self, workers):
+        rng = np.random.default_rng(2)
+        n = 50_001
+        my_tree = (rng.random(n) * np.arange(n)).astype(np.int32)
+        my_tree[0] = -1
+
+        assert find_internal_nodes_num_parallel(
+            my_tree, workers=workers, chunk_size=4096
+        ) == find_internal_nodes_num(my_tree.tolist())
+
+    def test_empty_tree(self):
+        assert find_internal_nodes_num_parallel([]) == 0
+
+    def test_out_of_range_parent(self):
+        with pytest.raises(ValueError):
+            find_internal_nodes_num_parallel([-1, 9], workers=1)
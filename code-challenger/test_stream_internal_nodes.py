@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from find_internal_nodes import find_internal_nodes_num
+from parent_bitmap import mark_parents, new_bitmap, popcount
+from stream_internal_nodes import (
+    find_internal_nodes_num_from_binary,
+    find_internal_nodes_num_from_text,
+)
+
+
+def random_tree(n):
+    rng = np.random.default_rng(1)
+    tree = (rng.random(n) * np.arange(n)).astype(np.int64)
+    tree[0] = -1
+    return tree
+
+
+class TestParentBitmap:
+    def test_duplicated_parents_in_same_byte(self):
+        bits = new_bitmap(16)
+        mark_parents(bits, [0, 1, 1, 7, 8, -1])
+        assert popcount(bits) == 4
+        assert list(bits) == [0b10000011, 0b00000001]
+
+    def test_out_of_range_parent(self):
+        with pytest.raises(ValueError):
+            mark_parents(new_bitmap(8), [8])
+
+
+class TestBinary:
+    @pytest.mark.parametrize("dtype", ["int32", "int64"])
+    def test_matches_pure_python(self, tmp_path, dtype):
+        tree = random_tree(10_000)
+        path = tmp_path / "tree.bin"
+        tree.astype(dtype).tofile(path)
+
+        assert find_internal_nodes_num_from_binary(
+            path, dtype=dtype, chunk_size=777
+        ) == find_internal_nodes_num(tree.tolist())
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "tree.bin"
+        path.write_bytes(b"")
+        assert find_internal_nodes_num_from_binary(path) == 0
+
+    def test_unsupported_dtype(self, tmp_path):
+        with pytest.raises(ValueError):
+            find_internal_nodes_num_from_binary(tmp_path / "tree.bin", dtype="float32")
+
+
+class TestText:
+    def test_example_tree(self):
+        stream = io.StringIO("4, 4, 1, 5, -1, 4, 5")
+        assert find_internal_nodes_num_from_text(stream) == 3
+
+    def test_numbers_split_across_chunks(self, tmp_path):
+        tree = random_tree(5_000)
+        path = tmp_path / "tree.txt"
+        path.write_text("\n".join(str(parent) for parent in tree))
+
+        assert find_internal_nodes_num_from_text(
+            path, chunk_chars=13
+        ) == find_internal_nodes_num(tree.tolist())
+
+    def test_empty_stream(self):
+        assert find_internal_nodes_num_from_text(io.StringIO("")) == 0
@@ -0,0 +1,78 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from find_internal_nodes import find_internal_nodes_num
+from tree_analytics import (
+    analyze_tree,
+    count_leaves,
+    find_roots,
+    node_depths,
+    subtree_sizes,
+    topological_order,
+    validate_parent_array,
+)
+
+
+class TestClass:
+    def test_example_tree(self):
+        my_tree = [4, 4, 1, 5, -1, 4, 5]
+        analysis = analyze_tree(my_tree)
+
+        assert list(analysis.roots) == [4]
+        assert list(analysis.depths) == [1, 1, 2, 2, 0, 1, 2]
+        assert analysis.height == 2
+        assert analysis.leaf_count == 4
+        assert analysis.internal_count == find_internal_nodes_num(my_tree)
+        assert list(analysis.subtree_sizes) == [1, 2, 1, 1, 7, 3, 1]
+
+    def test_order_puts_parents_first(self):
+        my_tree = [4, 4, 1, 5, -1, 4, 5]
+        order = topological_order(node_depths(my_tree))
+        position = {int(node): i for i, node in enumerate(order)}
+        for node, parent in enumerate(my_tree):
+            if parent != -1:
+                assert position[parent] < position[node]
+
+    def test_forest(self):
+        my_tree = [-1, 0, -1, 2, 2]
+        assert list(find_roots(my_tree)) == [0, 2]
+        assert list(subtree_sizes(my_tree)) == [2, 1, 3, 1, 1]
+
+    def test_linear_tree(self):
+        my_tree = [-1] + list(range(999))
+        assert node_depths(my_tree)[-1] == 999
+        assert subtree_sizes(my_tree)[0] == 1000
+        assert count_leaves(my_tree) == 1
+
+    def test_random_tree(self):
+        rng = np.random.default_rng(3)
+        n = 20_000
+        my_tree = (rng.random(n) * np.arange(n)).astype(np.int64)
+        my_tree[0] = -1
+        analysis = analyze_tree(my_tree)
+
+        assert analysis.internal_count == find_internal_nodes_num(my_tree.tolist())
+        assert analysis.subtree_sizes[0] == n
+        assert np.all(analysis.depths[1:] == analysis.depths[my_tree[1:]] + 1)
+        # Every node counts itself once in each of its ancestors' subtrees
+        assert analysis.subtree_sizes.sum() == (analysis.depths + 1).sum()
+
+    def test_empty_tree(self):
+        analysis = analyze_tree([])
+        assert analysis.height == 0
+        assert analysis.leaf_count == 0
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match="cycle"):
+            analyze_tree([-1, 2, 1])
+
+    def test_self_parent(self):
+        with pytest.raises(ValueError, match="cycle"):
+            node_depths([0])
+        with pytest.raises(ValueError, match="cycle"):
+            subtree_sizes([-1, 2, 1])
+
+    def test_missing_parent(self):
+        with pytest.raises(ValueError):
+            validate_parent_array([-1, 5])
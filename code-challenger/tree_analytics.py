@@ -0,0 +1,153 @@
+"""
+Tree analytics on the consecutive-integer parent-array format.
+
+Every function takes the same input as find_internal_nodes_num: the parent of
+each node, -1 for a root. Results come back as NumPy arrays indexed by node.
+Nothing recurses: depths and subtree sizes both come from pointer jumping
+(O(n log h) vectorised work).
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class TreeAnalysis(NamedTuple):
+    roots: np.ndarray
+    depths: np.ndarray
+    height: int
+    leaf_count: int
+    internal_count: int
+    subtree_sizes: np.ndarray
+    order: np.ndarray
+
+
+def validate_parent_array(tree) -> np.ndarray:
+    """
+    Check the consecutive-integer invariant: every parent is -1 or an existing node.
+    Cycles are detected by node_depths.
+    Args:
+    - tree: The parent of each node, -1 for a root (array, buffer or list).
+    Returns:
+    - np.ndarray: The tree as a 1-D int64 array.
+    """
+    parents = np.asarray(tree)
+    if parents.ndim != 1:
+        raise ValueError("The tree must be a one-dimensional parent array")
+    if parents.size == 0:
+        return parents.astype(np.int64)
+    if not np.issubdtype(parents.dtype, np.integer):
+        raise TypeError("The tree must contain integers")
+
+    parents = parents.astype(np.int64, copy=False)
+    if parents.min() < -1 or parents.max() >= len(parents):
+        raise ValueError("Every parent must be -1 or the index of an existing node")
+    return parents
+
+
+def find_roots(tree) -> np.ndarray:
+    """
+    Returns:
+    - np.ndarray: The nodes without a parent.
+    """
+    return np.flatnonzero(validate_parent_array(tree) == -1)
+
+
+def node_depths(tree) -> np.ndarray:
+    """
+    Depth of every node (roots are at depth 0), by pointer jumping: each round
+    adds the depth of the current ancestor and jumps to that ancestor's ancestor,
+    so the number of rounds grows with log2 of the height.
+    Raises ValueError when a node never reaches a root, i.e. the tree has a cycle.
+    Returns:
+    - np.ndarray: The int64 depth of each node.
+    """
+    parents = validate_parent_array(tree)
+    jump = parents.copy()
+    depths = (parents >= 0).astype(np.int64)
+
+    for _ in range(len(parents).bit_length() + 1):
+        active = np.flatnonzero(jump >= 0)
+        if active.size == 0:
+            return depths
+        targets = jump[active]
+        # Read both arrays before writing so every round is synchronous
+        added, jumped = depths[targets], jump[targets]
+        depths[active] += added
+        jump[active] = jumped
+
+    raise ValueError("The parent array contains a cycle")
+
+
+def topological_order(depths: np.ndarray) -> np.ndarray:
+    """
+    Order the nodes by depth, so every parent comes before its children.
+    Returns:
+    - np.ndarray: The node indices in topological order.
+    """
+    return np.argsort(depths, kind="stable")
+
+
+def count_leaves(tree) -> int:
+    """
+    Returns:
+    - int: The number of nodes without children.
+    """
+    parents = validate_parent_array(tree)
+    is_parent = np.zeros(len(parents) + 1, dtype=np.bool_)
+    is_parent[parents] = True
+    return len(parents) - int(np.count_nonzero(is_parent[:-1]))
+
+
+def subtree_sizes(tree) -> np.ndarray:
+    """
+    Size of the subtree rooted at every node, itself included, by pointer
+    jumping like node_depths: after round k every node holds the count of its
+    descendants less than 2**k levels below it, and the next round adds the
+    counts of the nodes exactly 2**k below it. The number of rounds grows with
+    log2 of the height, not with the height.
+    Raises ValueError when the tree has a cycle.
+    Returns:
+    - np.ndarray: The int64 subtree size of each node.
+    """
+    parents = validate_parent_array(tree)
+    jump = parents.copy()
+    sizes = np.ones(len(parents), dtype=np.int64)
+
+    for _ in range(len(parents).bit_length() + 1):
+        active = np.flatnonzero(jump >= 0)
+        if active.size == 0:
+            return sizes
+        targets = jump[active]
+        # Read both arrays before writing so every round is synchronous
+        added = np.bincount(targets, weights=sizes[active], minlength=len(parents))
+        jumped = jump[targets]
+        sizes += added.astype(np.int64)
+        jump[active] = jumped
+
+    raise ValueError("The parent array contains a cycle")
+
+
+def analyze_tree(tree) -> TreeAnalysis:
+    """
+    Validate the tree and compute all the analytics in one go.
+    Args:
+    - tree: The parent of each node, -1 for a root (array, buffer or list).
+    Returns:
+    - TreeAnalysis: roots, depths, height, leaf and internal counts,
+      subtree sizes and a topological order.
+    """
+    parents = validate_parent_array(tree)
+    depths = node_depths(parents)
+    order = topological_order(depths)
+    leaf_count = count_leaves(parents)
+
+    return TreeAnalysis(
+        roots=np.flatnonzero(parents == -1),
+        depths=depths,
+        height=int(depths.max()) if len(parents) else 0,
+        leaf_count=leaf_count,
+        internal_count=len(parents) - leaf_count,
+        subtree_sizes=subtree_sizes(parents),
+        order=order,
+    )